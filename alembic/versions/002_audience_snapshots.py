@@ -0,0 +1,48 @@
+"""Add audience snapshots: content_recipients table and snapshot columns on content
+
+Revision ID: 002_audience_snapshots
+Revises: 001_initial
+Create Date: 2024-02-01 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "002_audience_snapshots"
+down_revision: Union[str, None] = "001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "content",
+        sa.Column("audience_frozen_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column("content", sa.Column("recipient_count", sa.Integer(), nullable=True))
+    op.add_column(
+        "content", sa.Column("prepared_subject", sa.String(length=255), nullable=True)
+    )
+
+    op.create_table(
+        "content_recipients",
+        sa.Column("content_id", sa.Integer(), nullable=False),
+        sa.Column("subscriber_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["content_id"], ["content.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["subscriber_id"], ["subscribers.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("content_id", "subscriber_id"),
+        comment="Recipient set frozen for a content item ahead of sending",
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("content_recipients")
+    op.drop_column("content", "prepared_subject")
+    op.drop_column("content", "recipient_count")
+    op.drop_column("content", "audience_frozen_at")
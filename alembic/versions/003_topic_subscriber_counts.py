@@ -0,0 +1,47 @@
+"""Add cached active subscriber count to topics
+
+Revision ID: 003_topic_subscriber_counts
+Revises: 002_audience_snapshots
+Create Date: 2024-02-08 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "003_topic_subscriber_counts"
+down_revision: Union[str, None] = "002_audience_snapshots"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "topics",
+        sa.Column(
+            "active_subscriber_count",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+        ),
+    )
+    op.execute(
+        """
+        UPDATE topics SET active_subscriber_count = counts.n
+        FROM (
+            SELECT subscriptions.topic_id, count(*) AS n
+            FROM subscriptions
+            JOIN subscribers ON subscribers.id = subscriptions.subscriber_id
+            WHERE subscriptions.is_active AND subscribers.is_active
+            GROUP BY subscriptions.topic_id
+        ) AS counts
+        WHERE topics.id = counts.topic_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("topics", "active_subscriber_count")
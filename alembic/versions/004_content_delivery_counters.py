@@ -0,0 +1,34 @@
+"""Add sent_count and failed_count delivery counters to content
+
+Revision ID: 004_content_delivery_counters
+Revises: 003_topic_subscriber_counts
+Create Date: 2024-02-15 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "004_content_delivery_counters"
+down_revision: Union[str, None] = "003_topic_subscriber_counts"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "content",
+        sa.Column("sent_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "content",
+        sa.Column("failed_count", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("content", "failed_count")
+    op.drop_column("content", "sent_count")
@@ -0,0 +1,57 @@
+"""Add suppressions table and suppressed_count on content
+
+Revision ID: 006_suppressions
+Revises: 005_dead_letters
+Create Date: 2024-02-29 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "006_suppressions"
+down_revision: Union[str, None] = "005_dead_letters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    suppression_reason_enum = postgresql.ENUM(
+        "bounced", "complained", "invalid", "unsubscribed", name="suppressionreason"
+    )
+
+    op.create_table(
+        "suppressions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("reason", suppression_reason_enum, nullable=False),
+        sa.Column("source", sa.String(length=50), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_suppressions_id"), "suppressions", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_suppressions_email"), "suppressions", ["email"], unique=True
+    )
+
+    op.add_column(
+        "content",
+        sa.Column("suppressed_count", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("content", "suppressed_count")
+    op.drop_index(op.f("ix_suppressions_email"), table_name="suppressions")
+    op.drop_index(op.f("ix_suppressions_id"), table_name="suppressions")
+    op.drop_table("suppressions")
+    op.execute("DROP TYPE IF EXISTS suppressionreason")
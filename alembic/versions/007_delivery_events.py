@@ -0,0 +1,51 @@
+"""Add delivery_events ledger for provider webhook events
+
+Revision ID: 007_delivery_events
+Revises: 006_suppressions
+Create Date: 2024-03-07 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "007_delivery_events"
+down_revision: Union[str, None] = "006_suppressions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "delivery_events",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("event", sa.String(length=50), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("message_id", sa.String(length=255), nullable=True),
+        sa.Column("tag", sa.String(length=255), nullable=True),
+        sa.Column("reason", sa.Text(), nullable=True),
+        sa.Column("occurred_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "received_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        comment="Ledger of delivery events reported by the email provider",
+    )
+    op.create_index(
+        op.f("ix_delivery_events_event"), "delivery_events", ["event"], unique=False
+    )
+    op.create_index(
+        op.f("ix_delivery_events_email"), "delivery_events", ["email"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_delivery_events_email"), table_name="delivery_events")
+    op.drop_index(op.f("ix_delivery_events_event"), table_name="delivery_events")
+    op.drop_table("delivery_events")
@@ -0,0 +1,31 @@
+"""Add paused content status and send_cursor for resumable sends
+
+Revision ID: 008_send_control
+Revises: 007_delivery_events
+Create Date: 2024-03-14 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "008_send_control"
+down_revision: Union[str, None] = "007_delivery_events"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ALTER TYPE ... ADD VALUE cannot run inside a transaction block on older PostgreSQL
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE contentstatus ADD VALUE IF NOT EXISTS 'paused' AFTER 'pending'")
+    op.add_column("content", sa.Column("send_cursor", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    # PostgreSQL cannot drop enum values; paused content goes back to pending
+    op.execute("UPDATE content SET status = 'pending' WHERE status = 'paused'")
+    op.drop_column("content", "send_cursor")
@@ -0,0 +1,51 @@
+"""Add send_chunks for chunked bulk sends and content priority
+
+Revision ID: 009_send_chunks
+Revises: 008_send_control
+Create Date: 2024-03-21 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "009_send_chunks"
+down_revision: Union[str, None] = "008_send_control"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "content",
+        sa.Column("priority", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.create_table(
+        "send_chunks",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("content_id", sa.Integer(), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("first_subscriber_id", sa.Integer(), nullable=False),
+        sa.Column("last_subscriber_id", sa.Integer(), nullable=False),
+        sa.Column("cursor", sa.Integer(), nullable=True),
+        sa.Column("dispatched_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["content_id"], ["content.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("content_id", "seq", name="uq_send_chunks_content_seq"),
+        comment="Subscriber id ranges of a bulk send, dispatched a few at a time",
+    )
+    op.create_index(op.f("ix_send_chunks_id"), "send_chunks", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_send_chunks_content_id"), "send_chunks", ["content_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_send_chunks_content_id"), table_name="send_chunks")
+    op.drop_index(op.f("ix_send_chunks_id"), table_name="send_chunks")
+    op.drop_table("send_chunks")
+    op.drop_column("content", "priority")
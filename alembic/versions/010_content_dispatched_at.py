@@ -0,0 +1,28 @@
+"""Add dispatched_at to content for backlog-aware dispatch
+
+Revision ID: 010_content_dispatched_at
+Revises: 009_send_chunks
+Create Date: 2024-03-28 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "010_content_dispatched_at"
+down_revision: Union[str, None] = "009_send_chunks"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "content", sa.Column("dispatched_at", sa.DateTime(timezone=True), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("content", "dispatched_at")
@@ -0,0 +1,34 @@
+"""Add digest flag to topics and content
+
+Revision ID: 011_digest_mode
+Revises: 010_content_dispatched_at
+Create Date: 2024-04-04 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "011_digest_mode"
+down_revision: Union[str, None] = "010_content_dispatched_at"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "topics",
+        sa.Column("digest", sa.Boolean(), server_default="false", nullable=False),
+    )
+    op.add_column(
+        "content",
+        sa.Column("digest", sa.Boolean(), server_default="false", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("content", "digest")
+    op.drop_column("topics", "digest")
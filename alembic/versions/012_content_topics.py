@@ -0,0 +1,38 @@
+"""Add content_topics for content sent to several topics
+
+Revision ID: 012_content_topics
+Revises: 011_digest_mode
+Create Date: 2024-04-11 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "012_content_topics"
+down_revision: Union[str, None] = "011_digest_mode"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "content_topics",
+        sa.Column("content_id", sa.Integer(), nullable=False),
+        sa.Column("topic_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["content_id"], ["content.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["topic_id"], ["topics.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("content_id", "topic_id"),
+        comment="Additional topics a content item is sent to",
+    )
+    op.create_index(
+        op.f("ix_content_topics_topic_id"), "content_topics", ["topic_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_content_topics_topic_id"), table_name="content_topics")
+    op.drop_table("content_topics")
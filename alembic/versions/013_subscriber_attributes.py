@@ -0,0 +1,49 @@
+"""Add subscriber attributes and content segments
+
+Revision ID: 013_subscriber_attributes
+Revises: 012_content_topics
+Create Date: 2024-04-18 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "013_subscriber_attributes"
+down_revision: Union[str, None] = "012_content_topics"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "subscribers",
+        sa.Column(
+            "attributes",
+            postgresql.JSONB(astext_type=sa.Text()),
+            server_default=sa.text("'{}'::jsonb"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_subscribers_attributes",
+        "subscribers",
+        ["attributes"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"attributes": "jsonb_path_ops"},
+    )
+    op.add_column(
+        "content",
+        sa.Column("segment", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("content", "segment")
+    op.drop_index("ix_subscribers_attributes", table_name="subscribers")
+    op.drop_column("subscribers", "attributes")
@@ -0,0 +1,36 @@
+"""Add prepared HTML, text alternative and tracked links to content
+
+Revision ID: 014_content_prepared_body
+Revises: 013_subscriber_attributes
+Create Date: 2024-04-25 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "014_content_prepared_body"
+down_revision: Union[str, None] = "013_subscriber_attributes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("content", sa.Column("prepared_html", sa.Text(), nullable=True))
+    op.add_column("content", sa.Column("prepared_text", sa.Text(), nullable=True))
+    op.add_column(
+        "content",
+        sa.Column(
+            "prepared_links", postgresql.JSONB(astext_type=sa.Text()), nullable=True
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("content", "prepared_links")
+    op.drop_column("content", "prepared_text")
+    op.drop_column("content", "prepared_html")
@@ -0,0 +1,51 @@
+"""Add dispatch outbox
+
+Revision ID: 015_dispatch_outbox
+Revises: 014_content_prepared_body
+Create Date: 2024-05-02 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "015_dispatch_outbox"
+down_revision: Union[str, None] = "014_content_prepared_body"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dispatch_outbox",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("task", sa.String(length=255), nullable=False),
+        sa.Column("args", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("queue", sa.String(length=100), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.Column("published_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("consumed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        comment="Task messages written with the claim that caused them, relayed to the broker",
+    )
+    op.create_index(
+        "ix_dispatch_outbox_unpublished",
+        "dispatch_outbox",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("published_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_dispatch_outbox_unpublished", table_name="dispatch_outbox")
+    op.drop_table("dispatch_outbox")
@@ -0,0 +1,51 @@
+"""Add task run history
+
+Revision ID: 016_task_runs
+Revises: 015_dispatch_outbox
+Create Date: 2024-05-09 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "016_task_runs"
+down_revision: Union[str, None] = "015_dispatch_outbox"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "task_runs",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("task", sa.String(length=255), nullable=False),
+        sa.Column("task_id", sa.String(length=255), nullable=True),
+        sa.Column("content_id", sa.Integer(), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("summary", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("duration_ms", sa.Integer(), nullable=True),
+        sa.Column("worker", sa.String(length=255), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        comment="Compact history of Celery task runs, written in batches",
+    )
+    op.create_index(
+        op.f("ix_task_runs_content_id"), "task_runs", ["content_id"], unique=False
+    )
+    op.create_index(
+        "ix_task_runs_task_finished_at",
+        "task_runs",
+        ["task", "finished_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_task_runs_task_finished_at", table_name="task_runs")
+    op.drop_index(op.f("ix_task_runs_content_id"), table_name="task_runs")
+    op.drop_table("task_runs")
@@ -0,0 +1,30 @@
+"""Add a send lease to content
+
+Revision ID: 017_content_send_lease
+Revises: 016_task_runs
+Create Date: 2024-05-16 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "017_content_send_lease"
+down_revision: Union[str, None] = "016_task_runs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("content", sa.Column("sending_by", sa.String(length=255), nullable=True))
+    op.add_column(
+        "content", sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("content", "heartbeat_at")
+    op.drop_column("content", "sending_by")
@@ -0,0 +1,29 @@
+"""Count outstanding retry batches of content
+
+Revision ID: 018_content_retries_pending
+Revises: 017_content_send_lease
+Create Date: 2024-05-17 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "018_content_retries_pending"
+down_revision: Union[str, None] = "017_content_send_lease"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "content",
+        sa.Column("retries_pending", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("content", "retries_pending")
@@ -0,0 +1,27 @@
+"""Index task runs by finish time for retention
+
+Revision ID: 019_task_runs_finished_at
+Revises: 018_content_retries_pending
+Create Date: 2024-05-18 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "019_task_runs_finished_at"
+down_revision: Union[str, None] = "018_content_retries_pending"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f("ix_task_runs_finished_at"), "task_runs", ["finished_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_task_runs_finished_at"), table_name="task_runs")
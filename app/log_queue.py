@@ -0,0 +1,87 @@
+"""
+Non-blocking log output for Celery workers.
+
+``log_queue.install`` moves the handlers of the root logger behind a
+``QueueHandler``: emitting a record only puts it on an in-memory queue and a
+``QueueListener`` thread does the formatting and I/O. Prefork children get
+their own queue and listener thread after the fork.
+
+``LOG_FORMAT=json`` formats records as one JSON object per line, including
+attributes passed with ``extra``.
+"""
+
+import os
+import json
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
+
+LOG_QUEUE_ENABLED = os.getenv("LOG_QUEUE_ENABLED", "true").lower() == "true"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+
+# Attributes every LogRecord has; anything else was passed with ``extra``
+STANDARD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in STANDARD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class LogQueue:
+    def __init__(self):
+        self.handler: Optional[QueueHandler] = None
+        self.listener: Optional[QueueListener] = None
+        self.running = False
+
+    def install(self, logger: logging.Logger) -> None:
+        """Route ``logger``'s handlers through the queue."""
+        handlers: List[logging.Handler] = [
+            handler
+            for handler in logger.handlers
+            if not isinstance(handler, QueueHandler)
+        ]
+        if not handlers or self.listener is not None:
+            return
+        if LOG_FORMAT == "json":
+            for handler in handlers:
+                handler.setFormatter(JsonFormatter())
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        self.handler = QueueHandler(records)
+        self.listener = QueueListener(records, *handlers, respect_handler_level=True)
+        self.listener.start()
+        self.running = True
+        logger.handlers = [self.handler]
+
+    def after_fork(self) -> None:
+        """Start a listener in a forked child, whose copy of the thread is gone."""
+        if self.listener is None:
+            return
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        self.handler.queue = records
+        self.listener = QueueListener(
+            records, *self.listener.handlers, respect_handler_level=True
+        )
+        self.listener.start()
+        self.running = True
+
+    def stop(self) -> None:
+        """Write out the queued records and stop the listener."""
+        if self.running:
+            self.listener.stop()
+            self.running = False
+
+
+log_queue = LogQueue()
@@ -1,12 +1,34 @@
 from fastapi import FastAPI
-from app.routers import topics, subscribers, subscriptions, content
+from app.routers import (
+    topics,
+    subscribers,
+    subscriptions,
+    content,
+    dead_letters,
+    suppressions,
+    webhooks,
+    tracking,
+    task_runs,
+    debug,
+    health,
+)
+from app.timing import RequestTimingMiddleware, TimedRoute
 
 app = FastAPI(title="Newsletter Service", version="1.0.0")
+app.router.route_class = TimedRoute
+app.add_middleware(RequestTimingMiddleware)
 
 app.include_router(topics.router)
 app.include_router(subscribers.router)
 app.include_router(subscriptions.router)
 app.include_router(content.router)
+app.include_router(dead_letters.router)
+app.include_router(suppressions.router)
+app.include_router(webhooks.router)
+app.include_router(tracking.router)
+app.include_router(task_runs.router)
+app.include_router(debug.router)
+app.include_router(health.router)
 
 
 @app.get("/health")
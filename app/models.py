@@ -1,17 +1,28 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, ForeignKey, Index, Text, UniqueConstraint, Enum as SQLEnum, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, aggregate_order_by, array
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
+from typing import List
 from app.database import Base
 
 
 class ContentStatus(str, enum.Enum):
     PENDING = "pending"
+    PAUSED = "paused"
     SENT = "sent"
     FAILED = "failed"
     CANCELLED = "cancelled"
 
 
+class SuppressionReason(str, enum.Enum):
+    BOUNCED = "bounced"
+    COMPLAINED = "complained"
+    INVALID = "invalid"
+    UNSUBSCRIBED = "unsubscribed"
+
+
 class Topic(Base):
     __tablename__ = "topics"
 
@@ -20,6 +31,8 @@ class Topic(Base):
     description = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     is_active = Column(Boolean, default=True, nullable=False)
+    active_subscriber_count = Column(Integer, default=0, server_default="0", nullable=False)
+    digest = Column(Boolean, default=False, server_default="false", nullable=False)
 
     subscriptions = relationship("Subscription", back_populates="topic", cascade="all, delete-orphan")
     content = relationship("Content", back_populates="topic", cascade="all, delete-orphan")
@@ -32,9 +45,22 @@ class Subscriber(Base):
     email = Column(String(255), unique=True, nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     is_active = Column(Boolean, default=True, nullable=False)
+    attributes = Column(
+        JSONB, default=dict, server_default=text("'{}'::jsonb"), nullable=False
+    )
 
     subscriptions = relationship("Subscription", back_populates="subscriber", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Serves segment containment filters (attributes @> '{...}')
+        Index(
+            "ix_subscribers_attributes",
+            "attributes",
+            postgresql_using="gin",
+            postgresql_ops={"attributes": "jsonb_path_ops"},
+        ),
+    )
+
 
 class Subscription(Base):
     __tablename__ = "subscriptions"
@@ -80,6 +106,194 @@ class Content(Base):
     )
     sent_at = Column(DateTime(timezone=True), nullable=True)
     error_message = Column(Text, nullable=True)
+    audience_frozen_at = Column(DateTime(timezone=True), nullable=True)
+    recipient_count = Column(Integer, nullable=True)
+    prepared_subject = Column(String(255), nullable=True)
+    # Minified, link-tracked HTML and plain-text alternative, built on write
+    prepared_html = Column(Text, nullable=True)
+    prepared_text = Column(Text, nullable=True)
+    prepared_links = Column(JSONB(none_as_null=True), nullable=True)
+    sent_count = Column(Integer, default=0, server_default="0", nullable=False)
+    failed_count = Column(Integer, default=0, server_default="0", nullable=False)
+    suppressed_count = Column(Integer, default=0, server_default="0", nullable=False)
+    send_cursor = Column(Integer, nullable=True)
+    priority = Column(Integer, default=0, server_default="0", nullable=False)
+    dispatched_at = Column(DateTime(timezone=True), nullable=True)
+    # Send lease: the task running the send and when it last showed progress
+    sending_by = Column(String(255), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    # Scheduled retry_recipients batches that have not finished yet
+    retries_pending = Column(Integer, default=0, server_default="0", nullable=False)
+    digest = Column(Boolean, default=False, server_default="false", nullable=False)
+    segment = Column(JSONB(none_as_null=True), nullable=True)
 
     topic = relationship("Topic", back_populates="content")
+    additional_topics = relationship(
+        "Topic", secondary="content_topics", passive_deletes=True
+    )
+
+    @hybrid_property
+    def topic_ids(self) -> List[int]:
+        """All targeted topics: the primary topic first, then additional ones."""
+        extra = {topic.id for topic in self.additional_topics} - {self.topic_id}
+        return [self.topic_id] + sorted(extra)
+
+    @topic_ids.expression
+    def topic_ids(cls):
+        # Same order in SQL, so projected list queries return it per row
+        extra = (
+            select(
+                func.array_agg(
+                    aggregate_order_by(ContentTopic.topic_id, ContentTopic.topic_id)
+                )
+            )
+            .where(
+                ContentTopic.content_id == cls.id,
+                ContentTopic.topic_id != cls.topic_id,
+            )
+            .scalar_subquery()
+        )
+        return func.array_cat(array([cls.topic_id]), extra, type_=ARRAY(Integer))
+
+
+class ContentTopic(Base):
+    __tablename__ = "content_topics"
+
+    content_id = Column(
+        Integer, ForeignKey("content.id", ondelete="CASCADE"), primary_key=True
+    )
+    topic_id = Column(
+        Integer, ForeignKey("topics.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+
+    __table_args__ = (
+        {"comment": "Additional topics a content item is sent to"}
+    )
+
+
+class ContentRecipient(Base):
+    __tablename__ = "content_recipients"
+
+    content_id = Column(
+        Integer, ForeignKey("content.id", ondelete="CASCADE"), primary_key=True
+    )
+    subscriber_id = Column(
+        Integer, ForeignKey("subscribers.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    __table_args__ = (
+        {"comment": "Recipient set frozen for a content item ahead of sending"}
+    )
+
+
+class SendChunk(Base):
+    __tablename__ = "send_chunks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_id = Column(
+        Integer, ForeignKey("content.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    seq = Column(Integer, nullable=False)
+    first_subscriber_id = Column(Integer, nullable=False)
+    last_subscriber_id = Column(Integer, nullable=False)
+    cursor = Column(Integer, nullable=True)
+    dispatched_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("content_id", "seq", name="uq_send_chunks_content_seq"),
+        {"comment": "Subscriber id ranges of a bulk send, dispatched a few at a time"},
+    )
+
+
+class DispatchOutbox(Base):
+    __tablename__ = "dispatch_outbox"
 
+    id = Column(BigInteger, primary_key=True)
+    task = Column(String(255), nullable=False)
+    args = Column(JSONB, nullable=False)
+    queue = Column(String(100), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    published_at = Column(DateTime(timezone=True), nullable=True)
+    consumed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_dispatch_outbox_unpublished",
+            "id",
+            postgresql_where=published_at.is_(None),
+        ),
+        {"comment": "Task messages written with the claim that caused them, relayed to the broker"},
+    )
+
+
+class DeadLetter(Base):
+    __tablename__ = "dead_letters"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_id = Column(
+        Integer, ForeignKey("content.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    subscriber_id = Column(
+        Integer, ForeignKey("subscribers.id", ondelete="CASCADE"), nullable=False
+    )
+    email = Column(String(255), nullable=False)
+    reason = Column(Text, nullable=False)
+    attempts = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    replayed_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class Suppression(Base):
+    __tablename__ = "suppressions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    email = Column(String(255), unique=True, nullable=False, index=True)
+    reason = Column(
+        SQLEnum(
+            SuppressionReason,
+            name="suppressionreason",
+            values_callable=lambda enum_cls: [member.value for member in enum_cls],
+            native_enum=True,
+        ),
+        nullable=False,
+    )
+    source = Column(String(50), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class DeliveryEvent(Base):
+    __tablename__ = "delivery_events"
+
+    id = Column(BigInteger, primary_key=True)
+    event = Column(String(50), nullable=False, index=True)
+    email = Column(String(255), nullable=False, index=True)
+    message_id = Column(String(255), nullable=True)
+    tag = Column(String(255), nullable=True)
+    reason = Column(Text, nullable=True)
+    occurred_at = Column(DateTime(timezone=True), nullable=True)
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        {"comment": "Ledger of delivery events reported by the email provider"}
+    )
+
+
+class TaskRun(Base):
+    __tablename__ = "task_runs"
+
+    id = Column(BigInteger, primary_key=True)
+    task = Column(String(255), nullable=False)
+    task_id = Column(String(255), nullable=True)
+    content_id = Column(Integer, nullable=True, index=True)
+    status = Column(String(20), nullable=False)
+    summary = Column(JSONB, nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+    worker = Column(String(255), nullable=True)
+    # Indexed on its own for retention pruning
+    finished_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    __table_args__ = (
+        Index("ix_task_runs_task_finished_at", "task", "finished_at"),
+        {"comment": "Compact history of Celery task runs, written in batches"},
+    )
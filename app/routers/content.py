@@ -1,16 +1,67 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import exists, or_
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from app.database import get_db
-from app.models import Content, Topic, ContentStatus
-from app.schemas import ContentCreate, ContentUpdate, ContentResponse
+from app.models import Content, ContentTopic, Topic, ContentStatus
+from app.schemas import (
+    ContentCreate,
+    ContentUpdate,
+    ContentResponse,
+    ContentDetailResponse,
+    SendProgress,
+)
+from app.services.audience import clear_audience_snapshot, resolve_subject
+from app.services.delivery import transition_content
+from app.services.send_control import set_send_control
+from app.services.send_lease import SEND_LEASE_SECONDS
+from app.services.preparation import prepare_content
+from app.services.progress import read_progress
+from app.services.templates import TemplateError, validate_template
+from app.serialization import parse_fields, project, response_columns, rows_response
+from app.timing import TimedRoute
 
-router = APIRouter(prefix="/api/content", tags=["content"])
+router = APIRouter(prefix="/api/content", tags=["content"], route_class=TimedRoute)
+
+CONTENT_FIELDS = response_columns(Content, ContentResponse)
+
+
+def _get_topics(db: Session, topic_ids: List[int]) -> List[Topic]:
+    topic_ids = set(topic_ids)
+    topics = db.query(Topic).filter(Topic.id.in_(topic_ids)).all() if topic_ids else []
+    if len(topics) != len(topic_ids):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Topic not found"
+        )
+    return topics
+
+
+def _check_templates(*sources: Optional[str]) -> None:
+    try:
+        for source in sources:
+            validate_template(source)
+    except TemplateError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def _send_started(content: Content) -> bool:
+    """True for an unfinished send that was dispatched or whose sender holds a live lease."""
+    lease_live = content.heartbeat_at is not None and content.heartbeat_at >= (
+        datetime.now(timezone.utc) - timedelta(seconds=SEND_LEASE_SECONDS)
+    )
+    return content.status in (ContentStatus.PENDING, ContentStatus.PAUSED) and (
+        content.dispatched_at is not None or lease_live
+    )
 
 
 @router.post("/", response_model=ContentResponse, status_code=status.HTTP_201_CREATED)
 def create_content(content: ContentCreate, db: Session = Depends(get_db)):
+    _check_templates(content.title, content.body)
     topic = db.query(Topic).filter(Topic.id == content.topic_id).first()
     if not topic:
         raise HTTPException(
@@ -18,8 +69,17 @@ def create_content(content: ContentCreate, db: Session = Depends(get_db)):
             detail="Topic not found"
         )
     
-    db_content = Content(**content.model_dump())
+    data = content.model_dump()
+    additional_topics = _get_topics(
+        db, [topic_id for topic_id in data.pop("topic_ids") if topic_id != topic.id]
+    )
+    if data["digest"] is None:
+        data["digest"] = topic.digest
+    db_content = Content(**data, additional_topics=additional_topics)
     db.add(db_content)
+    # Tracked links need the content id
+    db.flush()
+    prepare_content(db_content)
     db.commit()
     db.refresh(db_content)
     return db_content
@@ -31,20 +91,33 @@ def list_content(
     limit: int = 100,
     topic_id: Optional[int] = Query(None),
     status: Optional[ContentStatus] = Query(None),
+    fields: Optional[str] = Query(
+        None, description="Comma separated list of fields to return, e.g. id,title"
+    ),
     db: Session = Depends(get_db)
 ):
-    query = db.query(Content)
+    columns = parse_fields(fields, CONTENT_FIELDS)
+    query = project(db.query(Content), Content, columns)
     
     if topic_id is not None:
-        query = query.filter(Content.topic_id == topic_id)
+        # Content sent to the topic as an additional topic matches as well
+        query = query.filter(
+            or_(
+                Content.topic_id == topic_id,
+                exists().where(
+                    ContentTopic.content_id == Content.id,
+                    ContentTopic.topic_id == topic_id,
+                ),
+            )
+        )
     if status is not None:
         query = query.filter(Content.status == status.value)
     
     content_list = query.order_by(Content.scheduled_at).offset(skip).limit(limit).all()
-    return content_list
+    return rows_response(content_list)
 
 
-@router.get("/{content_id}", response_model=ContentResponse)
+@router.get("/{content_id}", response_model=ContentDetailResponse)
 def get_content(content_id: int, db: Session = Depends(get_db)):
     content = db.query(Content).filter(Content.id == content_id).first()
     if not content:
@@ -52,12 +125,34 @@ def get_content(content_id: int, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Content not found"
         )
-    return content
+    response = ContentDetailResponse.model_validate(content)
+    progress = read_progress(content)
+    if progress is not None:
+        response.progress = SendProgress(**progress)
+    return response
+
+
+@router.get("/{content_id}/progress", response_model=SendProgress)
+def get_content_progress(content_id: int, db: Session = Depends(get_db)):
+    content = db.query(Content).filter(Content.id == content_id).first()
+    if not content:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Content not found"
+        )
+    progress = read_progress(content)
+    if progress is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Content has not started sending"
+        )
+    return progress
 
 
 @router.patch("/{content_id}", response_model=ContentResponse)
 def update_content(content_id: int, content_update: ContentUpdate, db: Session = Depends(get_db)):
-    content = db.query(Content).filter(Content.id == content_id).first()
+    # Locked so a sender cannot start between the check below and the update
+    content = db.query(Content).filter(Content.id == content_id).with_for_update().first()
     if not content:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -65,6 +160,7 @@ def update_content(content_id: int, content_update: ContentUpdate, db: Session =
         )
     
     update_data = content_update.model_dump(exclude_unset=True)
+    _check_templates(update_data.get("title"), update_data.get("body"))
     
     if "topic_id" in update_data:
         topic = db.query(Topic).filter(Topic.id == update_data["topic_id"]).first()
@@ -74,11 +170,100 @@ def update_content(content_id: int, content_update: ContentUpdate, db: Session =
                 detail="Topic not found"
             )
     
+    retargeted = bool({"topic_id", "topic_ids", "segment"} & update_data.keys())
+    # Clearing the snapshot of a running send would lose its progress and
+    # send again to everyone it already reached
+    if (retargeted or "scheduled_at" in update_data) and _send_started(content):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Cannot retarget or reschedule content that is being sent"
+        )
+    # The primary topic is never stored as an additional one, as on create
+    primary_id = update_data.get("topic_id", content.topic_id)
+    if "topic_ids" in update_data:
+        topic_ids = update_data.pop("topic_ids") or []
+    else:
+        topic_ids = [topic.id for topic in content.additional_topics]
+    if retargeted:
+        content.additional_topics = _get_topics(
+            db, [topic_id for topic_id in topic_ids if topic_id != primary_id]
+        )
+
     for field, value in update_data.items():
         setattr(content, field, value)
+    if "body" in update_data:
+        prepare_content(content)
+
+    # A frozen audience no longer matches a retargeted or rescheduled send
+    if content.audience_frozen_at is not None and (
+        retargeted or "scheduled_at" in update_data
+    ):
+        clear_audience_snapshot(db, content)
+    # The subject is stored with the snapshot
+    if content.audience_frozen_at is not None and "title" in update_data:
+        content.prepared_subject = resolve_subject(content)
+    # A rescheduled send is dispatched again when it becomes due
+    if "scheduled_at" in update_data:
+        content.dispatched_at = None
     
     db.commit()
     db.refresh(content)
     return content
 
 
+def _transition(
+    db: Session,
+    content_id: int,
+    from_statuses: List[ContentStatus],
+    to_status: ContentStatus,
+    action: str,
+) -> Content:
+    content = db.query(Content).filter(Content.id == content_id).first()
+    if not content:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Content not found"
+        )
+    if not transition_content(db, content_id, from_statuses, to_status):
+        db.refresh(content)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot {action} content with status {content.status.value}"
+        )
+    set_send_control(content_id, to_status)
+    db.refresh(content)
+    return content
+
+
+@router.post("/{content_id}/pause", response_model=ContentResponse)
+def pause_content(content_id: int, db: Session = Depends(get_db)):
+    return _transition(
+        db, content_id, [ContentStatus.PENDING], ContentStatus.PAUSED, "pause"
+    )
+
+
+@router.post("/{content_id}/resume", response_model=ContentResponse)
+def resume_content(content_id: int, db: Session = Depends(get_db)):
+    content = _transition(
+        db, content_id, [ContentStatus.PAUSED], ContentStatus.PENDING, "resume"
+    )
+    # The next beat dispatches it through the outbox on the queue its audience
+    # size calls for; the new run waits for the send lease of a sender that
+    # has not noticed the pause yet
+    content.dispatched_at = None
+    db.commit()
+    db.refresh(content)
+    return content
+
+
+@router.post("/{content_id}/cancel", response_model=ContentResponse)
+def cancel_content(content_id: int, db: Session = Depends(get_db)):
+    return _transition(
+        db,
+        content_id,
+        [ContentStatus.PENDING, ContentStatus.PAUSED],
+        ContentStatus.CANCELLED,
+        "cancel",
+    )
+
+
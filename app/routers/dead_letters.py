@@ -0,0 +1,101 @@
+import logging
+from collections import defaultdict
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_db
+from app.models import Content, DeadLetter
+from app.schemas import DeadLetterResponse, DeadLetterReplay
+from app.serialization import project, response_columns, rows_response
+from app.services.delivery import record_retry_scheduled
+from app.services.outbox import add_to_outbox, relay_outbox
+from app.services.recipient_sets import encode_recipient_set
+from app.timing import TimedRoute
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/dead-letters", tags=["dead-letters"], route_class=TimedRoute
+)
+
+DEAD_LETTER_FIELDS = response_columns(DeadLetter, DeadLetterResponse)
+
+
+@router.get("/", response_model=List[DeadLetterResponse])
+def list_dead_letters(
+    skip: int = 0,
+    limit: int = 100,
+    content_id: Optional[int] = Query(None),
+    include_replayed: bool = Query(False),
+    db: Session = Depends(get_db),
+):
+    query = project(db.query(DeadLetter), DeadLetter, DEAD_LETTER_FIELDS)
+
+    if content_id is not None:
+        query = query.filter(DeadLetter.content_id == content_id)
+    if not include_replayed:
+        query = query.filter(DeadLetter.replayed_at.is_(None))
+
+    dead_letters = query.order_by(DeadLetter.id).offset(skip).limit(limit).all()
+    return rows_response(dead_letters)
+
+
+@router.post("/replay")
+def replay_dead_letters(replay: DeadLetterReplay, db: Session = Depends(get_db)):
+    from app.tasks.newsletter_tasks import retry_recipients
+    from celery_worker import celery, SEND_SMALL_QUEUE
+
+    if not replay.ids and replay.content_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide dead letter ids or a content_id to replay",
+        )
+
+    query = update(DeadLetter).where(DeadLetter.replayed_at.is_(None))
+    if replay.ids:
+        query = query.where(DeadLetter.id.in_(replay.ids))
+    if replay.content_id is not None:
+        query = query.where(DeadLetter.content_id == replay.content_id)
+
+    rows = db.execute(
+        query.values(replayed_at=func.now())
+        .returning(DeadLetter.content_id, DeadLetter.subscriber_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    by_content = defaultdict(list)
+    for row in rows:
+        by_content[row.content_id].append(row.subscriber_id)
+
+    # Replayed recipients are no longer counted as failed until they fail again
+    for content_id, subscriber_ids in by_content.items():
+        db.execute(
+            update(Content)
+            .where(Content.id == content_id)
+            .values(failed_count=Content.failed_count - len(subscriber_ids))
+            .execution_options(synchronize_session=False)
+        )
+        record_retry_scheduled(db, content_id, 0)
+    # The retry tasks are committed with the replay and published afterwards;
+    # if the broker is down, relay_outbox publishes them later
+    add_to_outbox(
+        db,
+        [
+            {
+                "task": retry_recipients.name,
+                "args": [content_id, encode_recipient_set(subscriber_ids), 1],
+                "queue": SEND_SMALL_QUEUE,
+            }
+            for content_id, subscriber_ids in by_content.items()
+        ],
+    )
+    db.commit()
+
+    if by_content:
+        try:
+            relay_outbox(db, celery)
+        except Exception as e:
+            logger.error(f"Relaying dead letter replays failed, will retry: {str(e)}")
+
+    return {"replayed": len(rows), "content_ids": sorted(by_content)}
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, HTTPException, status
+from typing import Any, Dict, List
+from app.schemas import ProfileSummary
+from app.services.profiling import task_profiler
+from app.timing import TimedRoute
+
+router = APIRouter(prefix="/api/debug", tags=["debug"], route_class=TimedRoute)
+
+
+@router.get("/profiles", response_model=List[ProfileSummary])
+def list_profiles():
+    """Task profiles written to ``PROFILE_DIR``, most recent first."""
+    return task_profiler.reports()
+
+
+@router.get("/profiles/{name}")
+def get_profile(name: str) -> Dict[str, Any]:
+    report = task_profiler.report(name)
+    if report is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found",
+        )
+    return report
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from app.database import engine
+from app.services.health import (
+    check_database,
+    check_redis,
+    probe_engine,
+    queue_depths,
+    scheduling_stats,
+)
+from app.timing import TimedRoute
+from celery_worker import celery
+
+router = APIRouter(prefix="/health", tags=["health"], route_class=TimedRoute)
+
+
+@router.get("/ready")
+def readiness():
+    """
+    Whether this instance can serve requests: Postgres answers within the
+    health timeout and the connection pool is not exhausted.
+    """
+    database = check_database(engine)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK
+        if database["ok"]
+        else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if database["ok"] else "unavailable",
+            "database": database,
+        },
+    )
+
+
+@router.get("/deep")
+def deep_health():
+    """
+    Dependency latencies, pool and queue stats and scheduling lag.
+
+    ``fail`` (503) when Postgres is unreachable, ``degraded`` when Redis or
+    the broker is, beat has not run recently, due content is waiting too long
+    or the scheduling queries time out. They run on the probe engine, so a
+    slow database or a busy pool cannot hang the check.
+    """
+    database = check_database(engine)
+    report = {
+        "database": database,
+        "redis": check_redis(),
+        "broker": queue_depths(
+            celery, [queue.name for queue in celery.conf.task_queues]
+        ),
+    }
+    if database["ok"]:
+        try:
+            with Session(probe_engine(engine)) as db:
+                report["scheduling"] = scheduling_stats(db)
+        except Exception as e:
+            report["scheduling"] = {"error": str(e)}
+
+    scheduling = report.get("scheduling", {})
+    if not database["ok"]:
+        health = "fail"
+    elif (
+        not report["redis"]["ok"]
+        or not report["broker"]["ok"]
+        or "error" in scheduling
+        or scheduling["beat_stale"]
+        or scheduling["backlog_stale"]
+    ):
+        health = "degraded"
+    else:
+        health = "ok"
+
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        if health == "fail"
+        else status.HTTP_200_OK,
+        content={"status": health, **report},
+    )
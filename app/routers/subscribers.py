@@ -1,11 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
-from app.models import Subscriber
-from app.schemas import SubscriberCreate, SubscriberUpdate, SubscriberResponse
+from app.models import Subscriber, SuppressionReason
+from app.schemas import (
+    SegmentCount,
+    SegmentQuery,
+    SubscriberCreate,
+    SubscriberUpdate,
+    SubscriberResponse,
+)
+from app.serialization import project, response_columns, rows_response
+from app.services.audience import (
+    adjust_topic_counts_for_subscribers,
+    count_audience,
+    deactivate_subscribers,
+)
+from app.services.suppression import suppress
+from app.services.unsubscribe import verify_unsubscribe_token
+from app.timing import TimedRoute
+
+router = APIRouter(
+    prefix="/api/subscribers", tags=["subscribers"], route_class=TimedRoute
+)
 
-router = APIRouter(prefix="/api/subscribers", tags=["subscribers"])
+SUBSCRIBER_FIELDS = response_columns(Subscriber, SubscriberResponse)
 
 
 @router.post(
@@ -29,8 +49,77 @@ def create_subscriber(subscriber: SubscriberCreate, db: Session = Depends(get_db
 
 @router.get("/", response_model=List[SubscriberResponse])
 def list_subscribers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    subscribers = db.query(Subscriber).offset(skip).limit(limit).all()
-    return subscribers
+    subscribers = (
+        project(db.query(Subscriber), Subscriber, SUBSCRIBER_FIELDS)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return rows_response(subscribers)
+
+
+@router.post("/count", response_model=SegmentCount)
+def count_segment(query: SegmentQuery, db: Session = Depends(get_db)):
+    """Dry run: count the active subscribers a topic/segment send would reach."""
+    return {"count": count_audience(db, query.topic_ids, query.segment)}
+
+
+# Served on GET so mail scanners and link prefetchers, which follow every
+# link, never unsubscribe anyone; the button POSTs back to the same URL
+UNSUBSCRIBE_CONFIRMATION = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta name="robots" content="noindex">
+<title>Unsubscribe</title>
+</head>
+<body>
+<form method="post">
+<p>Stop receiving these emails?</p>
+<button type="submit">Unsubscribe</button>
+</form>
+</body>
+</html>
+"""
+
+
+def _subscriber_for_token(db: Session, token: str) -> Subscriber:
+    subscriber_id = verify_unsubscribe_token(token)
+    subscriber = (
+        db.query(Subscriber).filter(Subscriber.id == subscriber_id).first()
+        if subscriber_id is not None
+        else None
+    )
+    if not subscriber:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Invalid unsubscribe link"
+        )
+    return subscriber
+
+
+@router.get("/unsubscribe/{token}", response_class=HTMLResponse)
+def confirm_unsubscribe(token: str, db: Session = Depends(get_db)):
+    """
+    Unsubscribe link target from the ``{{ unsubscribe_url }}`` merge tag.
+
+    Only shows a confirmation form; nothing changes until it is submitted.
+    """
+    _subscriber_for_token(db, token)
+    return HTMLResponse(UNSUBSCRIBE_CONFIRMATION)
+
+
+@router.post("/unsubscribe/{token}")
+def unsubscribe(token: str, db: Session = Depends(get_db)):
+    """
+    Unsubscribe a subscriber: the confirmation form and RFC 8058 one-click
+    unsubscribe both POST here. Repeated calls are harmless.
+    """
+    subscriber = _subscriber_for_token(db, token)
+    suppress(db, [(subscriber.email, SuppressionReason.UNSUBSCRIBED)], source="link")
+    deactivate_subscribers(db, [subscriber.email])
+    db.commit()
+    return {"status": "unsubscribed"}
 
 
 @router.get("/{subscriber_id}", response_model=SubscriberResponse)
@@ -56,6 +145,8 @@ def update_subscriber(
         )
 
     update_data = subscriber_update.model_dump(exclude_unset=True)
+    if update_data.get("attributes", {}) is None:
+        update_data["attributes"] = {}
     if "email" in update_data:
         existing_subscriber = (
             db.query(Subscriber)
@@ -70,9 +161,15 @@ def update_subscriber(
                 detail="Subscriber with this email already exists",
             )
 
+    was_active = subscriber.is_active
     for field, value in update_data.items():
         setattr(subscriber, field, value)
 
+    if subscriber.is_active != was_active:
+        adjust_topic_counts_for_subscribers(
+            db, [subscriber.id], 1 if subscriber.is_active else -1
+        )
+
     db.commit()
     db.refresh(subscriber)
     return subscriber
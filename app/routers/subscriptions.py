@@ -4,8 +4,15 @@ from typing import List, Optional
 from app.database import get_db
 from app.models import Subscription, Subscriber, Topic
 from app.schemas import SubscriptionCreate, SubscriptionUpdate, SubscriptionResponse
+from app.serialization import project, response_columns, rows_response
+from app.services.audience import adjust_topic_counts
+from app.timing import TimedRoute
 
-router = APIRouter(prefix="/api/subscriptions", tags=["subscriptions"])
+router = APIRouter(
+    prefix="/api/subscriptions", tags=["subscriptions"], route_class=TimedRoute
+)
+
+SUBSCRIPTION_FIELDS = response_columns(Subscription, SubscriptionResponse)
 
 
 @router.post(
@@ -44,6 +51,8 @@ def create_subscription(
 
     db_subscription = Subscription(**subscription.model_dump())
     db.add(db_subscription)
+    if subscriber.is_active:
+        adjust_topic_counts(db, [subscription.topic_id], 1)
     db.commit()
     db.refresh(db_subscription)
     return db_subscription
@@ -57,7 +66,7 @@ def list_subscriptions(
     topic_id: Optional[int] = Query(None),
     db: Session = Depends(get_db),
 ):
-    query = db.query(Subscription)
+    query = project(db.query(Subscription), Subscription, SUBSCRIPTION_FIELDS)
 
     if subscriber_id is not None:
         query = query.filter(Subscription.subscriber_id == subscriber_id)
@@ -65,7 +74,7 @@ def list_subscriptions(
         query = query.filter(Subscription.topic_id == topic_id)
 
     subscriptions = query.offset(skip).limit(limit).all()
-    return subscriptions
+    return rows_response(subscriptions)
 
 
 @router.patch("/{subscription_id}", response_model=SubscriptionResponse)
@@ -83,9 +92,15 @@ def update_subscription(
         )
 
     update_data = subscription_update.model_dump(exclude_unset=True)
+    was_active = subscription.is_active
     for field, value in update_data.items():
         setattr(subscription, field, value)
 
+    if subscription.is_active != was_active and subscription.subscriber.is_active:
+        adjust_topic_counts(
+            db, [subscription.topic_id], 1 if subscription.is_active else -1
+        )
+
     db.commit()
     db.refresh(subscription)
     return subscription
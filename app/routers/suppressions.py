@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_db
+from app.models import Suppression, SuppressionReason
+from app.schemas import SuppressionBatch, SuppressionResponse
+from app.serialization import project, response_columns, rows_response
+from app.services.suppression import normalize_email, suppress
+from app.timing import TimedRoute
+
+router = APIRouter(
+    prefix="/api/suppressions", tags=["suppressions"], route_class=TimedRoute
+)
+
+SUPPRESSION_FIELDS = response_columns(Suppression, SuppressionResponse)
+
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
+def ingest_suppressions(batch: SuppressionBatch, db: Session = Depends(get_db)):
+    added = suppress(
+        db, [(entry.email, entry.reason) for entry in batch.entries], source="api"
+    )
+    db.commit()
+    return {"received": len(batch.entries), "added": added}
+
+
+@router.get("/", response_model=List[SuppressionResponse])
+def list_suppressions(
+    skip: int = 0,
+    limit: int = 100,
+    reason: Optional[SuppressionReason] = Query(None),
+    db: Session = Depends(get_db),
+):
+    query = project(db.query(Suppression), Suppression, SUPPRESSION_FIELDS)
+
+    if reason is not None:
+        query = query.filter(Suppression.reason == reason.value)
+
+    suppressions = query.order_by(Suppression.id).offset(skip).limit(limit).all()
+    return rows_response(suppressions)
+
+
+@router.delete("/{email}", status_code=status.HTTP_200_OK)
+def delete_suppression(email: str, db: Session = Depends(get_db)):
+    suppression = (
+        db.query(Suppression)
+        .filter(Suppression.email == normalize_email(email))
+        .first()
+    )
+    if not suppression:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Suppression not found"
+        )
+    db.delete(suppression)
+    db.commit()
+    return {"message": "Suppression deleted successfully"}
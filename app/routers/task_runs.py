@@ -0,0 +1,39 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_db
+from app.models import TaskRun
+from app.schemas import TaskRunResponse
+from app.serialization import project, response_columns, rows_response
+from app.timing import TimedRoute
+
+router = APIRouter(prefix="/api/task-runs", tags=["task-runs"], route_class=TimedRoute)
+
+TASK_RUN_FIELDS = response_columns(TaskRun, TaskRunResponse)
+
+
+@router.get("/", response_model=List[TaskRunResponse])
+def list_task_runs(
+    skip: int = 0,
+    limit: int = 100,
+    task: Optional[str] = Query(None),
+    content_id: Optional[int] = Query(None),
+    status: Optional[str] = Query(None),
+    since: Optional[datetime] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """Most recent task runs first, optionally filtered."""
+    query = project(db.query(TaskRun), TaskRun, TASK_RUN_FIELDS)
+
+    if task is not None:
+        query = query.filter(TaskRun.task == task)
+    if content_id is not None:
+        query = query.filter(TaskRun.content_id == content_id)
+    if status is not None:
+        query = query.filter(TaskRun.status == status)
+    if since is not None:
+        query = query.filter(TaskRun.finished_at >= since)
+
+    runs = query.order_by(TaskRun.id.desc()).offset(skip).limit(limit).all()
+    return rows_response(runs)
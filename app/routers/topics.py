@@ -1,11 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
-from app.models import Topic
-from app.schemas import TopicCreate, TopicUpdate, TopicResponse
+from app.models import Topic, Content, ContentStatus
+from app.schemas import TopicCreate, TopicUpdate, TopicResponse, TopicStats
+from app.serialization import project, response_columns, rows_response
+from app.timing import TimedRoute
 
-router = APIRouter(prefix="/api/topics", tags=["topics"])
+router = APIRouter(prefix="/api/topics", tags=["topics"], route_class=TimedRoute)
+
+TOPIC_FIELDS = response_columns(Topic, TopicResponse)
 
 
 @router.post("/", response_model=TopicResponse, status_code=status.HTTP_201_CREATED)
@@ -25,8 +30,36 @@ def create_topic(topic: TopicCreate, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[TopicResponse])
 def list_topics(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    topics = db.query(Topic).offset(skip).limit(limit).all()
-    return topics
+    topics = (
+        project(db.query(Topic), Topic, TOPIC_FIELDS)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return rows_response(topics)
+
+
+@router.get("/stats", response_model=List[TopicStats])
+def topic_stats(db: Session = Depends(get_db)):
+    pending = (
+        db.query(Content.topic_id, func.count().label("pending_content"))
+        .filter(Content.status == ContentStatus.PENDING.value)
+        .group_by(Content.topic_id)
+        .subquery()
+    )
+    rows = (
+        db.query(
+            Topic.id.label("topic_id"),
+            Topic.name,
+            Topic.is_active,
+            Topic.active_subscriber_count,
+            func.coalesce(pending.c.pending_content, 0).label("pending_content"),
+        )
+        .outerjoin(pending, pending.c.topic_id == Topic.id)
+        .order_by(Topic.active_subscriber_count.desc())
+        .all()
+    )
+    return rows_response(rows)
 
 
 @router.get("/{topic_id}", response_model=TopicResponse)
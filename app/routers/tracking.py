@@ -0,0 +1,58 @@
+import time
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import RedirectResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.database import get_db
+from app.models import Content, Subscriber
+from app.services.delivery_events import enqueue_delivery_events, process_delivery_events
+from app.services.unsubscribe import verify_click_token
+from app.timing import TimedRoute
+
+router = APIRouter(prefix="/api/track", tags=["tracking"], route_class=TimedRoute)
+
+
+@router.get("/{content_id}/{link_index}")
+def track_click(
+    content_id: int,
+    link_index: int,
+    s: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Redirect a tracked link to its target and record the click.
+
+    Targets come from the content's prepared links, never from the request,
+    so the endpoint cannot be used as an open redirect. ``s`` is the signed
+    subscriber token of the link; clicks with a missing or forged token
+    redirect without being recorded.
+    """
+    links = (
+        db.query(Content.prepared_links).filter(Content.id == content_id).scalar()
+        or []
+    )
+    if not 0 <= link_index < len(links):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Link not found"
+        )
+
+    subscriber_id = verify_click_token(s) if s else None
+    email = (
+        db.query(Subscriber.email).filter(Subscriber.id == subscriber_id).scalar()
+        if subscriber_id is not None
+        else None
+    )
+    if email:
+        events = [
+            {
+                "event": "click",
+                "email": email,
+                "tag": str(content_id),
+                "reason": links[link_index],
+                "ts_event": int(time.time()),
+            }
+        ]
+        if not enqueue_delivery_events(events):
+            process_delivery_events(db, events)
+
+    return RedirectResponse(links[link_index], status_code=status.HTTP_302_FOUND)
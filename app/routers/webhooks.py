@@ -0,0 +1,48 @@
+import os
+import hmac
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional, Union
+from app.database import get_db
+from app.schemas import BrevoEvent
+from app.services.delivery_events import enqueue_delivery_events, process_delivery_events
+from app.timing import TimedRoute
+
+router = APIRouter(prefix="/api/webhooks", tags=["webhooks"], route_class=TimedRoute)
+
+logger = logging.getLogger(__name__)
+
+# Webhook events deactivate and suppress addresses, so the endpoint refuses
+# every request until a token is configured
+BREVO_WEBHOOK_TOKEN = os.getenv("BREVO_WEBHOOK_TOKEN", "")
+if not BREVO_WEBHOOK_TOKEN:
+    logger.warning("BREVO_WEBHOOK_TOKEN is not set: the Brevo webhook is disabled")
+
+
+@router.post("/brevo", status_code=status.HTTP_202_ACCEPTED)
+def brevo_webhook(
+    payload: Union[List[BrevoEvent], BrevoEvent],
+    token: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+):
+    if not BREVO_WEBHOOK_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Webhook is not configured"
+        )
+    if not hmac.compare_digest((token or "").encode(), BREVO_WEBHOOK_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid webhook token"
+        )
+
+    events = [
+        event.model_dump()
+        for event in (payload if isinstance(payload, list) else [payload])
+    ]
+    if enqueue_delivery_events(events):
+        return {"accepted": len(events), "queued": True}
+
+    # Redis is unavailable: apply the batch inline rather than dropping it
+    process_delivery_events(db, events)
+    return {"accepted": len(events), "queued": False}
@@ -1,12 +1,13 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 from datetime import datetime
-from typing import Optional
-from app.models import ContentStatus
+from typing import Any, Dict, List, Optional
+from app.models import ContentStatus, SuppressionReason
 
 
 class TopicBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
     description: Optional[str] = None
+    digest: bool = False
 
 
 class TopicCreate(TopicBase):
@@ -17,19 +18,30 @@ class TopicUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     description: Optional[str] = None
     is_active: Optional[bool] = None
+    digest: Optional[bool] = None
 
 
 class TopicResponse(TopicBase):
     id: int
     is_active: bool
+    active_subscriber_count: int = 0
     created_at: datetime
 
     class Config:
         from_attributes = True
 
 
+class TopicStats(BaseModel):
+    topic_id: int
+    name: str
+    is_active: bool
+    active_subscriber_count: int
+    pending_content: int
+
+
 class SubscriberBase(BaseModel):
     email: str
+    attributes: Dict[str, Any] = Field(default_factory=dict)
 
 
 class SubscriberCreate(SubscriberBase):
@@ -39,6 +51,7 @@ class SubscriberCreate(SubscriberBase):
 class SubscriberUpdate(BaseModel):
     email: Optional[EmailStr] = None
     is_active: Optional[bool] = None
+    attributes: Optional[Dict[str, Any]] = None
 
 
 class SubscriberResponse(SubscriberBase):
@@ -50,6 +63,16 @@ class SubscriberResponse(SubscriberBase):
         from_attributes = True
 
 
+class SegmentQuery(BaseModel):
+    topic_ids: List[int] = Field(default_factory=list)
+    # Subscribers whose attributes contain this document, e.g. {"plan": "pro"}
+    segment: Optional[Dict[str, Any]] = None
+
+
+class SegmentCount(BaseModel):
+    count: int
+
+
 class SubscriptionCreate(BaseModel):
     subscriber_id: int
     topic_id: int
@@ -75,27 +98,147 @@ class ContentBase(BaseModel):
     title: Optional[str] = Field(None, max_length=255)
     body: str = Field(..., min_length=1)
     scheduled_at: datetime
+    priority: int = Field(0, ge=0, le=9)
+    # Only send to subscribers whose attributes contain this document
+    segment: Optional[Dict[str, Any]] = None
 
 
 class ContentCreate(ContentBase):
-    pass
+    # Other topics to send to; overlapping subscribers get one email
+    topic_ids: List[int] = Field(default_factory=list)
+    # Defaults to the topic's digest setting
+    digest: Optional[bool] = None
 
 
 class ContentUpdate(BaseModel):
     topic_id: Optional[int] = None
+    topic_ids: Optional[List[int]] = None
     title: Optional[str] = Field(None, max_length=255)
     body: Optional[str] = Field(None, min_length=1)
     scheduled_at: Optional[datetime] = None
-    status: Optional[ContentStatus] = None
+    priority: Optional[int] = Field(None, ge=0, le=9)
+    digest: Optional[bool] = None
+    segment: Optional[Dict[str, Any]] = None
+
+    class Config:
+        extra = "forbid"
+
+    @model_validator(mode="before")
+    @classmethod
+    def reject_status(cls, data: Any) -> Any:
+        if isinstance(data, dict) and "status" in data:
+            raise ValueError(
+                "status cannot be updated; use the pause, resume and cancel endpoints"
+            )
+        return data
 
 
 class ContentResponse(ContentBase):
     id: int
+    topic_ids: List[int] = []
     status: ContentStatus
+    digest: bool = False
     created_at: datetime
     updated_at: datetime
     sent_at: Optional[datetime] = None
     error_message: Optional[str] = None
+    sent_count: int = 0
+    failed_count: int = 0
+    suppressed_count: int = 0
 
     class Config:
         from_attributes = True
+
+
+class SendProgress(BaseModel):
+    total: int
+    sent: int
+    failed: int
+    suppressed: int = 0
+    remaining: int
+    rate_per_second: Optional[float] = None
+    started_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    estimated_completion: Optional[datetime] = None
+
+
+class ContentDetailResponse(ContentResponse):
+    progress: Optional[SendProgress] = None
+
+
+class DeadLetterResponse(BaseModel):
+    id: int
+    content_id: int
+    subscriber_id: int
+    email: str
+    reason: str
+    attempts: int
+    created_at: datetime
+    replayed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class DeadLetterReplay(BaseModel):
+    ids: Optional[List[int]] = None
+    content_id: Optional[int] = None
+
+
+class SuppressionEntry(BaseModel):
+    email: str
+    reason: SuppressionReason
+
+
+class SuppressionBatch(BaseModel):
+    entries: List[SuppressionEntry] = Field(..., min_length=1, max_length=10000)
+
+
+class SuppressionResponse(BaseModel):
+    id: int
+    email: str
+    reason: SuppressionReason
+    source: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class TaskRunResponse(BaseModel):
+    id: int
+    task: str
+    task_id: Optional[str] = None
+    content_id: Optional[int] = None
+    status: str
+    summary: Optional[Dict[str, Any]] = None
+    duration_ms: Optional[int] = None
+    worker: Optional[str] = None
+    finished_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ProfileSummary(BaseModel):
+    name: str
+    task: Optional[str] = None
+    task_id: Optional[str] = None
+    content_id: Optional[int] = None
+    state: Optional[str] = None
+    started_at: Optional[datetime] = None
+    duration_ms: Optional[int] = None
+    peak_bytes: Optional[int] = None
+    queries: Optional[int] = None
+
+
+class BrevoEvent(BaseModel):
+    event: str
+    email: str
+    message_id: Optional[str] = Field(None, alias="message-id")
+    tag: Optional[str] = None
+    reason: Optional[str] = None
+    ts_event: Optional[int] = None
+
+    class Config:
+        populate_by_name = True
@@ -0,0 +1,73 @@
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+import orjson
+from fastapi import HTTPException, status
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.ext.hybrid import HybridExtensionType
+from sqlalchemy.orm import Query
+
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson-backed response that formats UTC datetimes like Pydantic does."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        )
+
+
+def response_columns(model: Any, schema: Type[BaseModel]) -> List[str]:
+    """
+    Column and hybrid property names of ``model`` exposed by ``schema``, in
+    schema field order.
+    """
+    mapper = inspect(model)
+    column_names = set(mapper.column_attrs.keys()) | {
+        name
+        for name, descriptor in mapper.all_orm_descriptors.items()
+        if descriptor.extension_type is HybridExtensionType.HYBRID_PROPERTY
+    }
+    return [name for name in schema.model_fields if name in column_names]
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> List[str]:
+    """
+    Parse a comma separated ``fields`` query parameter.
+
+    Returns all allowed fields when ``fields`` is empty. ``id`` is always
+    included so clients can correlate projected rows.
+    """
+    if not fields:
+        return list(allowed)
+
+    requested = []
+    for name in fields.split(","):
+        name = name.strip()
+        if name and name not in requested:
+            requested.append(name)
+
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+
+    if "id" not in requested:
+        requested.insert(0, "id")
+    return requested
+
+
+def project(db_query: Query, model: Any, columns: Sequence[str]) -> Query:
+    """Restrict ``db_query`` to the given columns of ``model``."""
+    return db_query.with_entities(
+        *[getattr(model, name).label(name) for name in columns]
+    )
+
+
+def rows_response(rows: Sequence[Any]) -> FastJSONResponse:
+    """Serialize projected rows straight to JSON, skipping Pydantic validation."""
+    payload: List[Dict[str, Any]] = [row._asdict() for row in rows]
+    return FastJSONResponse(content=payload)
@@ -0,0 +1,336 @@
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import any_, delete, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Content,
+    ContentRecipient,
+    ContentStatus,
+    SendChunk,
+    Subscriber,
+    Subscription,
+    Topic,
+)
+
+logger = logging.getLogger(__name__)
+
+AUDIENCE_SNAPSHOT_LEAD_MINUTES = int(os.getenv("AUDIENCE_SNAPSHOT_LEAD_MINUTES", "15"))
+AUDIENCE_FETCH_BATCH_SIZE = int(os.getenv("AUDIENCE_FETCH_BATCH_SIZE", "1000"))
+
+
+def get_content_to_warm(db: Session, now: Optional[datetime] = None) -> List[Content]:
+    """Pending content due within the snapshot lead time that has no snapshot yet."""
+    now = now or datetime.utcnow()
+    horizon = now + timedelta(minutes=AUDIENCE_SNAPSHOT_LEAD_MINUTES)
+    return (
+        db.query(Content)
+        .filter(
+            Content.status == ContentStatus.PENDING.value,
+            Content.digest == False,
+            Content.scheduled_at <= horizon,
+            Content.audience_frozen_at.is_(None),
+        )
+        .all()
+    )
+
+
+def resolve_subject(content: Content) -> str:
+    return content.title or f"Newsletter: {content.topic.name}"
+
+
+def segment_filter(segment: Optional[Dict[str, Any]]):
+    """
+    SQL condition restricting subscribers to a segment.
+
+    A segment is a JSON document that must be contained in the subscriber's
+    attributes (``attributes @> segment``), which the GIN index on
+    ``subscribers.attributes`` answers without scanning the table.
+    """
+    if not segment:
+        return literal(True)
+    return Subscriber.attributes.contains(segment)
+
+
+def audience_query(
+    topic_ids: List[int], segment: Optional[Dict[str, Any]] = None
+):
+    """Ids of the active subscribers of ``topic_ids`` that match ``segment``."""
+    return (
+        select(Subscriber.id)
+        .join(Subscription, Subscription.subscriber_id == Subscriber.id)
+        .where(
+            Subscription.topic_id == any_(topic_ids),
+            Subscription.is_active == True,
+            Subscriber.is_active == True,
+            segment_filter(segment),
+        )
+        .distinct()
+    )
+
+
+def count_audience(
+    db: Session,
+    topic_ids: Optional[List[int]] = None,
+    segment: Optional[Dict[str, Any]] = None,
+) -> int:
+    """
+    Count the distinct active subscribers a send would reach.
+
+    Without ``topic_ids`` every active subscriber matching ``segment`` is
+    counted. Runs a single COUNT in the database; no rows are loaded.
+    """
+    if topic_ids:
+        audience = audience_query(topic_ids, segment).subquery()
+    else:
+        audience = (
+            select(Subscriber.id)
+            .where(Subscriber.is_active == True, segment_filter(segment))
+            .subquery()
+        )
+    return db.execute(select(func.count()).select_from(audience)).scalar() or 0
+
+
+def snapshot_audience(db: Session, content: Content) -> int:
+    """
+    Freeze the recipient set of a content item.
+
+    Resolves the active subscribers of all the content's topics that match
+    its segment as one deduplicated union with a single INSERT ... SELECT DISTINCT into
+    ``content_recipients`` and stores the prepared subject, so the send can
+    start straight from the snapshot. Subscribers added after this point are
+    not part of the send.
+
+    Returns:
+        Number of recipients in the snapshot
+    """
+    db.execute(
+        delete(ContentRecipient).where(ContentRecipient.content_id == content.id)
+    )
+
+    audience = audience_query(content.topic_ids, content.segment).add_columns(
+        literal(content.id)
+    )
+    result = db.execute(
+        insert(ContentRecipient)
+        .from_select(["subscriber_id", "content_id"], audience)
+        .on_conflict_do_nothing()
+    )
+
+    content.recipient_count = result.rowcount
+    content.audience_frozen_at = datetime.utcnow()
+    content.prepared_subject = resolve_subject(content)
+    db.commit()
+
+    logger.info(
+        f"Froze audience of {content.recipient_count} recipients for content {content.id}"
+    )
+    return content.recipient_count
+
+
+def ensure_audience_snapshot(db: Session, content: Content) -> int:
+    """Return the snapshot size for ``content``, taking the snapshot if missing."""
+    locked = (
+        db.query(Content)
+        .filter(Content.id == content.id)
+        .with_for_update()
+        .populate_existing()
+        .first()
+    )
+    if locked.audience_frozen_at is None:
+        return snapshot_audience(db, locked)
+    db.commit()
+    return locked.recipient_count or 0
+
+
+def warm_audience_snapshot(db: Session, content_id: int) -> Optional[int]:
+    """
+    Take the snapshot of content due soon ahead of its send.
+
+    The row is locked with ``FOR UPDATE SKIP LOCKED`` and checked again, so
+    content a sender is snapshotting right now, or that was frozen since it
+    was listed, is left alone.
+
+    Returns:
+        Number of recipients in the snapshot, or None if it was skipped
+    """
+    locked = (
+        db.query(Content)
+        .filter(Content.id == content_id)
+        .with_for_update(skip_locked=True)
+        .populate_existing()
+        .first()
+    )
+    if (
+        locked is None
+        or locked.audience_frozen_at is not None
+        or locked.status != ContentStatus.PENDING
+    ):
+        db.commit()
+        return None
+    return snapshot_audience(db, locked)
+
+
+def clear_audience_snapshot(db: Session, content: Content) -> None:
+    """Drop a snapshot so the audience is resolved again closer to send time."""
+    db.execute(
+        delete(ContentRecipient).where(ContentRecipient.content_id == content.id)
+    )
+    db.execute(delete(SendChunk).where(SendChunk.content_id == content.id))
+    content.audience_frozen_at = None
+    content.recipient_count = None
+    content.prepared_subject = None
+    content.send_cursor = None
+
+
+def iter_snapshot_recipients(
+    db: Session,
+    content_id: int,
+    after_subscriber_id: int = 0,
+    batch_size: int = AUDIENCE_FETCH_BATCH_SIZE,
+    upto_subscriber_id: Optional[int] = None,
+) -> Iterator[Tuple[int, str]]:
+    """
+    Stream ``(subscriber_id, email)`` pairs from a content's snapshot.
+
+    Rows are fetched in keyset order by subscriber id, one batch at a time,
+    optionally stopping at ``upto_subscriber_id`` (inclusive). Subscribers
+    deactivated after the snapshot was taken are skipped.
+    """
+    last_id = after_subscriber_id
+    while True:
+        query = (
+            db.query(ContentRecipient.subscriber_id, Subscriber.email)
+            .join(Subscriber, Subscriber.id == ContentRecipient.subscriber_id)
+            .filter(
+                ContentRecipient.content_id == content_id,
+                ContentRecipient.subscriber_id > last_id,
+                Subscriber.is_active == True,
+            )
+        )
+        if upto_subscriber_id is not None:
+            query = query.filter(ContentRecipient.subscriber_id <= upto_subscriber_id)
+        rows = query.order_by(ContentRecipient.subscriber_id).limit(batch_size).all()
+        if not rows:
+            return
+        for row in rows:
+            yield row.subscriber_id, row.email
+        last_id = rows[-1].subscriber_id
+
+
+def get_subscriber_attributes(
+    db: Session, subscriber_ids: Iterable[int]
+) -> Dict[int, Dict[str, Any]]:
+    """Attributes of the given subscribers, keyed by id, in one query."""
+    subscriber_ids = list(subscriber_ids)
+    if not subscriber_ids:
+        return {}
+    rows = db.execute(
+        select(Subscriber.id, Subscriber.attributes).where(
+            Subscriber.id == any_(subscriber_ids)
+        )
+    )
+    return {row.id: row.attributes for row in rows}
+
+
+def adjust_topic_counts(db: Session, topic_ids: Iterable[int], delta: int) -> None:
+    """Atomically shift the cached active subscriber count of the given topics."""
+    topic_ids = list(topic_ids)
+    if not topic_ids or not delta:
+        return
+    db.execute(
+        update(Topic)
+        .where(Topic.id.in_(topic_ids))
+        .values(active_subscriber_count=Topic.active_subscriber_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def adjust_topic_counts_for_subscribers(
+    db: Session, subscriber_ids: Iterable[int], delta: int
+) -> None:
+    """
+    Shift topic counts for every active subscription of the given subscribers.
+
+    Used when subscribers are (de)activated; runs as one UPDATE ... FROM over
+    the grouped subscriptions.
+    """
+    subscriber_ids = list(subscriber_ids)
+    if not subscriber_ids or not delta:
+        return
+    per_topic = (
+        select(Subscription.topic_id, func.count().label("n"))
+        .where(
+            Subscription.subscriber_id.in_(subscriber_ids),
+            Subscription.is_active == True,
+        )
+        .group_by(Subscription.topic_id)
+        .subquery()
+    )
+    db.execute(
+        update(Topic)
+        .where(Topic.id == per_topic.c.topic_id)
+        .values(
+            active_subscriber_count=Topic.active_subscriber_count
+            + delta * per_topic.c.n
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def reconcile_topic_counts(db: Session) -> int:
+    """
+    Recompute cached topic counts from subscriptions and fix any drift.
+
+    Returns:
+        Number of topics whose count was corrected
+    """
+    actual = (
+        select(func.count())
+        .select_from(Subscription)
+        .join(Subscriber, Subscriber.id == Subscription.subscriber_id)
+        .where(
+            Subscription.topic_id == Topic.id,
+            Subscription.is_active == True,
+            Subscriber.is_active == True,
+        )
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(Topic)
+        .where(Topic.active_subscriber_count != actual)
+        .values(active_subscriber_count=actual)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def deactivate_subscribers(db: Session, emails: Iterable[str]) -> List[int]:
+    """
+    Deactivate subscribers by email in one UPDATE and fix topic counts.
+
+    Returns:
+        Ids of the subscribers that were active before. The caller commits.
+    """
+    emails = {email for email in emails if email}
+    emails |= {email.strip().lower() for email in emails}
+    if not emails:
+        return []
+
+    subscriber_ids = [
+        row.id
+        for row in db.execute(
+            update(Subscriber)
+            .where(Subscriber.email.in_(emails), Subscriber.is_active == True)
+            .values(is_active=False)
+            .returning(Subscriber.id)
+            .execution_options(synchronize_session=False)
+        )
+    ]
+    adjust_topic_counts_for_subscribers(db, subscriber_ids, -1)
+    return subscriber_ids
@@ -0,0 +1,164 @@
+import os
+import logging
+from datetime import timedelta
+from typing import List, Optional
+
+from sqlalchemy import func, insert, literal, or_, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.models import Content, ContentRecipient, SendChunk
+
+logger = logging.getLogger(__name__)
+
+SEND_CHUNK_SIZE = int(os.getenv("SEND_CHUNK_SIZE", "500"))
+SEND_CHUNK_WINDOW = int(os.getenv("SEND_CHUNK_WINDOW", "2"))
+SEND_CHUNK_TIMEOUT_SECONDS = int(os.getenv("SEND_CHUNK_TIMEOUT_SECONDS", "3600"))
+
+
+def is_bulk(recipient_count: int) -> bool:
+    """Audiences larger than one chunk are split into chunks instead of sent inline."""
+    return recipient_count > SEND_CHUNK_SIZE
+
+
+def chunk_window(priority: int) -> int:
+    """Number of chunks of one content item allowed in flight at a time."""
+    return SEND_CHUNK_WINDOW * (1 + max(priority or 0, 0))
+
+
+def _stale_before():
+    return func.now() - timedelta(seconds=SEND_CHUNK_TIMEOUT_SECONDS)
+
+
+def plan_chunks(db: Session, content_id: int) -> int:
+    """
+    Split a content's snapshot into subscriber id ranges of ``SEND_CHUNK_SIZE``.
+
+    Runs as one INSERT ... SELECT that numbers the snapshot rows and groups
+    them into ranges. Already planned content is left untouched; the content
+    row is locked so concurrent dispatchers plan only once.
+
+    Returns:
+        Number of chunks of the content
+    """
+    db.query(Content.id).filter(Content.id == content_id).with_for_update().first()
+    existing = (
+        db.query(func.count(SendChunk.id))
+        .filter(SendChunk.content_id == content_id)
+        .scalar()
+    )
+    if existing:
+        db.commit()
+        return existing
+
+    numbered = (
+        select(
+            ContentRecipient.subscriber_id,
+            (
+                (func.row_number().over(order_by=ContentRecipient.subscriber_id) - 1)
+                // SEND_CHUNK_SIZE
+            ).label("seq"),
+        )
+        .where(ContentRecipient.content_id == content_id)
+        .subquery()
+    )
+    ranges = select(
+        literal(content_id),
+        numbered.c.seq,
+        func.min(numbered.c.subscriber_id),
+        func.max(numbered.c.subscriber_id),
+    ).group_by(numbered.c.seq)
+    result = db.execute(
+        insert(SendChunk).from_select(
+            ["content_id", "seq", "first_subscriber_id", "last_subscriber_id"], ranges
+        )
+    )
+    db.commit()
+    logger.info(f"Planned {result.rowcount} chunks for content {content_id}")
+    return result.rowcount
+
+
+def claim_chunks(db: Session, content: Content) -> List[Row]:
+    """
+    Claim the next chunks of a content item up to its in-flight window.
+
+    Chunks are claimed in order with ``FOR UPDATE SKIP LOCKED`` so concurrent
+    dispatchers never hand out the same chunk. Chunks dispatched longer than
+    ``SEND_CHUNK_TIMEOUT_SECONDS`` ago without completing are claimed again.
+    """
+    in_flight = (
+        db.query(func.count(SendChunk.id))
+        .filter(
+            SendChunk.content_id == content.id,
+            SendChunk.completed_at.is_(None),
+            SendChunk.dispatched_at >= _stale_before(),
+        )
+        .scalar()
+    )
+    free = chunk_window(content.priority) - in_flight
+    if free <= 0:
+        db.commit()
+        return []
+
+    claimable = (
+        select(SendChunk.id)
+        .where(
+            SendChunk.content_id == content.id,
+            SendChunk.completed_at.is_(None),
+            or_(
+                SendChunk.dispatched_at.is_(None),
+                SendChunk.dispatched_at < _stale_before(),
+            ),
+        )
+        .order_by(SendChunk.seq)
+        .limit(free)
+        .with_for_update(skip_locked=True)
+    )
+    rows = db.execute(
+        update(SendChunk)
+        .where(SendChunk.id.in_(claimable))
+        .values(dispatched_at=func.now())
+        .returning(SendChunk.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    return rows
+
+
+def release_chunk(db: Session, chunk_id: int, cursor: Optional[int]) -> None:
+    """Hand a stopped chunk back so a resumed send continues after ``cursor``."""
+    values = {"dispatched_at": None}
+    if cursor is not None:
+        values["cursor"] = cursor
+    db.execute(
+        update(SendChunk)
+        .where(SendChunk.id == chunk_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def complete_chunk(db: Session, chunk: SendChunk) -> bool:
+    """
+    Mark a chunk as done.
+
+    Returns:
+        True if every chunk of the content is now done
+    """
+    db.execute(
+        update(SendChunk)
+        .where(SendChunk.id == chunk.id)
+        .values(completed_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    remaining = (
+        db.query(func.count(SendChunk.id))
+        .filter(
+            SendChunk.content_id == chunk.content_id,
+            SendChunk.completed_at.is_(None),
+        )
+        .scalar()
+    )
+    return remaining == 0
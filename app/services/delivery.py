@@ -0,0 +1,195 @@
+import logging
+from datetime import timedelta
+from typing import Iterable, Optional, Sequence, Union
+
+from sqlalchemy import and_, cast, case, exists, func, or_, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.models import Content, ContentStatus, SendChunk
+
+logger = logging.getLogger(__name__)
+
+_status_type = Content.__table__.c.status.type
+
+
+def _status(value: ContentStatus):
+    return cast(value.value, _status_type)
+
+
+def record_delivery_counts(
+    db: Session,
+    content_id: Union[int, Sequence[int]],
+    sent: int,
+    failed: int,
+    suppressed: int = 0,
+) -> None:
+    """
+    Add to the delivery counters of a content item, or of every item of a digest.
+
+    Issues ``UPDATE content SET sent_count = sent_count + :sent ...`` so
+    concurrent senders never read-modify-write the row. The caller commits.
+    """
+    if not sent and not failed and not suppressed:
+        return
+    content_ids = [content_id] if isinstance(content_id, int) else list(content_id)
+    db.execute(
+        update(Content)
+        .where(Content.id.in_(content_ids))
+        .values(
+            sent_count=Content.sent_count + sent,
+            failed_count=Content.failed_count + failed,
+            suppressed_count=Content.suppressed_count + suppressed,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def finalize_content(
+    db: Session,
+    content_id: int,
+    error_message: Optional[str] = None,
+    after_retry: bool = False,
+) -> Optional[Row]:
+    """
+    Mark a pending content item as sent or failed in one conditional UPDATE.
+
+    Content is SENT when at least one delivery succeeded or nothing failed,
+    FAILED otherwise. Content that is no longer pending, or still has retry
+    batches outstanding, is left untouched; the last batch to finish
+    finalizes it.
+
+    A finishing retry batch passes ``after_retry``: the content is then only
+    finalized once its first pass is done as well, i.e. the inline sender
+    released its lease or every chunk of a bulk send completed.
+
+    Returns:
+        Row with the final status and counters, or None if nothing was updated
+    """
+    succeeded = or_(Content.sent_count > 0, Content.failed_count == 0)
+    values = {
+        "status": case(
+            (succeeded, _status(ContentStatus.SENT)),
+            else_=_status(ContentStatus.FAILED),
+        ),
+        "sent_at": case((succeeded, func.now()), else_=Content.sent_at),
+    }
+    if error_message is not None:
+        values["error_message"] = error_message
+
+    conditions = [
+        Content.id == content_id,
+        Content.status == ContentStatus.PENDING,
+        Content.retries_pending == 0,
+    ]
+    if after_retry:
+        chunks = select(SendChunk.id).where(SendChunk.content_id == Content.id)
+        open_chunks = chunks.where(SendChunk.completed_at.is_(None))
+        conditions.append(
+            or_(
+                and_(~exists(chunks), Content.sending_by.is_(None)),
+                and_(exists(chunks), ~exists(open_chunks)),
+            )
+        )
+
+    row = db.execute(
+        update(Content)
+        .where(*conditions)
+        .values(**values)
+        .returning(Content.status, Content.sent_count, Content.failed_count)
+        .execution_options(synchronize_session=False)
+    ).first()
+    db.commit()
+    return row
+
+
+def record_retry_scheduled(
+    db: Session, content_id: int, countdown: float, new_batch: bool = True
+) -> None:
+    """
+    Count a retry batch as outstanding. The caller commits before the
+    batch is enqueued.
+
+    The send's heartbeat is pushed past the retry's due time, so the content
+    is not taken for a stalled send while it waits for its retry. A batch
+    that is only deferred again passes ``new_batch=False``.
+    """
+    due = func.now() + timedelta(seconds=countdown)
+    db.execute(
+        update(Content)
+        .where(Content.id == content_id)
+        .values(
+            retries_pending=Content.retries_pending + (1 if new_batch else 0),
+            heartbeat_at=func.greatest(func.coalesce(Content.heartbeat_at, due), due),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def record_retry_finished(db: Session, content_id: int) -> None:
+    """Count a retry batch as done, however it ended."""
+    db.execute(
+        update(Content)
+        .where(Content.id == content_id)
+        .values(retries_pending=func.greatest(Content.retries_pending - 1, 0))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def fail_content(db: Session, content_id: int, error_message: str) -> bool:
+    """Mark a pending content item as failed without loading it."""
+    result = db.execute(
+        update(Content)
+        .where(Content.id == content_id, Content.status == ContentStatus.PENDING)
+        .values(status=ContentStatus.FAILED, error_message=error_message)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount > 0
+
+
+def transition_content(
+    db: Session,
+    content_id: int,
+    from_statuses: Iterable[ContentStatus],
+    to_status: ContentStatus,
+) -> bool:
+    """
+    Move a content item to ``to_status`` if it is in one of ``from_statuses``.
+
+    The check and the write are one conditional UPDATE, so a transition never
+    overwrites a status a worker set concurrently.
+    """
+    result = db.execute(
+        update(Content)
+        .where(Content.id == content_id, Content.status.in_(list(from_statuses)))
+        .values(status=to_status)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount > 0
+
+
+def record_send_cursor(
+    db: Session, content_id: Union[int, Sequence[int]], subscriber_id: int
+) -> None:
+    """Remember the last recipient handled so a resumed send skips past it."""
+    content_ids = [content_id] if isinstance(content_id, int) else list(content_id)
+    db.execute(
+        update(Content)
+        .where(Content.id.in_(content_ids))
+        .values(send_cursor=subscriber_id)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def record_send_error(db: Session, content_id: int, error_message: str) -> None:
+    """Keep the first error reported by any chunk of a send. The caller commits."""
+    db.execute(
+        update(Content)
+        .where(Content.id == content_id, Content.error_message.is_(None))
+        .values(error_message=error_message)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,167 @@
+import os
+import json
+import socket
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import redis
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models import DeliveryEvent, SuppressionReason
+from app.services.audience import deactivate_subscribers
+from app.services.redis_client import get_redis, mark_redis_unavailable
+from app.services.suppression import suppress
+
+logger = logging.getLogger(__name__)
+
+EVENT_STREAM_KEY = os.getenv("DELIVERY_EVENT_STREAM", "newsletter:delivery-events")
+EVENT_CONSUMER_GROUP = "delivery-event-writers"
+EVENT_STREAM_MAXLEN = int(os.getenv("DELIVERY_EVENT_STREAM_MAXLEN", "1000000"))
+EVENT_BATCH_SIZE = int(os.getenv("DELIVERY_EVENT_BATCH_SIZE", "1000"))
+EVENT_CLAIM_IDLE_MS = int(os.getenv("DELIVERY_EVENT_CLAIM_IDLE_MS", "300000"))
+
+# Provider events that suppress the address and deactivate the subscriber
+SUPPRESSING_EVENTS = {
+    "hard_bounce": SuppressionReason.BOUNCED,
+    "blocked": SuppressionReason.BOUNCED,
+    "invalid_email": SuppressionReason.INVALID,
+    "spam": SuppressionReason.COMPLAINED,
+    "unsubscribed": SuppressionReason.UNSUBSCRIBED,
+}
+
+
+def _occurred_at(event: Dict[str, Any]) -> Optional[datetime]:
+    if event.get("ts_event"):
+        return datetime.fromtimestamp(int(event["ts_event"]), tz=timezone.utc)
+    return None
+
+
+def process_delivery_events(db: Session, events: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Apply a batch of provider delivery events set-wise.
+
+    Appends every event to the ``delivery_events`` ledger with one multi-row
+    INSERT, upserts suppressions for hard bounces, complaints and unsubscribes,
+    and deactivates the matching subscribers with one UPDATE.
+    """
+    if not events:
+        return {"events": 0, "suppressed": 0, "deactivated": 0}
+
+    db.execute(
+        insert(DeliveryEvent),
+        [
+            {
+                "event": event["event"],
+                "email": event["email"],
+                "message_id": event.get("message_id"),
+                "tag": event.get("tag"),
+                "reason": event.get("reason"),
+                "occurred_at": _occurred_at(event),
+            }
+            for event in events
+        ],
+    )
+
+    suppressions = [
+        (event["email"], SUPPRESSING_EVENTS[event["event"]])
+        for event in events
+        if event["event"] in SUPPRESSING_EVENTS
+    ]
+    suppressed = suppress(db, suppressions, source="webhook")
+    deactivated = deactivate_subscribers(db, [email for email, _ in suppressions])
+    db.commit()
+
+    return {
+        "events": len(events),
+        "suppressed": suppressed,
+        "deactivated": len(deactivated),
+    }
+
+
+def enqueue_delivery_events(events: List[Dict[str, Any]]) -> bool:
+    """
+    Push events onto the Redis stream with one pipelined round trip.
+
+    Returns:
+        False if Redis is unavailable and the caller must process the events
+    """
+    client = get_redis()
+    if client is None:
+        return False
+    try:
+        pipe = client.pipeline(transaction=False)
+        for event in events:
+            pipe.xadd(
+                EVENT_STREAM_KEY,
+                {"data": json.dumps(event)},
+                maxlen=EVENT_STREAM_MAXLEN,
+                approximate=True,
+            )
+        pipe.execute()
+        return True
+    except redis.RedisError as e:
+        mark_redis_unavailable(e)
+        return False
+
+
+def _ensure_group(client: redis.Redis) -> None:
+    try:
+        client.xgroup_create(EVENT_STREAM_KEY, EVENT_CONSUMER_GROUP, id="0", mkstream=True)
+    except redis.ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def consume_delivery_events(
+    db: Session,
+    client: Optional[redis.Redis] = None,
+    max_batches: int = 50,
+) -> Dict[str, int]:
+    """
+    Drain the delivery event stream in batches of ``EVENT_BATCH_SIZE``.
+
+    Reads through a consumer group so concurrent consumers never apply the
+    same entry twice, reclaims entries left pending by crashed consumers, and
+    acknowledges and deletes each batch once it is committed.
+    """
+    client = client or get_redis()
+    totals = {"events": 0, "suppressed": 0, "deactivated": 0}
+    if client is None:
+        return totals
+
+    consumer = f"{socket.gethostname()}-{os.getpid()}"
+    _ensure_group(client)
+    _, claimed, *_ = client.xautoclaim(
+        EVENT_STREAM_KEY,
+        EVENT_CONSUMER_GROUP,
+        consumer,
+        min_idle_time=EVENT_CLAIM_IDLE_MS,
+        count=EVENT_BATCH_SIZE,
+    )
+
+    for _ in range(max_batches):
+        if claimed:
+            entries, claimed = claimed, []
+        else:
+            response = client.xreadgroup(
+                EVENT_CONSUMER_GROUP,
+                consumer,
+                {EVENT_STREAM_KEY: ">"},
+                count=EVENT_BATCH_SIZE,
+            )
+            entries = response[0][1] if response else []
+        if not entries:
+            break
+
+        entry_ids = [entry_id for entry_id, _ in entries]
+        events = [json.loads(fields["data"]) for _, fields in entries if fields]
+        counts = process_delivery_events(db, events)
+        for key, value in counts.items():
+            totals[key] += value
+
+        client.xack(EVENT_STREAM_KEY, EVENT_CONSUMER_GROUP, *entry_ids)
+        client.xdel(EVENT_STREAM_KEY, *entry_ids)
+
+    return totals
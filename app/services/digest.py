@@ -0,0 +1,168 @@
+import os
+import html
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import distinct, func, or_, select, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session, joinedload
+
+from app.models import Content, ContentStatus, ContentTopic, Subscriber, Subscription
+from app.services.audience import resolve_subject
+from app.services.preparation import prepared_html
+from app.services.send_lease import SEND_LEASE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+DIGEST_WINDOW_MINUTES = int(os.getenv("DIGEST_WINDOW_MINUTES", "60"))
+# Subscribers per page; progress is checkpointed and pause/cancel checked per page
+DIGEST_PAGE_SIZE = int(os.getenv("DIGEST_PAGE_SIZE", "200"))
+
+Recipients = List[Tuple[int, str]]
+
+
+def digest_cutoff(now: Optional[datetime] = None) -> datetime:
+    """Start of the current digest window; earlier windows are closed."""
+    now = now or datetime.utcnow()
+    window = timedelta(minutes=DIGEST_WINDOW_MINUTES)
+    return datetime.min + ((now - datetime.min) // window) * window
+
+
+def claim_digest_content(
+    db: Session, owner: str, now: Optional[datetime] = None
+) -> List[Content]:
+    """
+    Claim pending digest content scheduled in a closed window.
+
+    One UPDATE over a ``FOR UPDATE SKIP LOCKED`` selection marks the items
+    dispatched and takes their send lease for ``owner``, so overlapping beats
+    never send the same item twice. Items whose previous run stopped, or
+    crashed and stopped renewing the lease, are claimed again and resume
+    after their ``send_cursor``.
+    """
+    claimable = (
+        select(Content.id)
+        .where(
+            Content.status == ContentStatus.PENDING,
+            Content.digest == True,
+            Content.scheduled_at < digest_cutoff(now),
+            or_(
+                Content.dispatched_at.is_(None),
+                Content.sending_by.is_(None),
+                Content.heartbeat_at.is_(None),
+                Content.heartbeat_at
+                < func.now() - timedelta(seconds=SEND_LEASE_SECONDS),
+            ),
+        )
+        .with_for_update(skip_locked=True)
+    )
+    ids = [
+        row.id
+        for row in db.execute(
+            update(Content)
+            .where(Content.id.in_(claimable))
+            .values(dispatched_at=func.now(), sending_by=owner, heartbeat_at=func.now())
+            .returning(Content.id)
+            .execution_options(synchronize_session=False)
+        )
+    ]
+    db.commit()
+    if not ids:
+        return []
+    return (
+        db.query(Content)
+        .options(joinedload(Content.topic))
+        .filter(Content.id.in_(ids))
+        .order_by(Content.scheduled_at, Content.id)
+        .all()
+    )
+
+
+def iter_digest_pages(
+    db: Session,
+    content_ids: Sequence[int],
+    batch_size: int = DIGEST_PAGE_SIZE,
+) -> Iterator[Tuple[int, Dict[Tuple[int, ...], Recipients]]]:
+    """
+    Map every subscriber to the digest items they should receive.
+
+    A single grouped query joins the items to the active subscriptions and
+    aggregates each subscriber's item ids, honouring each item's segment and
+    skipping subscribers up to the item's ``send_cursor``; it is paged by
+    subscriber id.
+    Each page is yielded as ``(last_subscriber_id, groups)``, where groups map
+    item ids to recipients, so subscribers receiving the same items share one
+    rendered message.
+    """
+    content_ids = list(content_ids)
+    cursor = func.coalesce(Content.send_cursor, 0)
+    targets = (
+        select(
+            Content.id.label("content_id"),
+            Content.topic_id,
+            Content.segment,
+            cursor.label("cursor"),
+        )
+        .where(Content.id.in_(content_ids))
+        .union_all(
+            select(
+                ContentTopic.content_id, ContentTopic.topic_id, Content.segment, cursor
+            )
+            .join(Content, Content.id == ContentTopic.content_id)
+            .where(ContentTopic.content_id.in_(content_ids))
+        )
+        .subquery()
+    )
+    item_ids = func.array_agg(
+        aggregate_order_by(distinct(targets.c.content_id), targets.c.content_id)
+    )
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Subscriber.id, Subscriber.email, item_ids.label("item_ids"))
+            .join(Subscription, Subscription.subscriber_id == Subscriber.id)
+            .join(targets, targets.c.topic_id == Subscription.topic_id)
+            .where(
+                Subscription.is_active == True,
+                Subscriber.is_active == True,
+                or_(
+                    targets.c.segment.is_(None),
+                    Subscriber.attributes.contains(targets.c.segment),
+                ),
+                Subscriber.id > targets.c.cursor,
+                Subscriber.id > last_id,
+            )
+            .group_by(Subscriber.id)
+            .order_by(Subscriber.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+
+        groups: Dict[Tuple[int, ...], Recipients] = defaultdict(list)
+        for row in rows:
+            groups[tuple(row.item_ids)].append((row.id, row.email))
+        last_id = rows[-1].id
+        yield last_id, groups
+
+
+def render_digest(items: Sequence[Content]) -> Tuple[str, str, Optional[str]]:
+    """Subject, HTML body and text alternative of a digest of ``items``."""
+    if len(items) == 1:
+        return resolve_subject(items[0]), prepared_html(items[0]), items[0].prepared_text
+
+    sections = [
+        f"<h2>{html.escape(item.title or item.topic.name)}</h2>\n{prepared_html(item)}"
+        for item in items
+    ]
+    text_sections = [
+        f"{item.title or item.topic.name}\n\n{item.prepared_text or item.body}"
+        for item in items
+    ]
+    return (
+        f"Your digest: {len(items)} updates",
+        "\n<hr>\n".join(sections),
+        "\n\n----\n\n".join(text_sections),
+    )
@@ -0,0 +1,192 @@
+import os
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import redis
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session, joinedload
+
+from app.models import Content, ContentStatus
+from app.services.redis_client import get_redis, mark_redis_unavailable
+from app.services.send_lease import SEND_LEASE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_MAX_CONCURRENT_SENDS = int(os.getenv("DISPATCH_MAX_CONCURRENT_SENDS", "10"))
+DISPATCH_STALL_SECONDS = int(os.getenv("DISPATCH_STALL_SECONDS", "1800"))
+# What to do with content that is more than DISPATCH_STALE_AFTER_HOURS late:
+# "send" sends it anyway, "fail" marks it failed without sending
+DISPATCH_STALE_POLICY = os.getenv("DISPATCH_STALE_POLICY", "send")
+DISPATCH_STALE_AFTER_HOURS = float(os.getenv("DISPATCH_STALE_AFTER_HOURS", "24"))
+
+BACKLOG_KEY = "newsletter:dispatch:backlog"
+
+
+def _lease_live(now: datetime):
+    return Content.heartbeat_at >= now - timedelta(seconds=SEND_LEASE_SECONDS)
+
+
+def _is_active(now: datetime):
+    """
+    Pending content whose sender holds a live lease, or that was dispatched
+    recently and no sender has picked up yet.
+
+    Content only waiting on scheduled retry batches has its heartbeat pushed
+    past the retry's due time and nobody renewing it, so it does not take a
+    slot while it backs off.
+    """
+    return (
+        (Content.status == ContentStatus.PENDING)
+        & Content.dispatched_at.isnot(None)
+        & or_(
+            and_(_lease_live(now), Content.heartbeat_at <= now),
+            and_(
+                Content.dispatched_at >= now - timedelta(seconds=DISPATCH_STALL_SECONDS),
+                or_(
+                    Content.heartbeat_at.is_(None),
+                    Content.heartbeat_at < Content.dispatched_at,
+                ),
+            ),
+        )
+    )
+
+
+def _is_waiting(now: datetime):
+    """
+    Due pending content that was never dispatched or whose send stalled.
+
+    A dispatched send counts as stalled once no sender has renewed its lease
+    for ``SEND_LEASE_SECONDS`` and it was dispatched over
+    ``DISPATCH_STALL_SECONDS`` ago. Dispatching it again is safe: the new run
+    only sends if it can take over the lease.
+    """
+    return (
+        (Content.status == ContentStatus.PENDING)
+        & (Content.digest == False)
+        & (Content.scheduled_at <= now)
+        & or_(
+            Content.dispatched_at.is_(None),
+            and_(
+                Content.dispatched_at < now - timedelta(seconds=DISPATCH_STALL_SECONDS),
+                or_(Content.heartbeat_at.is_(None), ~_lease_live(now)),
+            ),
+        )
+    )
+
+
+def fail_stale_content(db: Session, now: datetime) -> int:
+    """
+    Apply the stale policy to never dispatched content.
+
+    With ``DISPATCH_STALE_POLICY=fail``, content more than
+    ``DISPATCH_STALE_AFTER_HOURS`` late is marked failed in one UPDATE.
+
+    Returns:
+        Number of content items marked failed
+    """
+    if DISPATCH_STALE_POLICY != "fail":
+        return 0
+    cutoff = now - timedelta(hours=DISPATCH_STALE_AFTER_HOURS)
+    result = db.execute(
+        update(Content)
+        .where(
+            Content.status == ContentStatus.PENDING,
+            Content.dispatched_at.is_(None),
+            Content.scheduled_at < cutoff,
+        )
+        .values(
+            status=ContentStatus.FAILED,
+            error_message=(
+                f"Skipped: more than {DISPATCH_STALE_AFTER_HOURS:g} hours late"
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    if result.rowcount:
+        logger.warning(f"Marked {result.rowcount} stale content items as failed")
+    return result.rowcount
+
+
+def backlog_stats(db: Session, now: datetime) -> Dict[str, Any]:
+    """Size and age of the due content waiting to be dispatched, in one query."""
+    count, oldest_late = (
+        db.query(
+            func.count(Content.id),
+            func.extract("epoch", func.now() - func.min(Content.scheduled_at)),
+        )
+        .filter(_is_waiting(now))
+        .one()
+    )
+    active = db.query(func.count(Content.id)).filter(_is_active(now)).scalar()
+    return {
+        "backlog": count,
+        "oldest_late_seconds": float(oldest_late) if oldest_late is not None else None,
+        "active": active,
+    }
+
+
+def claim_due_content(db: Session, now: datetime, limit: int) -> List[Content]:
+    """
+    Claim up to ``limit`` waiting content items, highest priority and most
+    overdue first.
+
+    Claimed rows get ``dispatched_at`` set in one UPDATE over a
+    ``FOR UPDATE SKIP LOCKED`` selection, so overlapping beats never claim the
+    same item. The caller commits, together with the outbox messages that
+    dispatch the claimed items.
+    """
+    if limit <= 0:
+        return []
+    claimable = (
+        select(Content.id)
+        .where(_is_waiting(now))
+        .order_by(Content.priority.desc(), Content.scheduled_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    ids = [
+        row.id
+        for row in db.execute(
+            update(Content)
+            .where(Content.id.in_(claimable))
+            .values(dispatched_at=func.now())
+            .returning(Content.id)
+            .execution_options(synchronize_session=False)
+        )
+    ]
+    if not ids:
+        return []
+    return (
+        db.query(Content)
+        .options(joinedload(Content.topic))
+        .filter(Content.id.in_(ids))
+        .order_by(Content.priority.desc(), Content.scheduled_at)
+        .all()
+    )
+
+
+def record_backlog(backlog: int, redis_client: Optional[redis.Redis] = None) -> Optional[float]:
+    """
+    Store the backlog size and return how fast it drained since the last beat.
+
+    Returns:
+        Content items drained per minute, or None without a previous sample
+    """
+    client = redis_client or get_redis()
+    if client is None:
+        return None
+    now = time.time()
+    try:
+        previous = client.hgetall(BACKLOG_KEY) or {}
+        client.hset(BACKLOG_KEY, mapping={"count": backlog, "at": now})
+    except redis.RedisError as e:
+        mark_redis_unavailable(e)
+        return None
+    if not previous or now <= float(previous["at"]):
+        return None
+    elapsed_minutes = (now - float(previous["at"])) / 60
+    return round((int(previous["count"]) - backlog) / elapsed_minutes, 2)
+
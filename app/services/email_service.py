@@ -1,10 +1,59 @@
 import os
+import random
 import logging
 import requests
+from functools import lru_cache
 from typing import Optional
+from requests.adapters import HTTPAdapter
+
+from app.services.send_log import SEND_LOG_SAMPLE_RATE
 
 logger = logging.getLogger(__name__)
 
+EMAIL_HTTP_POOL_SIZE = int(os.getenv("EMAIL_HTTP_POOL_SIZE", "10"))
+
+
+@lru_cache(maxsize=1)
+def _http_session() -> requests.Session:
+    """Shared HTTP session so sends reuse keep-alive connections to Brevo."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=EMAIL_HTTP_POOL_SIZE, max_retries=0
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+class EmailSendError(RuntimeError):
+    """
+    Raised when the email provider rejects or fails a send.
+
+    ``transient`` is True for failures worth retrying later: rate limiting,
+    provider side errors and network problems.
+    """
+
+    def __init__(
+        self, message: str, status_code: Optional[int] = None, transient: bool = False
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.transient = transient
+
+
+def is_transient_status(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def _log_send_failure(to_email: str, error_msg: str) -> None:
+    """
+    Log a sample of send failures as one line.
+
+    The send loop logs every failure with its traceback; this line only
+    shows what the provider answered.
+    """
+    if SEND_LOG_SAMPLE_RATE > 0 and random.random() < SEND_LOG_SAMPLE_RATE:
+        logger.warning("Failed to send email to %s: %s", to_email, error_msg)
+
 
 def send_email(
     to_email: str,
@@ -12,6 +61,7 @@ def send_email(
     body: str,
     from_email: Optional[str] = None,
     from_name: Optional[str] = None,
+    text_body: Optional[str] = None,
 ) -> bool:
     """
     Send an email using Brevo (formerly Sendinblue) API.
@@ -22,12 +72,14 @@ def send_email(
         body: Email body (plain text or HTML)
         from_email: Sender email address (defaults to BREVO_FROM_EMAIL env var)
         from_name: Sender name (defaults to BREVO_FROM_NAME env var)
+        text_body: Plain-text alternative of an HTML body
 
     Returns:
         True if email was sent successfully, False otherwise
 
     Raises:
-        Exception: If email sending fails
+        EmailSendError: If the provider rejects the request or cannot be reached
+        Exception: If email sending fails unexpectedly
     """
     brevo_api_key = os.getenv("BREVO_API_KEY")
     brevo_from_email = from_email or os.getenv(
@@ -58,32 +110,32 @@ def send_email(
         "to": [{"email": to_email}],
         "subject": subject,
         "htmlContent": body,
-        "textContent": body,
     }
+    if text_body:
+        payload["textContent"] = text_body
 
     try:
-        response = requests.post(
+        response = _http_session().post(
             brevo_api_url, json=payload, headers=headers, timeout=10
         )
         response.raise_for_status()
 
-        logger.info("Email sent successfully to %s via Brevo", to_email)
+        logger.debug("Email sent successfully to %s via Brevo", to_email)
         return True
 
     except requests.exceptions.HTTPError as e:
-        error_msg = f"Brevo API error: {e.response.status_code} - {e.response.text}"
-        logger.error(
-            "Failed to send email to %s: %s", to_email, error_msg, exc_info=True
-        )
-        raise RuntimeError(error_msg) from e
+        status_code = e.response.status_code
+        error_msg = f"Brevo API error: {status_code} - {e.response.text}"
+        _log_send_failure(to_email, error_msg)
+        raise EmailSendError(
+            error_msg,
+            status_code=status_code,
+            transient=is_transient_status(status_code),
+        ) from e
     except requests.exceptions.RequestException as e:
         error_msg = f"Request error: {str(e)}"
-        logger.error(
-            "Failed to send email to %s: %s", to_email, error_msg, exc_info=True
-        )
-        raise RuntimeError(error_msg) from e
+        _log_send_failure(to_email, error_msg)
+        raise EmailSendError(error_msg, transient=True) from e
     except Exception as e:
-        logger.error(
-            "Unexpected error sending email to %s: %s", to_email, str(e), exc_info=True
-        )
+        _log_send_failure(to_email, f"Unexpected error: {str(e)}")
         raise
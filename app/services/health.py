@@ -0,0 +1,168 @@
+import os
+import time
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import redis
+from sqlalchemy import create_engine, func, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.database import DB_MAX_OVERFLOW, DB_POOL_SIZE
+from app.models import TaskRun
+from app.services.dispatch import BACKLOG_KEY, backlog_stats
+from app.services.redis_client import get_redis, mark_redis_unavailable
+
+logger = logging.getLogger(__name__)
+
+HEALTH_TIMEOUT_SECONDS = float(os.getenv("HEALTH_TIMEOUT_SECONDS", "2"))
+# check_due_content runs every minute; a longer gap means beat or the scan workers are down
+HEALTH_BEAT_STALE_SECONDS = float(os.getenv("HEALTH_BEAT_STALE_SECONDS", "180"))
+HEALTH_BACKLOG_STALE_SECONDS = float(os.getenv("HEALTH_BACKLOG_STALE_SECONDS", "900"))
+
+BEAT_TASK = "app.tasks.check_due_content"
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def pool_stats(engine: Engine) -> Dict[str, Any]:
+    """Connections of this process's SQLAlchemy pool."""
+    pool = engine.pool
+    checked_out = pool.checkedout()
+    return {
+        "size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "saturated": checked_out >= DB_POOL_SIZE + DB_MAX_OVERFLOW,
+    }
+
+
+_probe_engines: Dict[Any, Engine] = {}
+
+
+def probe_engine(engine: Engine) -> Engine:
+    """
+    Unpooled engine for ``engine``'s database with ``HEALTH_TIMEOUT_SECONDS``
+    connect and statement timeouts.
+
+    Probes open their own connection, so they neither wait for a connection
+    of a busy pool nor for the TCP timeout of an unreachable server.
+    """
+    probe = _probe_engines.get(engine.url)
+    if probe is None:
+        probe = create_engine(
+            engine.url,
+            poolclass=NullPool,
+            connect_args={
+                # libpq takes whole seconds
+                "connect_timeout": max(1, int(HEALTH_TIMEOUT_SECONDS)),
+                "options": f"-c statement_timeout={int(HEALTH_TIMEOUT_SECONDS * 1000)}",
+            },
+        )
+        _probe_engines[engine.url] = probe
+    return probe
+
+
+def check_database(engine: Engine) -> Dict[str, Any]:
+    """
+    Round trip to Postgres on a fresh connection under ``HEALTH_TIMEOUT_SECONDS``
+    connect and statement timeouts.
+
+    A saturated pool is reported as well, since requests would block on it
+    for the pool timeout.
+    """
+    pool = pool_stats(engine)
+    if pool["saturated"]:
+        return {"ok": False, "error": "connection pool exhausted", "pool": pool}
+    started = time.perf_counter()
+    try:
+        with probe_engine(engine).connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        return {"ok": False, "error": str(e), "pool": pool_stats(engine)}
+    return {"ok": True, "latency_ms": _elapsed_ms(started), "pool": pool_stats(engine)}
+
+
+def check_redis(redis_client: Optional[redis.Redis] = None) -> Dict[str, Any]:
+    client = redis_client or get_redis()
+    if client is None:
+        return {"ok": False, "error": "backing off after a failure"}
+    started = time.perf_counter()
+    try:
+        client.ping()
+    except redis.RedisError as e:
+        mark_redis_unavailable(e)
+        return {"ok": False, "error": str(e)}
+    return {"ok": True, "latency_ms": _elapsed_ms(started)}
+
+
+def queue_depths(app, queues: List[str]) -> Dict[str, Any]:
+    """Messages waiting in each broker queue."""
+    started = time.perf_counter()
+    depths: Dict[str, Optional[int]] = {}
+    try:
+        with app.connection_for_read(
+            connect_timeout=HEALTH_TIMEOUT_SECONDS
+        ) as connection:
+            connection.ensure_connection(max_retries=1, interval_start=0)
+            for queue in queues:
+                # A channel per queue: a failed passive declare closes it
+                channel = connection.channel()
+                try:
+                    depths[queue] = channel.queue_declare(
+                        queue=queue, passive=True
+                    ).message_count
+                except connection.channel_errors:
+                    # Redis drops empty lists, AMQP has not declared the queue yet
+                    depths[queue] = 0
+                finally:
+                    channel.close()
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+    return {"ok": True, "latency_ms": _elapsed_ms(started), "queues": depths}
+
+
+def last_beat_at(
+    db: Session, redis_client: Optional[redis.Redis] = None
+) -> Optional[datetime]:
+    """
+    When the beat-scheduled ``check_due_content`` last ran.
+
+    It stores its backlog sample in Redis on every run; without Redis the
+    task run history is used, which lags by up to one flush interval.
+    """
+    client = redis_client or get_redis()
+    if client is not None:
+        try:
+            at = client.hget(BACKLOG_KEY, "at")
+            if at is not None:
+                return datetime.fromtimestamp(float(at), tz=timezone.utc)
+        except redis.RedisError as e:
+            mark_redis_unavailable(e)
+    return (
+        db.query(func.max(TaskRun.finished_at)).filter(TaskRun.task == BEAT_TASK).scalar()
+    )
+
+
+def scheduling_stats(db: Session) -> Dict[str, Any]:
+    """Due content backlog and beat liveness."""
+    stats = backlog_stats(db, datetime.utcnow())
+    beat_at = last_beat_at(db)
+    beat_age = (
+        (datetime.now(timezone.utc) - beat_at).total_seconds() if beat_at else None
+    )
+    oldest = stats["oldest_late_seconds"]
+    return {
+        "due_backlog": stats["backlog"],
+        "oldest_due_seconds": round(oldest, 1) if oldest is not None else None,
+        "active_sends": stats["active"],
+        "last_beat_at": beat_at.isoformat() if beat_at else None,
+        "beat_stale": beat_age is None or beat_age > HEALTH_BEAT_STALE_SECONDS,
+        "backlog_stale": oldest is not None and oldest > HEALTH_BACKLOG_STALE_SECONDS,
+    }
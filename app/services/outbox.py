@@ -0,0 +1,122 @@
+import os
+import logging
+from datetime import timedelta
+from typing import Any, Dict, List
+
+from celery import Celery
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.orm import Session
+
+from app.models import DispatchOutbox
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_RELAY_BATCH_SIZE = int(os.getenv("OUTBOX_RELAY_BATCH_SIZE", "500"))
+OUTBOX_RETENTION_HOURS = float(os.getenv("OUTBOX_RETENTION_HOURS", "24"))
+
+
+def add_to_outbox(db: Session, messages: List[Dict[str, Any]]) -> None:
+    """
+    Write task messages to the outbox with one multi-row INSERT.
+
+    Each message is a dict with ``task``, ``args`` and ``queue``. The caller
+    commits, in the same transaction as the change that caused the messages,
+    so they exist if and only if that change does.
+    """
+    if messages:
+        db.execute(insert(DispatchOutbox), messages)
+
+
+def relay_outbox(db: Session, app: Celery, batch_size: int = OUTBOX_RELAY_BATCH_SIZE) -> int:
+    """
+    Publish unpublished outbox messages to the broker and mark them published.
+
+    Rows are claimed with ``FOR UPDATE SKIP LOCKED``, so concurrent relays
+    never publish the same batch, and the whole batch is published over one
+    producer connection. A crash between publishing and committing
+    republishes the batch; consumers drop the duplicates with
+    ``claim_outbox_message``.
+
+    Returns:
+        Number of messages published
+    """
+    rows = (
+        db.query(DispatchOutbox)
+        .filter(DispatchOutbox.published_at.is_(None))
+        .order_by(DispatchOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not rows:
+        db.commit()
+        return 0
+
+    try:
+        with app.producer_or_acquire() as producer:
+            for row in rows:
+                app.tasks[row.task].apply_async(
+                    args=row.args,
+                    kwargs={"outbox_id": row.id},
+                    queue=row.queue,
+                    task_id=f"outbox-{row.id}",
+                    producer=producer,
+                )
+    except Exception:
+        # Release the rows; whatever was published is deduplicated on consume
+        db.rollback()
+        raise
+
+    db.execute(
+        update(DispatchOutbox)
+        .where(DispatchOutbox.id.in_([row.id for row in rows]))
+        .values(published_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return len(rows)
+
+
+def claim_outbox_message(db: Session, outbox_id: int) -> bool:
+    """
+    Mark an outbox message consumed.
+
+    A message whose row no longer exists is not treated as a duplicate: only
+    consumed rows are pruned, so a missing row means the message was never
+    seen within the retention window.
+
+    Returns:
+        False if it was consumed before, i.e. this delivery is a duplicate
+    """
+    claimed = db.execute(
+        update(DispatchOutbox)
+        .where(DispatchOutbox.id == outbox_id, DispatchOutbox.consumed_at.is_(None))
+        .values(consumed_at=func.now())
+        .returning(DispatchOutbox.id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    exists = (
+        claimed is not None
+        or db.query(DispatchOutbox.id).filter(DispatchOutbox.id == outbox_id).first()
+        is not None
+    )
+    db.commit()
+    return claimed is not None or not exists
+
+
+def prune_outbox(db: Session) -> int:
+    """
+    Delete messages consumed more than ``OUTBOX_RETENTION_HOURS`` ago.
+
+    Unconsumed messages are kept however old they are, since they may still
+    be waiting in a backlogged broker queue.
+    """
+    result = db.execute(
+        delete(DispatchOutbox).where(
+            DispatchOutbox.consumed_at.isnot(None),
+            DispatchOutbox.consumed_at
+            < func.now() - timedelta(hours=OUTBOX_RETENTION_HOURS),
+        )
+    )
+    db.commit()
+    return result.rowcount
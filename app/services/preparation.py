@@ -0,0 +1,197 @@
+import os
+import re
+import html
+import logging
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import Content
+from app.services.unsubscribe import UNSUBSCRIBE_BASE_URL
+
+logger = logging.getLogger(__name__)
+
+CLICK_TRACKING_ENABLED = os.getenv("CLICK_TRACKING_ENABLED", "true").lower() == "true"
+TRACKING_BASE_URL = os.getenv("TRACKING_BASE_URL", UNSUBSCRIBE_BASE_URL)
+
+# href="#unsubscribe" in a body is the author's placeholder for the unsubscribe link
+UNSUBSCRIBE_PLACEHOLDER = re.compile(
+    r"""(\bhref\s*=\s*)(["'])#unsubscribe\2""", re.IGNORECASE
+)
+LINK = re.compile(r"""(<a\b[^>]*?\bhref\s*=\s*)(["'])(.*?)\2""", re.IGNORECASE | re.DOTALL)
+HTML_TAG = re.compile(r"<[A-Za-z!/][^>]*>")
+
+PRESERVED = re.compile(
+    r"<(pre|textarea|script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL
+)
+# Conditional comments are kept, Outlook relies on them
+COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+WHITESPACE = re.compile(r"\s+")
+BLOCK_TAG_GAP = re.compile(
+    r"\s*(</?(?:!doctype|address|article|aside|blockquote|body|br|center|div|dd|dl|"
+    r"dt|footer|form|h[1-6]|head|header|hr|html|li|link|meta|nav|ol|p|section|"
+    r"table|tbody|td|tfoot|th|thead|title|tr|ul)\b[^>]*>)\s*",
+    re.IGNORECASE,
+)
+
+
+def is_html(body: str) -> bool:
+    return bool(HTML_TAG.search(body))
+
+
+def minify_html(body: str) -> str:
+    """
+    Strip comments and collapse insignificant whitespace.
+
+    Runs of whitespace become one space and whitespace around block-level
+    tags is dropped. ``pre``, ``textarea``, ``script`` and ``style``
+    elements are kept verbatim.
+    """
+
+    def squeeze(segment: str) -> str:
+        segment = COMMENT.sub("", segment)
+        segment = WHITESPACE.sub(" ", segment)
+        return BLOCK_TAG_GAP.sub(r"\1", segment)
+
+    parts = []
+    position = 0
+    for match in PRESERVED.finditer(body):
+        parts.append(squeeze(body[position:match.start()]))
+        parts.append(match.group(0))
+        position = match.end()
+    parts.append(squeeze(body[position:]))
+    return "".join(parts).strip()
+
+
+class _TextExtractor(HTMLParser):
+    BLOCK_TAGS = {
+        "address", "article", "blockquote", "div", "dl", "dt", "dd", "footer",
+        "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "ol", "p",
+        "section", "table", "tr", "ul",
+    }
+    SKIPPED_TAGS = {"head", "script", "style", "title"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.skipping = 0
+        self.links: List[Tuple[str, int]] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self.skipping += 1
+        elif tag == "br":
+            self.parts.append("\n")
+        elif tag == "li":
+            self.parts.append("\n- ")
+        elif tag in ("td", "th"):
+            self.parts.append(" ")
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n\n")
+        elif tag == "a":
+            self.links.append((dict(attrs).get("href") or "", len(self.parts)))
+        elif tag == "img":
+            alt = dict(attrs).get("alt")
+            if alt:
+                self.parts.append(alt)
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS:
+            self.skipping = max(self.skipping - 1, 0)
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n\n")
+        elif tag == "a" and self.links:
+            href, start = self.links.pop()
+            text = "".join(self.parts[start:]).strip()
+            if href and not href.startswith(("#", "mailto:")) and href != text:
+                self.parts.append(f" ({href})")
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(data)
+
+    def text(self) -> str:
+        lines = [
+            WHITESPACE.sub(" ", line).strip()
+            for line in "".join(self.parts).split("\n")
+        ]
+        text = "\n".join(lines)
+        return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def html_to_text(body: str) -> str:
+    """Readable plain-text alternative of an HTML body, links shown as ``text (url)``."""
+    extractor = _TextExtractor()
+    extractor.feed(body)
+    extractor.close()
+    return extractor.text()
+
+
+def track_links(body: str, content_id: int) -> Tuple[str, List[str]]:
+    """
+    Point http(s) links at the click tracking redirect.
+
+    Each distinct target is stored once; the rewritten href carries its index
+    and a ``{{ subscriber_token }}`` merge tag, a signed subscriber id, so
+    clicks are attributed without per-send processing. Links that are merge tags are left alone.
+
+    Returns:
+        The rewritten body and the list of link targets
+    """
+    links: List[str] = []
+
+    def rewrite(match: re.Match) -> str:
+        url = html.unescape(match.group(3).strip())
+        if not url.lower().startswith(("http://", "https://")) or "{{" in url:
+            return match.group(0)
+        if url not in links:
+            links.append(url)
+        tracked = (
+            f"{TRACKING_BASE_URL}/api/track/{content_id}/{links.index(url)}"
+            "?s={{ subscriber_token }}"
+        )
+        return f"{match.group(1)}{match.group(2)}{tracked}{match.group(2)}"
+
+    return LINK.sub(rewrite, body), links
+
+
+def prepare_body(
+    body: str, content_id: Optional[int] = None
+) -> Tuple[str, str, List[str]]:
+    """
+    Run the preparation pipeline over a content body.
+
+    Returns:
+        ``(html, text, links)``: the minified HTML with tracked links, its
+        plain-text alternative and the tracked link targets. Plain-text
+        bodies are returned unchanged as both parts.
+    """
+    body = UNSUBSCRIBE_PLACEHOLDER.sub(r"\1\2{{ unsubscribe_url }}\2", body)
+    if not is_html(body):
+        return body, body, []
+
+    text = html_to_text(body)
+    links: List[str] = []
+    if CLICK_TRACKING_ENABLED and content_id is not None:
+        body, links = track_links(body, content_id)
+    return minify_html(body), text, links
+
+
+def prepare_content(content: Content) -> None:
+    """Store the prepared HTML, text and links of ``content``. The caller commits."""
+    content.prepared_html, content.prepared_text, content.prepared_links = (
+        prepare_body(content.body, content.id)
+    )
+
+
+def prepared_html(content: Content) -> str:
+    return content.prepared_html if content.prepared_html is not None else content.body
+
+
+def ensure_prepared(db: Session, content: Content) -> None:
+    """Prepare content created without going through the API, e.g. by imports."""
+    if content.prepared_html is None:
+        prepare_content(content)
+        db.commit()
+        logger.info(f"Prepared body of content {content.id}")
@@ -0,0 +1,290 @@
+import os
+import re
+import json
+import time
+import pstats
+import logging
+import cProfile
+import threading
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.services.task_runs import CONTENT_TASKS
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated task names, full (app.tasks.send_chunk) or short (send_chunk)
+PROFILE_TASKS = os.getenv("PROFILE_TASKS", "")
+# Comma-separated content ids; runs of content tasks for them are profiled
+PROFILE_CONTENT_IDS = os.getenv("PROFILE_CONTENT_IDS", "")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "25"))
+
+# Reports are named <timestamp>-<task>-<task id>.json
+REPORT_NAME = re.compile(r"^[\w.-]+\.json$")
+
+
+def parse_names(value: str) -> Set[str]:
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def parse_ids(value: str) -> Set[int]:
+    return {int(item) for item in parse_names(value) if item.isdigit()}
+
+
+class TaskProfile:
+    """Measurements of one task run: CPU profile, allocations and SQL statements."""
+
+    def __init__(self, task_name: str, task_id: str, content_id: Optional[int]):
+        self.task_name = task_name
+        self.task_id = task_id
+        self.content_id = content_id
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.cpu = cProfile.Profile()
+        # Another profiled run was active at some point, so the peak is shared
+        self.overlapped = False
+        self.statements: Dict[str, List[float]] = {}
+
+    def record_statement(self, statement: str, seconds: float) -> None:
+        stats = self.statements.setdefault(statement, [0, 0.0])
+        stats[0] += 1
+        stats[1] += seconds
+
+
+class TaskProfiler:
+    """
+    Opt-in profiling of Celery task runs.
+
+    A run is profiled when its task name is in ``PROFILE_TASKS`` or it is a
+    content task for a content id in ``PROFILE_CONTENT_IDS``. Each profiled
+    run writes a JSON report (peak traced memory and top allocation sites,
+    top functions by cumulative time, SQL statement counts and time) and a
+    ``.prof`` file for pstats or snakeviz to ``PROFILE_DIR``.
+
+    CPU profiles and SQL timings cover the task's own thread. Traced memory
+    is process wide, so with a threaded pool it includes concurrent tasks;
+    tracing runs while any profiled run is active and reports of overlapping
+    runs are marked as such.
+    """
+
+    def __init__(
+        self,
+        tasks: Optional[Set[str]] = None,
+        content_ids: Optional[Set[int]] = None,
+        directory: str = PROFILE_DIR,
+    ):
+        self.tasks = parse_names(PROFILE_TASKS) if tasks is None else tasks
+        self.content_ids = (
+            parse_ids(PROFILE_CONTENT_IDS) if content_ids is None else content_ids
+        )
+        self.directory = Path(directory)
+        self.profiles: Dict[str, TaskProfile] = {}
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self._listening = False
+        self._owns_tracemalloc = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.tasks or self.content_ids)
+
+    def content_id_of(self, task_name: str, args: list, kwargs: dict) -> Optional[int]:
+        if "content_id" in kwargs:
+            return kwargs["content_id"]
+        if task_name in CONTENT_TASKS and args:
+            return args[0]
+        return None
+
+    def should_profile(self, task_name: str, content_id: Optional[int]) -> bool:
+        if task_name in self.tasks or task_name.rsplit(".", 1)[-1] in self.tasks:
+            return True
+        return content_id is not None and content_id in self.content_ids
+
+    def _listen(self) -> None:
+        # Hooks are only installed once something is profiled, so unprofiled
+        # processes pay nothing per statement
+        with self.lock:
+            if self._listening:
+                return
+            event.listen(Engine, "before_cursor_execute", self._before_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_execute)
+            self._listening = True
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self.local, "profile", None) is not None:
+            conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        profile = getattr(self.local, "profile", None)
+        started = conn.info.get("profile_started")
+        if profile is not None and started:
+            profile.record_statement(statement, time.perf_counter() - started.pop())
+
+    def start(
+        self,
+        task_name: str,
+        task_id: str,
+        args: Optional[list] = None,
+        kwargs: Optional[dict] = None,
+    ) -> bool:
+        """Start profiling the run if it is selected. Returns whether it is."""
+        if not self.enabled:
+            return False
+        content_id = self.content_id_of(task_name, args or [], kwargs or {})
+        if not self.should_profile(task_name, content_id):
+            return False
+
+        self._listen()
+        profile = TaskProfile(task_name, task_id, content_id)
+        with self.lock:
+            if self.profiles:
+                # The peak of a running profile must not be reset under it
+                profile.overlapped = True
+                for other in self.profiles.values():
+                    other.overlapped = True
+            else:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._owns_tracemalloc = True
+                tracemalloc.reset_peak()
+            self.profiles[task_id] = profile
+        self.local.profile = profile
+        profile.cpu.enable()
+        return True
+
+    def finish(self, task_id: str, state: str = "UNKNOWN") -> Optional[Path]:
+        """Stop profiling the run and write its report. Returns the report path."""
+        profile = self.profiles.get(task_id)
+        if profile is None:
+            return None
+        profile.cpu.disable()
+        self.local.profile = None
+        duration_ms = int((time.perf_counter() - profile.started) * 1000)
+
+        with self.lock:
+            # Tracing is stopped by the last profiled run to finish, so it is
+            # still on for this snapshot
+            _, peak = tracemalloc.get_traced_memory()
+            allocations = tracemalloc.take_snapshot().statistics("lineno")[:PROFILE_TOP_N]
+            del self.profiles[task_id]
+            if not self.profiles and self._owns_tracemalloc:
+                tracemalloc.stop()
+                self._owns_tracemalloc = False
+
+        report = {
+            "task": profile.task_name,
+            "task_id": task_id,
+            "content_id": profile.content_id,
+            "state": state,
+            "started_at": profile.started_at.isoformat(),
+            "duration_ms": duration_ms,
+            "memory": {
+                "peak_bytes": peak,
+                "overlapped": profile.overlapped,
+                "top_allocations": [
+                    {
+                        "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                        "size_bytes": stat.size,
+                        "count": stat.count,
+                    }
+                    for stat in allocations
+                ],
+            },
+            "cpu": {"top_functions": self._top_functions(profile.cpu)},
+            "sql": self._sql_summary(profile),
+        }
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            stem = (
+                f"{profile.started_at:%Y%m%dT%H%M%S}-"
+                f"{profile.task_name.rsplit('.', 1)[-1]}-{task_id}"
+            )
+            profile.cpu.dump_stats(str(self.directory / f"{stem}.prof"))
+            path = self.directory / f"{stem}.json"
+            path.write_text(json.dumps(report, indent=2))
+        except OSError as e:
+            logger.error(f"Could not write profile of task {task_id}: {str(e)}")
+            return None
+        logger.info(
+            f"Profiled {profile.task_name} {task_id}: {duration_ms}ms, "
+            f"peak {peak / 1024 / 1024:.1f} MiB, {report['sql']['queries']} queries"
+        )
+        return path
+
+    def _top_functions(self, cpu: cProfile.Profile) -> List[Dict[str, Any]]:
+        stats = pstats.Stats(cpu)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                "function": f"{filename}:{lineno}({name})",
+                "calls": calls,
+                "own_ms": round(own * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            }
+            for (filename, lineno, name), (_, calls, own, cumulative, _) in rows[
+                :PROFILE_TOP_N
+            ]
+        ]
+
+    def _sql_summary(self, profile: TaskProfile) -> Dict[str, Any]:
+        statements = sorted(
+            profile.statements.items(), key=lambda item: item[1][1], reverse=True
+        )
+        return {
+            "queries": sum(count for count, _ in profile.statements.values()),
+            "total_ms": round(
+                sum(seconds for _, seconds in profile.statements.values()) * 1000, 3
+            ),
+            "top_statements": [
+                {
+                    "statement": " ".join(statement.split())[:500],
+                    "count": count,
+                    "total_ms": round(seconds * 1000, 3),
+                }
+                for statement, (count, seconds) in statements[:PROFILE_TOP_N]
+            ],
+        }
+
+    def reports(self) -> List[Dict[str, Any]]:
+        """Summaries of the stored reports, most recent first."""
+        if not self.directory.is_dir():
+            return []
+        summaries = []
+        for path in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                report = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            summaries.append(
+                {
+                    "name": path.name,
+                    "task": report.get("task"),
+                    "task_id": report.get("task_id"),
+                    "content_id": report.get("content_id"),
+                    "state": report.get("state"),
+                    "started_at": report.get("started_at"),
+                    "duration_ms": report.get("duration_ms"),
+                    "peak_bytes": report.get("memory", {}).get("peak_bytes"),
+                    "queries": report.get("sql", {}).get("queries"),
+                }
+            )
+        return summaries
+
+    def report(self, name: str) -> Optional[Dict[str, Any]]:
+        """A stored report by file name, None if there is no such report."""
+        if not REPORT_NAME.match(name):
+            return None
+        path = self.directory / name
+        if not path.is_file():
+            return None
+        return json.loads(path.read_text())
+
+
+task_profiler = TaskProfiler()
@@ -0,0 +1,172 @@
+import os
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Sequence, Union
+
+import redis
+from sqlalchemy.orm import Session
+
+from app.models import Content
+from app.services.delivery import record_delivery_counts
+from app.services.redis_client import get_redis, mark_redis_unavailable
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_FLUSH_EVERY = int(os.getenv("SEND_PROGRESS_FLUSH_EVERY", "100"))
+PROGRESS_FLUSH_SECONDS = float(os.getenv("SEND_PROGRESS_FLUSH_SECONDS", "2"))
+PROGRESS_TTL_SECONDS = int(os.getenv("SEND_PROGRESS_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+def progress_key(content_id: int) -> str:
+    return f"newsletter:progress:{content_id}"
+
+
+class ProgressTracker:
+    """
+    Buffer per-recipient outcomes of a send and flush them in batches.
+
+    Every ``PROGRESS_FLUSH_EVERY`` recipients or ``PROGRESS_FLUSH_SECONDS``
+    seconds the buffered counts are added to the content's delivery counters
+    with one UPDATE and to a Redis hash with one pipelined HINCRBY round trip.
+    A digest passes the ids of all its items and updates each of them.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        content_id: Union[int, Sequence[int]],
+        total: int,
+        redis_client: Optional[redis.Redis] = None,
+    ):
+        self.db = db
+        self.content_id = content_id
+        self.content_ids = [content_id] if isinstance(content_id, int) else list(content_id)
+        self.total = total
+        self.redis = redis_client
+        self.sent = 0
+        self.failed = 0
+        self.suppressed = 0
+        self._pending_sent = 0
+        self._pending_failed = 0
+        self._pending_suppressed = 0
+        self._last_flush = time.monotonic()
+
+    def start(self) -> None:
+        client = self.redis or get_redis()
+        if client is None:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for content_id in self.content_ids:
+                key = progress_key(content_id)
+                pipe.hsetnx(key, "started_at", time.time())
+                pipe.hset(key, "total", self.total)
+                pipe.expire(key, PROGRESS_TTL_SECONDS)
+            pipe.execute()
+        except redis.RedisError as e:
+            mark_redis_unavailable(e)
+
+    def record(self, sent: bool) -> None:
+        if sent:
+            self.sent += 1
+            self._pending_sent += 1
+        else:
+            self.failed += 1
+            self._pending_failed += 1
+        self._maybe_flush()
+
+    def record_suppressed(self) -> None:
+        self.suppressed += 1
+        self._pending_suppressed += 1
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        pending = self._pending_sent + self._pending_failed + self._pending_suppressed
+        if (
+            pending >= PROGRESS_FLUSH_EVERY
+            or time.monotonic() - self._last_flush >= PROGRESS_FLUSH_SECONDS
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        sent, failed = self._pending_sent, self._pending_failed
+        suppressed = self._pending_suppressed
+        self._last_flush = time.monotonic()
+        if not sent and not failed and not suppressed:
+            return
+
+        record_delivery_counts(self.db, self.content_ids, sent, failed, suppressed)
+        self.db.commit()
+        self._pending_sent = self._pending_failed = self._pending_suppressed = 0
+
+        client = self.redis or get_redis()
+        if client is None:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for content_id in self.content_ids:
+                key = progress_key(content_id)
+                pipe.hincrby(key, "sent", sent)
+                pipe.hincrby(key, "failed", failed)
+                pipe.hincrby(key, "suppressed", suppressed)
+                pipe.hset(key, "updated_at", time.time())
+                pipe.expire(key, PROGRESS_TTL_SECONDS)
+            pipe.execute()
+        except redis.RedisError as e:
+            mark_redis_unavailable(e)
+
+
+def _from_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromtimestamp(float(value), tz=timezone.utc)
+
+
+def read_progress(
+    content: Content, redis_client: Optional[redis.Redis] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Build the live progress of a send.
+
+    Counters come from Redis while a send is running and fall back to the
+    content's database counters when Redis has no data or is unavailable.
+    Returns None for content whose audience has not been resolved yet.
+    """
+    if content.recipient_count is None:
+        return None
+
+    data: Dict[str, str] = {}
+    client = redis_client or get_redis()
+    if client is not None:
+        try:
+            data = client.hgetall(progress_key(content.id)) or {}
+        except redis.RedisError as e:
+            mark_redis_unavailable(e)
+
+    sent = max(int(data.get("sent", 0)), content.sent_count or 0)
+    failed = max(int(data.get("failed", 0)), content.failed_count or 0)
+    suppressed = max(int(data.get("suppressed", 0)), content.suppressed_count or 0)
+    total = int(data.get("total", content.recipient_count))
+    remaining = max(total - sent - failed - suppressed, 0)
+
+    started_at = _from_timestamp(data.get("started_at"))
+    updated_at = _from_timestamp(data.get("updated_at"))
+    rate = None
+    estimated_completion = None
+    if started_at and updated_at and updated_at > started_at:
+        rate = (sent + failed + suppressed) / (updated_at - started_at).total_seconds()
+        if rate > 0 and remaining:
+            estimated_completion = updated_at + timedelta(seconds=remaining / rate)
+
+    return {
+        "total": total,
+        "sent": sent,
+        "failed": failed,
+        "suppressed": suppressed,
+        "remaining": remaining,
+        "rate_per_second": round(rate, 2) if rate is not None else None,
+        "started_at": started_at,
+        "updated_at": updated_at,
+        "estimated_completion": estimated_completion,
+    }
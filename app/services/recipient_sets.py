@@ -0,0 +1,96 @@
+import json
+import zlib
+import base64
+from typing import Any, Dict, Iterable, List, Union
+
+# Version of the descriptor format; bump it when the encoding changes and
+# keep decoding the previous versions until their messages have drained
+RECIPIENT_SET_VERSION = 1
+
+RecipientSet = Dict[str, Any]
+
+
+def _ranges(subscriber_ids: List[int]) -> List[List[int]]:
+    ranges: List[List[int]] = []
+    for subscriber_id in subscriber_ids:
+        if ranges and subscriber_id == ranges[-1][1] + 1:
+            ranges[-1][1] = subscriber_id
+        else:
+            ranges.append([subscriber_id, subscriber_id])
+    return ranges
+
+
+def _pack(subscriber_ids: List[int]) -> str:
+    """Delta-encode sorted ids as LEB128 varints, deflate and base64 them."""
+    packed = bytearray()
+    previous = 0
+    for subscriber_id in subscriber_ids:
+        delta = subscriber_id - previous
+        previous = subscriber_id
+        while delta >= 0x80:
+            packed.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        packed.append(delta)
+    return base64.b64encode(zlib.compress(bytes(packed), 9)).decode("ascii")
+
+
+def _unpack(data: str) -> List[int]:
+    subscriber_ids = []
+    previous = delta = shift = 0
+    for byte in zlib.decompress(base64.b64decode(data)):
+        delta |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        previous += delta
+        subscriber_ids.append(previous)
+        delta = shift = 0
+    return subscriber_ids
+
+
+def encode_recipient_set(subscriber_ids: Iterable[int]) -> RecipientSet:
+    """
+    Compact, JSON-safe descriptor of a set of subscriber ids for task messages.
+
+    Ids are sorted and deduplicated, then stored either as inclusive
+    ``[first, last]`` ranges, which suits contiguous keyset batches, or as
+    packed deltas, which suits sparse ones; whichever is smaller. Workers
+    resolve the emails themselves, so no addresses travel through the broker.
+    """
+    subscriber_ids = sorted(set(subscriber_ids))
+    as_ranges = {"v": RECIPIENT_SET_VERSION, "ranges": _ranges(subscriber_ids)}
+    if len(as_ranges["ranges"]) <= 4:
+        return as_ranges
+    as_packed = {
+        "v": RECIPIENT_SET_VERSION,
+        "packed": _pack(subscriber_ids),
+        "count": len(subscriber_ids),
+    }
+    if len(json.dumps(as_ranges)) <= len(json.dumps(as_packed)):
+        return as_ranges
+    return as_packed
+
+
+def decode_recipient_set(recipients: Union[RecipientSet, List[int]]) -> List[int]:
+    """
+    Sorted subscriber ids of a descriptor.
+
+    Plain id lists, the format used before descriptors, are still accepted
+    so messages queued before an upgrade are processed.
+    """
+    if isinstance(recipients, list):
+        return sorted(set(recipients))
+
+    version = recipients.get("v")
+    if version != RECIPIENT_SET_VERSION:
+        raise ValueError(f"Unsupported recipient set version: {version}")
+    if "ranges" in recipients:
+        return [
+            subscriber_id
+            for first, last in recipients["ranges"]
+            for subscriber_id in range(first, last + 1)
+        ]
+    subscriber_ids = _unpack(recipients["packed"])
+    if len(subscriber_ids) != recipients["count"]:
+        raise ValueError("Corrupt recipient set")
+    return subscriber_ids
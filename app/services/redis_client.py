@@ -0,0 +1,48 @@
+import os
+import time
+import logging
+from functools import lru_cache
+from typing import Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL") or os.getenv(
+    "CELERY_BROKER_URL", "redis://localhost:6379/0"
+)
+REDIS_TIMEOUT_SECONDS = float(os.getenv("REDIS_TIMEOUT_SECONDS", "1"))
+REDIS_BACKOFF_SECONDS = float(os.getenv("REDIS_BACKOFF_SECONDS", "30"))
+
+_unavailable_until = 0.0
+
+
+@lru_cache(maxsize=1)
+def _client() -> redis.Redis:
+    return redis.Redis.from_url(
+        REDIS_URL,
+        socket_connect_timeout=REDIS_TIMEOUT_SECONDS,
+        socket_timeout=REDIS_TIMEOUT_SECONDS,
+        decode_responses=True,
+    )
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """
+    Return the shared Redis client used for counters and flags.
+
+    Returns None while Redis is backing off after a failure, so callers can
+    fall back to the database without waiting on connection timeouts.
+    """
+    if time.monotonic() < _unavailable_until:
+        return None
+    return _client()
+
+
+def mark_redis_unavailable(error: Exception) -> None:
+    """Stop using Redis for ``REDIS_BACKOFF_SECONDS`` after a failed call."""
+    global _unavailable_until
+    logger.warning(
+        f"Redis unavailable, falling back for {REDIS_BACKOFF_SECONDS:.0f}s: {str(error)}"
+    )
+    _unavailable_until = time.monotonic() + REDIS_BACKOFF_SECONDS
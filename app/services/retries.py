@@ -0,0 +1,67 @@
+import os
+import random
+import logging
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models import DeadLetter
+from app.services.email_service import EmailSendError
+
+logger = logging.getLogger(__name__)
+
+SEND_RETRY_MAX_ATTEMPTS = int(os.getenv("SEND_RETRY_MAX_ATTEMPTS", "4"))
+SEND_RETRY_BASE_SECONDS = float(os.getenv("SEND_RETRY_BASE_SECONDS", "30"))
+SEND_RETRY_MAX_SECONDS = float(os.getenv("SEND_RETRY_MAX_SECONDS", "3600"))
+SEND_RETRY_BATCH_SIZE = int(os.getenv("SEND_RETRY_BATCH_SIZE", "500"))
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether a per-recipient send failure is worth retrying."""
+    return isinstance(error, EmailSendError) and error.transient
+
+
+def should_retry(error: Exception, attempt: int) -> bool:
+    return is_transient(error) and attempt < SEND_RETRY_MAX_ATTEMPTS
+
+
+def retry_delay(attempt: int) -> float:
+    """
+    Seconds to wait before retry ``attempt + 1``.
+
+    Exponential backoff capped at ``SEND_RETRY_MAX_SECONDS``, with half of the
+    delay randomized so retries from one failure burst spread out.
+    """
+    delay = min(SEND_RETRY_MAX_SECONDS, SEND_RETRY_BASE_SECONDS * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def add_dead_letters(
+    db: Session,
+    content_id: int,
+    failures: Iterable[Tuple[int, str, str]],
+    attempts: int,
+) -> int:
+    """
+    Store permanently failed recipients with one multi-row INSERT.
+
+    Args:
+        failures: ``(subscriber_id, email, reason)`` tuples
+
+    Returns:
+        Number of dead letters written. The caller commits.
+    """
+    rows: List[dict] = [
+        {
+            "content_id": content_id,
+            "subscriber_id": subscriber_id,
+            "email": email,
+            "reason": reason,
+            "attempts": attempts,
+        }
+        for subscriber_id, email, reason in failures
+    ]
+    if rows:
+        db.execute(insert(DeadLetter), rows)
+    return len(rows)
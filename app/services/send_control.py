@@ -0,0 +1,109 @@
+import os
+import time
+import logging
+from typing import Optional, Sequence, Union
+
+import redis
+from sqlalchemy.orm import Session
+
+from app.models import Content, ContentStatus
+from app.services.redis_client import get_redis, mark_redis_unavailable
+
+logger = logging.getLogger(__name__)
+
+SEND_CONTROL_CHECK_EVERY = int(os.getenv("SEND_CONTROL_CHECK_EVERY", "50"))
+SEND_CONTROL_CHECK_SECONDS = float(os.getenv("SEND_CONTROL_CHECK_SECONDS", "2"))
+SEND_CONTROL_DB_CHECK_SECONDS = float(os.getenv("SEND_CONTROL_DB_CHECK_SECONDS", "30"))
+SEND_CONTROL_TTL_SECONDS = int(os.getenv("SEND_CONTROL_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Statuses that stop an in-flight send
+STOP_STATUSES = (ContentStatus.PAUSED, ContentStatus.CANCELLED)
+
+
+def control_key(content_id: int) -> str:
+    return f"newsletter:control:{content_id}"
+
+
+def set_send_control(content_id: int, status: Optional[ContentStatus]) -> None:
+    """
+    Publish a pause or cancel request to in-flight senders of a content item.
+
+    Passing None clears the flag. The database status stays authoritative;
+    senders fall back to it when Redis is unavailable.
+    """
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        if status in STOP_STATUSES:
+            client.set(control_key(content_id), status.value, ex=SEND_CONTROL_TTL_SECONDS)
+        else:
+            client.delete(control_key(content_id))
+    except redis.RedisError as e:
+        mark_redis_unavailable(e)
+
+
+class SendControl:
+    """
+    Cheap cooperative stop check for a running send.
+
+    Polled between batches of recipients, it only looks anything up every
+    ``SEND_CONTROL_CHECK_EVERY`` recipients or ``SEND_CONTROL_CHECK_SECONDS``
+    seconds. It reads the Redis control flag and falls back to the content's
+    status column when Redis is unavailable or every
+    ``SEND_CONTROL_DB_CHECK_SECONDS``, in case a flag was never written.
+
+    A digest passes the ids of all its items; it stops when any of them is
+    paused or cancelled.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        content_id: Union[int, Sequence[int]],
+        redis_client: Optional[redis.Redis] = None,
+    ):
+        self.db = db
+        self.content_ids = (
+            [content_id] if isinstance(content_id, int) else list(content_id)
+        )
+        self.redis = redis_client
+        self._since_check = 0
+        self._last_check = time.monotonic()
+        self._last_db_check = self._last_check
+
+    def poll(self, handled: int = 1) -> Optional[ContentStatus]:
+        """
+        Return PAUSED or CANCELLED when the send must stop, else None.
+
+        ``handled`` is the number of recipients processed since the last poll.
+        """
+        self._since_check += handled
+        now = time.monotonic()
+        if (
+            self._since_check < SEND_CONTROL_CHECK_EVERY
+            and now - self._last_check < SEND_CONTROL_CHECK_SECONDS
+        ):
+            return None
+        self._since_check = 0
+        self._last_check = now
+
+        client = self.redis or get_redis()
+        if client is not None and now - self._last_db_check < SEND_CONTROL_DB_CHECK_SECONDS:
+            try:
+                values = client.mget(
+                    [control_key(content_id) for content_id in self.content_ids]
+                )
+                value = next((value for value in values if value), None)
+                return ContentStatus(value) if value else None
+            except redis.RedisError as e:
+                mark_redis_unavailable(e)
+
+        self._last_db_check = now
+        statuses = [
+            row.status
+            for row in self.db.query(Content.status).filter(
+                Content.id.in_(self.content_ids)
+            )
+        ]
+        return next((status for status in statuses if status in STOP_STATUSES), None)
@@ -0,0 +1,145 @@
+import os
+import time
+import uuid
+import logging
+from datetime import timedelta
+from typing import Optional, Sequence, Union
+
+from sqlalchemy import case, func, or_, update
+from sqlalchemy.orm import Session
+
+from app.models import Content, ContentStatus
+
+logger = logging.getLogger(__name__)
+
+# A send whose lease was not renewed for this long is considered dead
+SEND_LEASE_SECONDS = int(os.getenv("SEND_LEASE_SECONDS", "300"))
+SEND_LEASE_RENEW_SECONDS = float(
+    os.getenv("SEND_LEASE_RENEW_SECONDS", str(SEND_LEASE_SECONDS / 3))
+)
+
+
+def lease_owner(task_id: Optional[str]) -> str:
+    """Lease owner for a task run; direct calls have no task id."""
+    return task_id or f"local-{uuid.uuid4().hex}"
+
+
+class SendLease:
+    """
+    Per-content lease that keeps a single sender working through its audience.
+
+    ``acquire`` claims ``content.sending_by`` in one conditional UPDATE that
+    only succeeds when nobody holds the lease or its holder stopped renewing
+    it for ``SEND_LEASE_SECONDS``. The holder renews ``heartbeat_at`` while it
+    sends, at most every ``SEND_LEASE_RENEW_SECONDS``, and gives the lease up
+    when it stops. A renewal that finds the lease taken over reports it, so
+    the sender stops instead of sending alongside its successor. Taking over
+    an expired lease also forgets the content's outstanding retries: retries
+    keep the heartbeat fresh until they are due, so they were lost.
+
+    Chunks of a bulk send and retry batches run side by side over disjoint
+    recipients; they pass no owner and only keep ``heartbeat_at`` fresh. A digest
+    claims its items in ``claim_digest_content`` and holds one lease over
+    all of them.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        content_id: Union[int, Sequence[int]],
+        owner: Optional[str] = None,
+        held: bool = False,
+    ):
+        self.db = db
+        self.content_ids = (
+            [content_id] if isinstance(content_id, int) else list(content_id)
+        )
+        self.owner = owner
+        self.held = held
+        self._last_renewal: Optional[float] = None
+
+    def acquire(self) -> bool:
+        """Take the lease. Returns False if another live sender holds it."""
+        expired = Content.heartbeat_at < func.now() - timedelta(seconds=SEND_LEASE_SECONDS)
+        row = self.db.execute(
+            update(Content)
+            .where(
+                Content.id == self.content_ids[0],
+                Content.status == ContentStatus.PENDING,
+                or_(
+                    Content.sending_by.is_(None),
+                    Content.sending_by == self.owner,
+                    Content.heartbeat_at.is_(None),
+                    expired,
+                ),
+            )
+            .values(
+                sending_by=self.owner,
+                heartbeat_at=func.now(),
+                retries_pending=case((expired, 0), else_=Content.retries_pending),
+            )
+            .returning(Content.id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        self.db.commit()
+        self.held = row is not None
+        self._last_renewal = time.monotonic()
+        return self.held
+
+    def renew(self) -> bool:
+        """
+        Refresh the heartbeat if it is due.
+
+        Returns:
+            False if the lease was taken over by another sender
+        """
+        now = time.monotonic()
+        if (
+            self._last_renewal is not None
+            and now - self._last_renewal < SEND_LEASE_RENEW_SECONDS
+        ):
+            return True
+        self._last_renewal = now
+        conditions = [Content.id.in_(self.content_ids)]
+        if self.owner is not None:
+            conditions.append(Content.sending_by == self.owner)
+        result = self.db.execute(
+            update(Content)
+            .where(*conditions)
+            .values(heartbeat_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        if self.owner is not None and not result.rowcount:
+            logger.warning(f"Lost the send lease of content {', '.join(map(str, self.content_ids))}")
+            self.held = False
+            return False
+        return True
+
+    def release(self, redispatch: bool = False) -> None:
+        """
+        Give the lease up.
+
+        A sender that stopped for a pause passes ``redispatch``: content that
+        was resumed while it was stopping is dispatched again by the next beat.
+        """
+        if not self.held:
+            return
+        self.db.execute(
+            update(Content)
+            .where(Content.id.in_(self.content_ids), Content.sending_by == self.owner)
+            .values(sending_by=None)
+            .execution_options(synchronize_session=False)
+        )
+        if redispatch:
+            self.db.execute(
+                update(Content)
+                .where(
+                    Content.id.in_(self.content_ids),
+                    Content.status == ContentStatus.PENDING,
+                )
+                .values(dispatched_at=None)
+                .execution_options(synchronize_session=False)
+            )
+        self.db.commit()
+        self.held = False
@@ -0,0 +1,80 @@
+import os
+import time
+import random
+import logging
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# "summary" logs one line per delivery and a sample of the sent recipients,
+# "recipient" logs every sent recipient as well
+SEND_LOG_MODE = os.getenv("SEND_LOG_MODE", "summary")
+SEND_LOG_SAMPLE_RATE = float(os.getenv("SEND_LOG_SAMPLE_RATE", "0.001"))
+
+
+class SendLog:
+    """
+    Log lines of one delivery run.
+
+    Successful sends are counted and only a sample of them, a share of
+    ``SEND_LOG_SAMPLE_RATE``, is logged unless ``SEND_LOG_MODE`` is
+    ``recipient``. The run ends with one summary line. Failures are logged
+    by the send loop itself, always.
+
+    Lines carry their counts as record attributes (``extra``) for
+    structured log formatters.
+    """
+
+    def __init__(
+        self,
+        content_id: int,
+        mode: str = SEND_LOG_MODE,
+        sample_rate: float = SEND_LOG_SAMPLE_RATE,
+        sample: Callable[[], float] = random.random,
+    ):
+        self.content_id = content_id
+        self.sample_rate = 1.0 if mode == "recipient" else sample_rate
+        self.sample = sample
+        self.started = time.monotonic()
+        self.sent = 0
+        self.failed = 0
+        self.retrying = 0
+        self.suppressed = 0
+
+    def record_sent(self, subscriber_id: int, email: str) -> None:
+        self.sent += 1
+        if self.sample_rate >= 1 or (
+            self.sample_rate > 0 and self.sample() < self.sample_rate
+        ):
+            logger.info(
+                f"Sent email to {email} for content {self.content_id}",
+                extra={"content_id": self.content_id, "subscriber_id": subscriber_id},
+            )
+
+    def record_failed(self) -> None:
+        self.failed += 1
+
+    def record_retrying(self) -> None:
+        self.retrying += 1
+
+    def record_suppressed(self) -> None:
+        self.suppressed += 1
+
+    def summary(self, stopped: Optional[str] = None) -> None:
+        seconds = time.monotonic() - self.started
+        rate = self.sent / seconds if seconds > 0 else 0.0
+        logger.info(
+            f"Delivered content {self.content_id}: {self.sent} sent, "
+            f"{self.failed} failed, {self.retrying} retrying, "
+            f"{self.suppressed} suppressed in {seconds:.1f}s ({rate:.1f}/s)"
+            + (f", stopped: {stopped}" if stopped else ""),
+            extra={
+                "content_id": self.content_id,
+                "sent": self.sent,
+                "failed": self.failed,
+                "retrying": self.retrying,
+                "suppressed": self.suppressed,
+                "seconds": round(seconds, 3),
+                "stopped": stopped,
+            },
+        )
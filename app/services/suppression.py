@@ -0,0 +1,189 @@
+import os
+import math
+import time
+import hashlib
+import logging
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import Suppression, SuppressionReason
+from app.services.email_service import EmailSendError
+
+logger = logging.getLogger(__name__)
+
+SUPPRESSION_REFRESH_SECONDS = float(os.getenv("SUPPRESSION_REFRESH_SECONDS", "300"))
+SUPPRESSION_FALSE_POSITIVE_RATE = float(
+    os.getenv("SUPPRESSION_FALSE_POSITIVE_RATE", "0.001")
+)
+SUPPRESSION_CHECK_BATCH_SIZE = int(os.getenv("SUPPRESSION_CHECK_BATCH_SIZE", "500"))
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Uses double hashing over a single BLAKE2b digest, so each lookup costs
+    one hash computation and ``hash_count`` bit probes.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = SUPPRESSION_FALSE_POSITIVE_RATE):
+        capacity = max(capacity, 1)
+        self.size = max(
+            8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        )
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str) -> Iterator[int]:
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+class SuppressionCache:
+    """
+    Per-process Bloom filter of suppressed addresses.
+
+    Rebuilt from the ``suppressions`` table every
+    ``SUPPRESSION_REFRESH_SECONDS``. Addresses suppressed by this process are
+    added immediately; those suppressed elsewhere show up on the next refresh.
+    """
+
+    def __init__(self):
+        self.bloom: Optional[BloomFilter] = None
+        self.refreshed_at = 0.0
+
+    def refresh(self, db: Session) -> None:
+        count = db.query(func.count(Suppression.id)).scalar() or 0
+        bloom = BloomFilter(capacity=max(count * 2, 1000))
+        for (email,) in db.query(Suppression.email).yield_per(10000):
+            bloom.add(email)
+        self.bloom = bloom
+        self.refreshed_at = time.monotonic()
+        logger.info(f"Loaded {count} suppressed addresses into Bloom filter")
+
+    def ensure_fresh(self, db: Session) -> None:
+        if (
+            self.bloom is None
+            or time.monotonic() - self.refreshed_at >= SUPPRESSION_REFRESH_SECONDS
+        ):
+            self.refresh(db)
+
+    def add(self, email: str) -> None:
+        if self.bloom is not None:
+            self.bloom.add(normalize_email(email))
+
+    def might_contain(self, email: str) -> bool:
+        return self.bloom is not None and normalize_email(email) in self.bloom
+
+
+suppression_cache = SuppressionCache()
+
+
+def _confirm_suppressed(db: Session, emails: List[str]) -> Set[str]:
+    if not emails:
+        return set()
+    rows = db.query(Suppression.email).filter(Suppression.email.in_(emails)).all()
+    return {row.email for row in rows}
+
+
+def filter_suppressed(
+    db: Session,
+    recipients: Iterable[Tuple[int, str]],
+    on_suppressed=None,
+) -> Iterator[Tuple[int, str]]:
+    """
+    Drop suppressed addresses from a recipient stream.
+
+    Recipients are checked against the in-memory Bloom filter. Only filter
+    hits, which include rare false positives, are confirmed against the
+    database, with one query per ``SUPPRESSION_CHECK_BATCH_SIZE`` recipients.
+    ``on_suppressed`` is called with each dropped ``(subscriber_id, email)``.
+    """
+    suppression_cache.ensure_fresh(db)
+
+    batch: List[Tuple[int, str]] = []
+    candidates: List[str] = []
+
+    def drain() -> Iterator[Tuple[int, str]]:
+        confirmed = _confirm_suppressed(db, candidates)
+        for subscriber_id, email in batch:
+            if normalize_email(email) in confirmed:
+                if on_suppressed is not None:
+                    on_suppressed(subscriber_id, email)
+                continue
+            yield subscriber_id, email
+
+    for subscriber_id, email in recipients:
+        batch.append((subscriber_id, email))
+        if suppression_cache.might_contain(email):
+            candidates.append(normalize_email(email))
+        if len(batch) >= SUPPRESSION_CHECK_BATCH_SIZE:
+            yield from drain()
+            batch, candidates = [], []
+
+    yield from drain()
+
+
+def suppress(
+    db: Session,
+    entries: Iterable[Tuple[str, SuppressionReason]],
+    source: str,
+) -> int:
+    """
+    Add addresses to the suppression list with one multi-row upsert.
+
+    Already suppressed addresses keep their original reason. The caller
+    commits.
+
+    Returns:
+        Number of newly suppressed addresses
+    """
+    rows = {}
+    for email, reason in entries:
+        rows.setdefault(
+            normalize_email(email),
+            {"email": normalize_email(email), "reason": reason, "source": source},
+        )
+    if not rows:
+        return 0
+
+    result = db.execute(
+        insert(Suppression)
+        .values(list(rows.values()))
+        .on_conflict_do_nothing(index_elements=["email"])
+    )
+    for email in rows:
+        suppression_cache.add(email)
+    return result.rowcount
+
+
+def suppression_reason_for(error: Exception) -> Optional[SuppressionReason]:
+    """Suppression reason implied by a permanent send failure, if any."""
+    if (
+        isinstance(error, EmailSendError)
+        and not error.transient
+        and error.status_code == 400
+        and "email" in str(error).lower()
+    ):
+        return SuppressionReason.INVALID
+    return None
@@ -0,0 +1,128 @@
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, insert
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import TaskRun
+
+logger = logging.getLogger(__name__)
+
+TASK_RUN_FLUSH_EVERY = int(os.getenv("TASK_RUN_FLUSH_EVERY", "50"))
+TASK_RUN_FLUSH_SECONDS = float(os.getenv("TASK_RUN_FLUSH_SECONDS", "10"))
+TASK_RUN_RETENTION_DAYS = float(os.getenv("TASK_RUN_RETENTION_DAYS", "14"))
+
+# Tasks whose first argument is the content id
+CONTENT_TASKS = {
+    "app.tasks.send_content_to_subscribers",
+    "app.tasks.retry_recipients",
+}
+
+
+def summarize(result: Any) -> Optional[Dict[str, Any]]:
+    """Scalar fields of a task result; lists such as error messages are dropped."""
+    if not isinstance(result, dict):
+        return None
+    return {
+        key: value
+        for key, value in result.items()
+        if isinstance(value, (str, int, float, bool, type(None)))
+    }
+
+
+class TaskRunRecorder:
+    """
+    Buffer task run summaries and write them with one INSERT per batch.
+
+    A batch is written every ``TASK_RUN_FLUSH_EVERY`` runs or
+    ``TASK_RUN_FLUSH_SECONDS`` seconds, whichever comes first, and when the
+    worker process shuts down. History is best effort: a failed write is
+    logged and dropped so it never fails a task.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self.rows: List[Dict[str, Any]] = []
+        self.started: Dict[str, float] = {}
+        self.lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def start(self, task_id: str) -> None:
+        self.started[task_id] = time.monotonic()
+
+    def finish(
+        self,
+        task_name: str,
+        task_id: str,
+        state: str,
+        result: Any = None,
+        args: Optional[list] = None,
+        worker: Optional[str] = None,
+    ) -> None:
+        started = self.started.pop(task_id, None)
+        summary = summarize(result)
+        content_id = (summary or {}).get("content_id")
+        if content_id is None and task_name in CONTENT_TASKS and args:
+            content_id = args[0]
+
+        with self.lock:
+            self.rows.append(
+                {
+                    "task": task_name,
+                    "task_id": task_id,
+                    "content_id": content_id,
+                    "status": state,
+                    "summary": summary,
+                    "duration_ms": (
+                        int((time.monotonic() - started) * 1000)
+                        if started is not None
+                        else None
+                    ),
+                    "worker": worker,
+                    "finished_at": datetime.now(timezone.utc),
+                }
+            )
+            due = (
+                len(self.rows) >= TASK_RUN_FLUSH_EVERY
+                or time.monotonic() - self._last_flush >= TASK_RUN_FLUSH_SECONDS
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        with self.lock:
+            rows, self.rows = self.rows, []
+            self._last_flush = time.monotonic()
+        if not rows:
+            return 0
+
+        db = self.session_factory()
+        try:
+            db.execute(insert(TaskRun), rows)
+            db.commit()
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Dropping {len(rows)} task run records: {str(e)}")
+            db.rollback()
+            return 0
+        finally:
+            db.close()
+
+
+task_run_recorder = TaskRunRecorder()
+
+
+def prune_task_runs(db: Session) -> int:
+    """Delete task runs that finished more than ``TASK_RUN_RETENTION_DAYS`` ago."""
+    result = db.execute(
+        delete(TaskRun).where(
+            TaskRun.finished_at < func.now() - timedelta(days=TASK_RUN_RETENTION_DAYS)
+        )
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,165 @@
+import os
+import re
+import html
+import logging
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services.unsubscribe import make_click_token, unsubscribe_url
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_CACHE_SIZE = int(os.getenv("TEMPLATE_CACHE_SIZE", "256"))
+
+# {{ name }} or {{ name | fallback }}
+MERGE_TAG = re.compile(r"\{\{\s*([A-Za-z_][\w.]*)\s*(?:\|([^}]*))?\}\}")
+
+ATTRIBUTE_PREFIX = "attributes."
+
+Attributes = Dict[str, Any]
+Getter = Callable[[int, str, Attributes], Any]
+
+# Fields whose values never need HTML escaping
+SAFE_FIELDS = {"subscriber_id", "subscriber_token", "unsubscribe_url"}
+
+FIELDS: Dict[str, Getter] = {
+    "email": lambda subscriber_id, email, attributes: email,
+    "subscriber_id": lambda subscriber_id, email, attributes: subscriber_id,
+    "subscriber_token": lambda subscriber_id, email, attributes: make_click_token(
+        subscriber_id
+    ),
+    "unsubscribe_url": lambda subscriber_id, email, attributes: unsubscribe_url(
+        subscriber_id
+    ),
+}
+
+
+class TemplateError(ValueError):
+    """Raised for merge tags that do not name a known field."""
+
+
+def _getter(name: str) -> Getter:
+    if name in FIELDS:
+        return FIELDS[name]
+    if name.startswith(ATTRIBUTE_PREFIX) and len(name) > len(ATTRIBUTE_PREFIX):
+        key = name[len(ATTRIBUTE_PREFIX):]
+        return lambda subscriber_id, email, attributes: attributes.get(key)
+    raise TemplateError(f"Unknown merge tag: {name}")
+
+
+class CompiledTemplate:
+    """
+    A template parsed into literal text and merge tag slots.
+
+    The literal text is split around the slots once, so rendering for a
+    recipient only evaluates the slot values and joins them with the
+    literals. Templates without merge tags, and ``literal`` ones, render to
+    their source unchanged.
+    """
+
+    def __init__(self, source: str, escape: bool = False, literal: bool = False):
+        self.source = source
+        self.escape = escape
+        matches = [] if literal else list(MERGE_TAG.finditer(source))
+        literals: List[str] = []
+        slots: List[Tuple[Getter, str, bool]] = []
+        position = 0
+        for match in matches:
+            name = match.group(1)
+            literals.append(source[position:match.start()])
+            slots.append(
+                (
+                    _getter(name),
+                    (match.group(2) or "").strip(),
+                    escape and name not in SAFE_FIELDS,
+                )
+            )
+            position = match.end()
+        literals.append(source[position:])
+
+        self.slots = slots
+        self.fields = {match.group(1) for match in matches}
+        # Literals at even positions, slot values go into the odd ones
+        self.parts = [""] * (2 * len(literals) - 1)
+        self.parts[::2] = literals
+
+    @property
+    def is_static(self) -> bool:
+        return not self.slots
+
+    @property
+    def needs_attributes(self) -> bool:
+        return any(name.startswith(ATTRIBUTE_PREFIX) for name in self.fields)
+
+    def render(
+        self, subscriber_id: int, email: str, attributes: Optional[Attributes] = None
+    ) -> str:
+        if not self.slots:
+            return self.source
+        attributes = attributes or {}
+        values = []
+        for getter, fallback, escape in self.slots:
+            value = getter(subscriber_id, email, attributes)
+            value = fallback if value is None or value == "" else str(value)
+            values.append(html.escape(value) if escape else value)
+        parts = self.parts.copy()
+        parts[1::2] = values
+        return "".join(parts)
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(
+    source: str, escape: bool = False, strict: bool = True
+) -> CompiledTemplate:
+    """
+    Compile ``source`` once; repeated sends of the same text hit the cache.
+
+    Without ``strict``, text with unknown merge tags is kept as literal text
+    instead of raising: content stored before merge tags were validated may
+    contain a literal ``{{``.
+    """
+    try:
+        return CompiledTemplate(source, escape)
+    except TemplateError as e:
+        if strict:
+            raise
+        logger.warning(f"Sending text with an invalid template as is: {e}")
+        return CompiledTemplate(source, escape, literal=True)
+
+
+class CompiledMessage:
+    """Subject, HTML body and text alternative of a send, compiled for per-recipient rendering."""
+
+    def __init__(self, subject: str, body: str, text: Optional[str] = None):
+        # Text saved through the API was validated; anything else that does
+        # not compile is sent as written rather than failing every recipient
+        self.subject = compile_template(subject, strict=False)
+        self.body = compile_template(body, escape=True, strict=False)
+        self.text = compile_template(text, strict=False) if text else None
+
+    @property
+    def templates(self) -> List[CompiledTemplate]:
+        return [self.subject, self.body] + ([self.text] if self.text else [])
+
+    @property
+    def is_static(self) -> bool:
+        return all(template.is_static for template in self.templates)
+
+    @property
+    def needs_attributes(self) -> bool:
+        return any(template.needs_attributes for template in self.templates)
+
+    def render(
+        self, subscriber_id: int, email: str, attributes: Optional[Attributes] = None
+    ) -> Tuple[str, str, Optional[str]]:
+        return (
+            self.subject.render(subscriber_id, email, attributes),
+            self.body.render(subscriber_id, email, attributes),
+            self.text.render(subscriber_id, email, attributes) if self.text else None,
+        )
+
+
+def validate_template(source: Optional[str]) -> None:
+    """Raise ``TemplateError`` if ``source`` uses an unknown merge tag."""
+    if source:
+        compile_template(source)
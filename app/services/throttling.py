@@ -0,0 +1,146 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.services.email_service import EmailSendError
+
+logger = logging.getLogger(__name__)
+
+DOMAIN_INTERLEAVE_WINDOW = int(os.getenv("DOMAIN_INTERLEAVE_WINDOW", "100"))
+# Sends per second per worker and recipient domain; 0 disables the limit
+DOMAIN_RATE_DEFAULT = float(os.getenv("DOMAIN_RATE_DEFAULT", "20"))
+DOMAIN_RATE_LIMITS = os.getenv("DOMAIN_RATE_LIMITS", "")
+DOMAIN_RATE_MIN = float(os.getenv("DOMAIN_RATE_MIN", "0.5"))
+DOMAIN_RATE_RECOVERY = float(os.getenv("DOMAIN_RATE_RECOVERY", "0.1"))
+
+
+def parse_rate_limits(value: str) -> Dict[str, float]:
+    """Parse ``"gmail.com=10,yahoo.com=5"`` into a domain to rate mapping."""
+    limits = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        domain, rate = item.split("=", 1)
+        limits[domain.strip().lower()] = float(rate)
+    return limits
+
+
+def domain_of(email: str) -> str:
+    return email.rsplit("@", 1)[-1].strip().lower()
+
+
+def iter_windows(
+    recipients: Iterable[Tuple[int, str]], size: int
+) -> Iterator[List[Tuple[int, str]]]:
+    """Group a recipient stream into consecutive lists of ``size``."""
+    window: List[Tuple[int, str]] = []
+    for recipient in recipients:
+        window.append(recipient)
+        if len(window) >= size:
+            yield window
+            window = []
+    if window:
+        yield window
+
+
+def interleave_by_domain(
+    recipients: Iterable[Tuple[int, str]],
+) -> List[Tuple[int, str]]:
+    """Reorder recipients round-robin across email domains."""
+    buckets: Dict[str, deque] = {}
+    for subscriber_id, email in recipients:
+        buckets.setdefault(domain_of(email), deque()).append((subscriber_id, email))
+
+    ordered = []
+    queues = list(buckets.values())
+    while queues:
+        for queue in queues:
+            ordered.append(queue.popleft())
+        queues = [queue for queue in queues if queue]
+    return ordered
+
+
+def is_deferral(error: Exception) -> bool:
+    """True if the provider asked us to slow down."""
+    return isinstance(error, EmailSendError) and error.status_code == 429
+
+
+class DomainThrottle:
+    """
+    Per-domain token buckets with additive-increase/multiplicative-decrease.
+
+    Each domain starts at its configured rate. A deferral halves the rate down
+    to ``DOMAIN_RATE_MIN``; every successful send raises it again by
+    ``DOMAIN_RATE_RECOVERY`` up to the configured rate.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, float]] = None,
+        default_rate: float = DOMAIN_RATE_DEFAULT,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.limits = parse_rate_limits(DOMAIN_RATE_LIMITS) if limits is None else limits
+        self.default_rate = default_rate
+        self.clock = clock
+        self.sleep = sleep
+        self.rates: Dict[str, float] = {}
+        self._tokens: Dict[str, float] = {}
+        self._updated: Dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def limit(self, domain: str) -> float:
+        return self.limits.get(domain, self.default_rate)
+
+    def rate(self, domain: str) -> float:
+        return self.rates.get(domain, self.limit(domain))
+
+    def wait(self, domain: str) -> None:
+        """
+        Block until ``domain`` has a token, then take it.
+
+        The token is reserved under a lock before sleeping, so threads of a
+        threaded send worker share the bucket without sleeping inside it.
+        """
+        rate = self.rate(domain)
+        if rate <= 0:
+            return
+        burst = max(rate, 1)
+        delay = 0.0
+        with self.lock:
+            now = self.clock()
+            tokens = self._tokens.get(domain, burst)
+            tokens = min(burst, tokens + (now - self._updated.get(domain, now)) * rate)
+            if tokens < 1:
+                delay = (1 - tokens) / rate
+                now += delay
+                tokens = 1
+            self._tokens[domain] = tokens - 1
+            self._updated[domain] = now
+        if delay:
+            self.sleep(delay)
+
+    def deferred(self, domain: str) -> None:
+        limit = self.limit(domain)
+        if limit <= 0:
+            return
+        with self.lock:
+            rate = max(DOMAIN_RATE_MIN, self.rate(domain) / 2)
+            self.rates[domain] = rate
+        logger.warning(f"Deferred by {domain}, slowing to {rate:.2f} sends/s")
+
+    def succeeded(self, domain: str) -> None:
+        with self.lock:
+            if domain not in self.rates:
+                return
+            rate = self.rates[domain] + DOMAIN_RATE_RECOVERY
+            if rate >= self.limit(domain):
+                self.rates.pop(domain, None)
+            else:
+                self.rates[domain] = rate
+
+domain_throttle = DomainThrottle()
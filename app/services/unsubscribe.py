@@ -0,0 +1,92 @@
+import os
+import hmac
+import base64
+import hashlib
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+UNSUBSCRIBE_SECRET = os.getenv("UNSUBSCRIBE_SECRET", "")
+UNSUBSCRIBE_BASE_URL = os.getenv("UNSUBSCRIBE_BASE_URL", "http://localhost:8000")
+
+# Anyone could sign tokens with a missing or publicly known key, so signed
+# links are turned off until a real secret is configured
+INSECURE_SECRETS = {"", "change-me"}
+UNSUBSCRIBE_ENABLED = UNSUBSCRIBE_SECRET not in INSECURE_SECRETS
+
+# Keyed BLAKE2b is a MAC on its own and much cheaper per link than HMAC-SHA256.
+# The keyed state is built once and copied for every link.
+_MAC = (
+    hashlib.blake2b(
+        key=hashlib.sha256(UNSUBSCRIBE_SECRET.encode("utf-8")).digest(), digest_size=16
+    )
+    if UNSUBSCRIBE_ENABLED
+    else None
+)
+if _MAC is None:
+    logger.warning(
+        "UNSUBSCRIBE_SECRET is not set: unsubscribe links are disabled and "
+        "{{ unsubscribe_url }} renders its fallback"
+    )
+
+
+# Tokens are signed per purpose, so a click token found in a forwarded link
+# cannot be used to unsubscribe. Unsubscribe tokens carry no prefix, which
+# keeps links in already sent emails valid.
+UNSUBSCRIBE_PURPOSE = ""
+CLICK_PURPOSE = "click:"
+
+
+def _signature(subscriber_id: int, purpose: str) -> str:
+    mac = _MAC.copy()
+    mac.update(f"{purpose}{subscriber_id}".encode("ascii"))
+    return base64.urlsafe_b64encode(mac.digest()).rstrip(b"=").decode("ascii")
+
+
+def _make_token(subscriber_id: int, purpose: str) -> Optional[str]:
+    if _MAC is None:
+        return None
+    return f"{subscriber_id}.{_signature(subscriber_id, purpose)}"
+
+
+def _verify_token(token: str, purpose: str) -> Optional[int]:
+    if _MAC is None:
+        return None
+    subscriber_id, _, signature = token.partition(".")
+    if not subscriber_id.isdigit() or not signature:
+        return None
+    if not hmac.compare_digest(signature, _signature(int(subscriber_id), purpose)):
+        return None
+    return int(subscriber_id)
+
+
+def make_unsubscribe_token(subscriber_id: int) -> Optional[str]:
+    """
+    Signed, URL-safe token identifying a subscriber in unsubscribe links.
+
+    None when signing is disabled because ``UNSUBSCRIBE_SECRET`` is not set.
+    """
+    return _make_token(subscriber_id, UNSUBSCRIBE_PURPOSE)
+
+
+def verify_unsubscribe_token(token: str) -> Optional[int]:
+    """Subscriber id of a valid token, None if it is malformed or forged."""
+    return _verify_token(token, UNSUBSCRIBE_PURPOSE)
+
+
+def make_click_token(subscriber_id: int) -> Optional[str]:
+    """Signed token attributing tracked link clicks to a subscriber."""
+    return _make_token(subscriber_id, CLICK_PURPOSE)
+
+
+def verify_click_token(token: str) -> Optional[int]:
+    """Subscriber id of a valid click token, None if it is malformed or forged."""
+    return _verify_token(token, CLICK_PURPOSE)
+
+
+def unsubscribe_url(subscriber_id: int) -> Optional[str]:
+    token = make_unsubscribe_token(subscriber_id)
+    if token is None:
+        return None
+    return f"{UNSUBSCRIBE_BASE_URL}/api/subscribers/unsubscribe/{token}"
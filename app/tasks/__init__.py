@@ -1,4 +1,27 @@
-from .newsletter_tasks import check_due_content, send_content_to_subscribers
-
-__all__ = ["check_due_content", "send_content_to_subscribers"]
+from . import history  # noqa: F401  (connects task run history signals)
+from . import profiling  # noqa: F401  (connects opt-in task profiling signals)
+from .newsletter_tasks import (
+    check_due_content,
+    consume_delivery_events,
+    prune_task_runs,
+    reconcile_topic_counts,
+    relay_outbox,
+    retry_recipients,
+    send_chunk,
+    send_content_to_subscribers,
+    send_digests,
+    warm_audience_snapshots,
+)
 
+__all__ = [
+    "check_due_content",
+    "consume_delivery_events",
+    "prune_task_runs",
+    "reconcile_topic_counts",
+    "relay_outbox",
+    "retry_recipients",
+    "send_chunk",
+    "send_content_to_subscribers",
+    "send_digests",
+    "warm_audience_snapshots",
+]
@@ -0,0 +1,40 @@
+"""
+Record a compact summary of every task run in the ``task_runs`` table.
+
+Task results are not stored in the result backend (``task_ignore_result``);
+these signal handlers keep a queryable history instead.
+"""
+
+from celery.signals import (
+    task_postrun,
+    task_prerun,
+    worker_process_shutdown,
+    worker_shutdown,
+)
+
+from app.services.task_runs import task_run_recorder
+
+
+@task_prerun.connect
+def record_task_start(task_id=None, **kwargs):
+    task_run_recorder.start(task_id)
+
+
+@task_postrun.connect
+def record_task_finish(task_id=None, task=None, args=None, retval=None, state=None, **kwargs):
+    task_run_recorder.finish(
+        task.name,
+        task_id,
+        state or "UNKNOWN",
+        result=retval,
+        args=list(args or []),
+        worker=getattr(task.request, "hostname", None),
+    )
+
+
+# Prefork children flush on worker_process_shutdown; solo and thread pools
+# run tasks in the main process, which only sends worker_shutdown
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def flush_task_runs(**kwargs):
+    task_run_recorder.flush()
@@ -1,11 +1,80 @@
 import logging
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 from celery import Task
+from sqlalchemy import any_
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
-from app.models import Content, Subscription, Subscriber, ContentStatus
-from celery_worker import celery
+from app.models import Content, Subscription, Subscriber, ContentStatus, SendChunk
+from app.services.audience import (
+    ensure_audience_snapshot,
+    get_content_to_warm,
+    get_subscriber_attributes,
+    iter_snapshot_recipients,
+    reconcile_topic_counts as reconcile_counts,
+    resolve_subject,
+    segment_filter,
+    warm_audience_snapshot,
+)
+from app.services.chunks import (
+    claim_chunks,
+    complete_chunk,
+    is_bulk,
+    plan_chunks,
+    release_chunk,
+)
+from app.services.delivery import (
+    fail_content,
+    finalize_content,
+    record_retry_finished,
+    record_retry_scheduled,
+    record_send_cursor,
+    record_send_error,
+)
+from app.services.delivery_events import consume_delivery_events as consume_events
+from app.services.digest import claim_digest_content, iter_digest_pages, render_digest
+from app.services.dispatch import (
+    DISPATCH_MAX_CONCURRENT_SENDS,
+    backlog_stats,
+    claim_due_content,
+    fail_stale_content,
+    record_backlog,
+)
+from app.services.outbox import (
+    OUTBOX_RELAY_BATCH_SIZE,
+    add_to_outbox,
+    claim_outbox_message,
+    prune_outbox,
+)
+from app.services.outbox import relay_outbox as relay_outbox_messages
+from app.services.preparation import ensure_prepared, prepared_html
+from app.services.progress import ProgressTracker
+from app.services.recipient_sets import (
+    RecipientSet,
+    decode_recipient_set,
+    encode_recipient_set,
+)
+from app.services.send_control import SendControl
+from app.services.send_lease import SendLease, lease_owner
+from app.services.send_log import SendLog
+from app.services.throttling import (
+    DOMAIN_INTERLEAVE_WINDOW,
+    domain_of,
+    domain_throttle,
+    interleave_by_domain,
+    is_deferral,
+    iter_windows,
+)
+from app.services.suppression import filter_suppressed, suppress, suppression_reason_for
+from app.services.task_runs import prune_task_runs as prune_runs
+from app.services.templates import CompiledMessage
+from app.services.retries import (
+    SEND_RETRY_BATCH_SIZE,
+    add_dead_letters,
+    retry_delay,
+    should_retry,
+)
+from celery_worker import celery, SEND_BULK_QUEUE, SEND_SMALL_QUEUE
 
 logger = logging.getLogger(__name__)
 
@@ -23,8 +92,10 @@ def get_due_content(db: Session) -> List[Content]:
     return due_content
 
 
-def get_active_subscribers_for_topic(db: Session, topic_id: int) -> List[Subscriber]:
-    """Get all active subscribers for a given topic."""
+def get_active_subscribers_for_topic(
+    db: Session, topic_id: int, segment: Optional[Dict[str, Any]] = None
+) -> List[Subscriber]:
+    """Get all active subscribers for a given topic, optionally within a segment."""
     subscribers = (
         db.query(Subscriber)
         .join(Subscription)
@@ -32,25 +103,273 @@ def get_active_subscribers_for_topic(db: Session, topic_id: int) -> List[Subscri
             Subscription.topic_id == topic_id,
             Subscription.is_active == True,
             Subscriber.is_active == True,
+            segment_filter(segment),
         )
         .all()
     )
     return subscribers
 
 
+def estimated_audience(content: Content) -> int:
+    """Snapshot size if the audience is frozen, else the topics' cached counts."""
+    if content.recipient_count is not None:
+        return content.recipient_count
+    topics = [content.topic] + content.additional_topics
+    return sum(topic.active_subscriber_count for topic in topics)
+
+
+def dispatch_chunks(db: Session, content: Content) -> int:
+    """Enqueue the next chunks of a bulk send, up to the content's in-flight window."""
+    chunks = claim_chunks(db, content)
+    for chunk in chunks:
+        send_chunk.apply_async(args=[chunk.id], queue=SEND_BULK_QUEUE)
+    return len(chunks)
+
+
+def deliver(
+    db: Session,
+    content_id: int,
+    subject: str,
+    body: str,
+    recipients: Iterable[Tuple[int, str]],
+    tracker: ProgressTracker,
+    attempt: int = 1,
+    control: Optional[SendControl] = None,
+    content_ids: Optional[List[int]] = None,
+    text_body: Optional[str] = None,
+    lease: Optional[SendLease] = None,
+) -> Dict[str, Any]:
+    """
+    Send one message to each ``(subscriber_id, email)`` recipient.
+
+    ``body`` is the prepared HTML and ``text_body`` its plain-text
+    alternative. Both, and ``subject``, may contain merge tags; they are compiled once
+    (and cached across sends) and filled in for each recipient. Subscriber
+    attributes are loaded per window, only when the templates use them.
+
+    Suppressed addresses are dropped before sending. Recipients are taken in
+    windows of ``DOMAIN_INTERLEAVE_WINDOW``, interleaved across email domains
+    and paced by per-domain rate limits that back off when a send is
+    deferred. Transient failures are batched into delayed ``retry_recipients``
+    tasks with exponential backoff; permanent failures, and transient ones
+    that ran out of attempts, are written to the dead-letter store. Permanent
+    failures that show the address is invalid also suppress it.
+
+    When ``control`` reports a pause or cancellation the loop stops before the
+    next window; buffered outcomes are still flushed. ``lease`` is renewed as
+    recipients are sent; if another sender took it over, the loop stops at
+    once and leaves the cursor to the new holder.
+
+    Failures are logged one by one; successful sends are only sampled and
+    summed up in one line at the end (see ``SendLog``).
+
+    A digest passes the ids of all its items as ``content_ids``. Its failures
+    are not retried but dead-lettered for every item, so a replay sends each
+    item on its own.
+
+    Returns:
+        Dict with the first few error messages, the number of recipients
+        scheduled for retry, the status that stopped the send (if any),
+        whether the lease was lost and the id of the last recipient handled
+    """
+    from app.services.email_service import send_email
+
+    error_messages = []
+    retry_ids = []
+    dead_letters = []
+    suppressions = []
+    retrying = 0
+    stopped = None
+    lease_lost = False
+    cursor = None
+    message = CompiledMessage(subject, body, text_body)
+    send_log = SendLog(content_id)
+
+    def on_suppressed(subscriber_id: int, email: str) -> None:
+        tracker.record_suppressed()
+        send_log.record_suppressed()
+
+    def write_failures() -> None:
+        for dead_letter_content_id in content_ids or [content_id]:
+            add_dead_letters(db, dead_letter_content_id, dead_letters, attempt)
+        suppress(db, suppressions, source="send")
+
+    windows = iter_windows(
+        filter_suppressed(db, recipients, on_suppressed), DOMAIN_INTERLEAVE_WINDOW
+    )
+    for window in windows:
+        if control is not None:
+            stopped = control.poll(len(window))
+            if stopped is not None:
+                logger.warning(f"Stopping send of content {content_id}: {stopped.value}")
+                break
+        attributes = (
+            get_subscriber_attributes(db, [subscriber_id for subscriber_id, _ in window])
+            if message.needs_attributes
+            else {}
+        )
+        for subscriber_id, email in interleave_by_domain(window):
+            if lease is not None and not lease.renew():
+                lease_lost = True
+                break
+            domain = domain_of(email)
+            domain_throttle.wait(domain)
+            try:
+                recipient_subject, recipient_body, recipient_text = message.render(
+                    subscriber_id, email, attributes.get(subscriber_id)
+                )
+                send_email(
+                    to_email=email,
+                    subject=recipient_subject,
+                    body=recipient_body,
+                    text_body=recipient_text,
+                )
+                domain_throttle.succeeded(domain)
+                tracker.record(sent=True)
+                send_log.record_sent(subscriber_id, email)
+            except Exception as e:
+                if is_deferral(e):
+                    domain_throttle.deferred(domain)
+                if content_ids is None and should_retry(e, attempt):
+                    logger.warning(
+                        f"Transient failure sending to {email}, retrying later: {str(e)}"
+                    )
+                    retry_ids.append(subscriber_id)
+                    send_log.record_retrying()
+                    if len(retry_ids) >= SEND_RETRY_BATCH_SIZE:
+                        retrying += schedule_retry(db, content_id, retry_ids, attempt)
+                        retry_ids = []
+                    continue
+
+                error_msg = f"Failed to send to {email}: {str(e)}"
+                if len(error_messages) < 5:
+                    error_messages.append(error_msg)
+                logger.error(error_msg, exc_info=True)
+                dead_letters.append((subscriber_id, email, str(e)))
+                reason = suppression_reason_for(e)
+                if reason is not None:
+                    suppressions.append((email, reason))
+                tracker.record(sent=False)
+                send_log.record_failed()
+                if len(dead_letters) >= SEND_RETRY_BATCH_SIZE:
+                    write_failures()
+                    dead_letters, suppressions = [], []
+
+        if lease_lost:
+            logger.warning(f"Stopping send of content {content_id}: lease taken over")
+            break
+        # Windows are sent whole, so every recipient up to here was handled
+        cursor = window[-1][0]
+
+    write_failures()
+    tracker.flush()
+    db.commit()
+    if retry_ids:
+        retrying += schedule_retry(db, content_id, retry_ids, attempt)
+    send_log.summary(stopped.value if stopped is not None else None)
+
+    return {
+        "errors": error_messages,
+        "retrying": retrying,
+        "stopped": stopped,
+        "lease_lost": lease_lost,
+        "cursor": cursor,
+    }
+
+
+def schedule_retry(
+    db: Session, content_id: int, subscriber_ids: List[int], attempt: int
+) -> int:
+    """
+    Enqueue a delayed retry of ``subscriber_ids`` for attempt ``attempt + 1``.
+
+    The batch is counted as outstanding first, so the content is not
+    finalized before it finishes.
+    """
+    countdown = retry_delay(attempt)
+    record_retry_scheduled(db, content_id, countdown)
+    db.commit()
+    try:
+        retry_recipients.apply_async(
+            args=[content_id, encode_recipient_set(subscriber_ids), attempt + 1],
+            countdown=countdown,
+        )
+    except Exception:
+        record_retry_finished(db, content_id)
+        raise
+    logger.info(
+        f"Scheduled retry {attempt + 1} of {len(subscriber_ids)} recipients "
+        f"for content {content_id} in {countdown:.0f}s"
+    )
+    return len(subscriber_ids)
+
+
 @celery.task(bind=True, name="app.tasks.check_due_content")
 def check_due_content(self: Task):
-    """Periodic task to check for due content and enqueue send tasks."""
+    """
+    Periodic task to check for due content and enqueue send tasks.
+
+    At most ``DISPATCH_MAX_CONCURRENT_SENDS`` sends run at once. After an
+    outage the backlog is drained highest priority and most overdue first, a
+    few sends per beat, instead of enqueueing everything at once.
+
+    Send tasks are written to the dispatch outbox in the transaction that
+    claims the content and then relayed to the broker in one batch. Messages
+    left behind by a failed relay are published by ``relay_outbox``.
+    """
     db = SessionLocal()
     try:
-        due_content_list = get_due_content(db)
-        logger.info(f"Found {len(due_content_list)} content items due for sending")
+        now = datetime.utcnow()
+        skipped = fail_stale_content(db, now)
+        stats = backlog_stats(db, now)
+        due_content_list = claim_due_content(
+            db, now, DISPATCH_MAX_CONCURRENT_SENDS - stats["active"]
+        )
+        logger.info(
+            f"Found {stats['backlog']} content items due for sending, "
+            f"{stats['active']} sends running"
+        )
 
+        messages = []
         for content in due_content_list:
-            send_content_to_subscribers.delay(content.id)
-            logger.info(f"Enqueued send task for content ID: {content.id}")
+            bulk = is_bulk(estimated_audience(content))
+            queue = SEND_BULK_QUEUE if bulk else SEND_SMALL_QUEUE
+            messages.append(
+                {
+                    "task": send_content_to_subscribers.name,
+                    "args": [content.id],
+                    "queue": queue,
+                }
+            )
+            logger.info(f"Enqueued send task for content ID: {content.id} on {queue}")
+        add_to_outbox(db, messages)
+        db.commit()
+
+        published = 0
+        if messages:
+            try:
+                published = relay_outbox_messages(db, celery)
+            except Exception as e:
+                logger.error(f"Relaying dispatch outbox failed, will retry: {str(e)}")
 
-        return {"checked": len(due_content_list), "enqueued": len(due_content_list)}
+        backlog = stats["backlog"] - len(due_content_list)
+        drain_rate = record_backlog(backlog)
+        if backlog:
+            logger.warning(
+                f"Catching up: {backlog} due content items waiting, oldest "
+                f"{stats['oldest_late_seconds'] / 60:.0f} minutes late, "
+                f"draining {drain_rate if drain_rate is not None else 'n/a'} per minute"
+            )
+
+        return {
+            "checked": stats["backlog"],
+            "enqueued": len(due_content_list),
+            "published": published,
+            "backlog": backlog,
+            "active": stats["active"],
+            "skipped_stale": skipped,
+            "drain_rate_per_minute": drain_rate,
+        }
     except Exception as e:
         logger.error(f"Error in check_due_content: {str(e)}", exc_info=True)
         raise
@@ -58,11 +377,223 @@ def check_due_content(self: Task):
         db.close()
 
 
+@celery.task(bind=True, name="app.tasks.relay_outbox")
+def relay_outbox(self: Task):
+    """Periodic task to publish pending dispatch outbox messages in batches."""
+    db = SessionLocal()
+    try:
+        published = 0
+        while True:
+            batch = relay_outbox_messages(db, celery)
+            published += batch
+            if batch < OUTBOX_RELAY_BATCH_SIZE:
+                break
+        pruned = prune_outbox(db)
+        if published:
+            logger.info(f"Relayed {published} dispatch outbox messages")
+        return {"published": published, "pruned": pruned}
+    except Exception as e:
+        logger.error(f"Error in relay_outbox: {str(e)}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery.task(bind=True, name="app.tasks.warm_audience_snapshots")
+def warm_audience_snapshots(self: Task):
+    """Periodic task to freeze the audience of content due soon."""
+    db = SessionLocal()
+    try:
+        content_ids = [content.id for content in get_content_to_warm(db)]
+        warmed = recipients = 0
+        for content_id in content_ids:
+            count = warm_audience_snapshot(db, content_id)
+            if count is not None:
+                warmed += 1
+                recipients += count
+
+        if warmed:
+            logger.info(
+                f"Warmed audience snapshots for {warmed} content items "
+                f"({recipients} recipients)"
+            )
+        return {"warmed": warmed, "recipients": recipients}
+    except Exception as e:
+        logger.error(f"Error in warm_audience_snapshots: {str(e)}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery.task(bind=True, name="app.tasks.reconcile_topic_counts")
+def reconcile_topic_counts(self: Task):
+    """Periodic task to correct drift in cached per-topic subscriber counts."""
+    db = SessionLocal()
+    try:
+        corrected = reconcile_counts(db)
+        if corrected:
+            logger.warning(f"Corrected subscriber counts for {corrected} topics")
+        return {"corrected": corrected}
+    except Exception as e:
+        logger.error(f"Error in reconcile_topic_counts: {str(e)}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery.task(bind=True, name="app.tasks.prune_task_runs")
+def prune_task_runs(self: Task):
+    """Periodic task to delete task run history past its retention."""
+    db = SessionLocal()
+    try:
+        pruned = prune_runs(db)
+        if pruned:
+            logger.info(f"Pruned {pruned} task runs")
+        return {"pruned": pruned}
+    except Exception as e:
+        logger.error(f"Error in prune_task_runs: {str(e)}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery.task(bind=True, name="app.tasks.consume_delivery_events")
+def consume_delivery_events(self: Task):
+    """Periodic task to apply queued provider delivery events in bulk."""
+    db = SessionLocal()
+    try:
+        totals = consume_events(db)
+        if totals["events"]:
+            logger.info(
+                f"Applied {totals['events']} delivery events "
+                f"({totals['suppressed']} suppressed, {totals['deactivated']} deactivated)"
+            )
+        return totals
+    except Exception as e:
+        logger.error(f"Error in consume_delivery_events: {str(e)}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery.task(bind=True, name="app.tasks.send_digests")
+def send_digests(self: Task):
+    """
+    Periodic task to send digest content of closed windows.
+
+    Every subscriber gets one email covering all digest items of their
+    topics, rendered once per distinct combination of items.
+
+    Subscribers are sent in pages of ``DIGEST_PAGE_SIZE``. After each page
+    the items' ``send_cursor`` is advanced and their send lease renewed, and
+    before each one pause and cancel are checked. A run that stopped,
+    crashed or hit the time limit is picked up by a later beat from the
+    last completed page.
+    """
+    db = SessionLocal()
+    lease = None
+    try:
+        owner = lease_owner(self.request.id)
+        items = claim_digest_content(db, owner)
+        if not items:
+            return {"items": 0, "sent": 0, "failed": 0}
+
+        for item in items:
+            ensure_prepared(db, item)
+        items_by_id = {item.id: item for item in items}
+        item_ids_all = list(items_by_id)
+        lease = SendLease(db, item_ids_all, owner, held=True)
+        control = SendControl(db, item_ids_all)
+        rendered = {}
+        sent = failed = 0
+        stopped = None
+        for last_subscriber_id, groups in iter_digest_pages(db, item_ids_all):
+            stopped = control.poll(sum(len(group) for group in groups.values()))
+            if stopped is not None:
+                logger.warning(f"Stopping digest of items {item_ids_all}: {stopped.value}")
+                break
+            for item_ids, recipients in groups.items():
+                if item_ids not in rendered:
+                    rendered[item_ids] = render_digest([items_by_id[i] for i in item_ids])
+                subject, body, text_body = rendered[item_ids]
+                tracker = ProgressTracker(db, list(item_ids), total=len(recipients))
+                deliver(
+                    db,
+                    item_ids[0],
+                    subject,
+                    body,
+                    recipients,
+                    tracker,
+                    content_ids=list(item_ids),
+                    text_body=text_body,
+                )
+                sent += tracker.sent
+                failed += tracker.failed
+            record_send_cursor(db, item_ids_all, last_subscriber_id)
+            if not lease.renew():
+                return {
+                    "items": len(items),
+                    "sent": sent,
+                    "failed": failed,
+                    "stopped": "lease lost",
+                }
+
+        if stopped is not None:
+            return {
+                "items": len(items),
+                "sent": sent,
+                "failed": failed,
+                "stopped": stopped.value,
+            }
+
+        for item_id in items_by_id:
+            finalize_content(db, item_id)
+
+        logger.info(
+            f"Sent digests of {len(items)} content items: {sent} sent, {failed} failed"
+        )
+        return {"items": len(items), "sent": sent, "failed": failed}
+    except Exception as e:
+        logger.error(f"Error in send_digests: {str(e)}", exc_info=True)
+        raise
+    finally:
+        if lease is not None:
+            try:
+                db.rollback()
+                lease.release()
+            except Exception as db_error:
+                logger.error(f"Error releasing digest lease: {str(db_error)}")
+        db.close()
+
+
 @celery.task(bind=True, name="app.tasks.send_content_to_subscribers", max_retries=3)
-def send_content_to_subscribers(self: Task, content_id: int):
-    """Send content to all active subscribers of the content's topic."""
+def send_content_to_subscribers(
+    self: Task, content_id: int, outbox_id: Optional[int] = None
+):
+    """
+    Send content to all active subscribers of the content's topic.
+
+    Tasks relayed from the dispatch outbox pass ``outbox_id``; a message
+    that was published twice is dropped on its second delivery. The send
+    runs under the content's send lease, so a second dispatch of the same
+    content, e.g. one made while the first sat in a backlogged queue, does
+    nothing while the first is alive.
+
+    Audiences of up to one chunk are sent inline. Larger ones are split into
+    chunks that are dispatched a few at a time, so chunks of every running
+    send take turns on the bulk queue.
+    """
     db = SessionLocal()
+    lease = SendLease(db, content_id, lease_owner(self.request.id))
     try:
+        if (
+            outbox_id is not None
+            and not self.request.retries
+            and not claim_outbox_message(db, outbox_id)
+        ):
+            logger.warning(f"Dropping duplicate dispatch {outbox_id} of content {content_id}")
+            return {"status": "skipped", "message": "Duplicate dispatch"}
+
         content = db.query(Content).filter(Content.id == content_id).first()
         if not content:
             logger.error(f"Content with ID {content_id} not found")
@@ -77,60 +608,101 @@ def send_content_to_subscribers(self: Task, content_id: int):
                 "message": f"Content status is {content.status}",
             }
 
-        subscribers = get_active_subscribers_for_topic(db, content.topic_id)
+        if not lease.acquire():
+            logger.warning(f"Content {content_id} is already being sent, skipping")
+            return {"status": "skipped", "message": "Send already in progress"}
+
+        ensure_prepared(db, content)
+        recipient_count = ensure_audience_snapshot(db, content)
         logger.info(
-            f"Found {len(subscribers)} active subscribers for topic {content.topic_id}"
+            f"Found {recipient_count} active subscribers for topic {content.topic_id}"
         )
 
-        if not subscribers:
+        if not recipient_count:
             logger.warning(f"No active subscribers found for topic {content.topic_id}")
-            content.status = ContentStatus.SENT
-            content.sent_at = datetime.utcnow()
-            db.commit()
+            finalize_content(db, content_id)
             return {"status": "completed", "sent": 0, "message": "No subscribers"}
 
-        from app.services.email_service import send_email
+        subject = content.prepared_subject or resolve_subject(content)
+        after_subscriber_id = content.send_cursor or 0
+        if after_subscriber_id:
+            logger.info(
+                f"Resuming content {content_id} after subscriber {after_subscriber_id}"
+            )
+        tracker = ProgressTracker(db, content_id, total=recipient_count)
+        tracker.start()
 
-        success_count = 0
-        error_messages = []
+        if is_bulk(recipient_count):
+            chunk_count = plan_chunks(db, content_id)
+            dispatched = dispatch_chunks(db, content)
+            logger.info(
+                f"Dispatched {dispatched} of {chunk_count} chunks for content {content_id}"
+            )
+            return {
+                "status": "dispatched",
+                "content_id": content_id,
+                "chunks": chunk_count,
+                "dispatched": dispatched,
+                "total_subscribers": recipient_count,
+            }
 
-        for subscriber in subscribers:
-            try:
-                send_email(
-                    to_email=subscriber.email,
-                    subject=content.title or f"Newsletter: {content.topic.name}",
-                    body=content.body,
-                )
-                success_count += 1
-                print(f"Sent email to {subscriber.email} for content {content_id}")
-                logger.info(
-                    f"Sent email to {subscriber.email} for content {content_id}"
-                )
-            except Exception as e:
-                error_msg = f"Failed to send to {subscriber.email}: {str(e)}"
-                error_messages.append(error_msg)
-                logger.error(error_msg, exc_info=True)
+        outcome = deliver(
+            db,
+            content_id,
+            subject,
+            prepared_html(content),
+            iter_snapshot_recipients(db, content_id, after_subscriber_id),
+            tracker,
+            control=SendControl(db, content_id),
+            text_body=content.prepared_text,
+            lease=lease,
+        )
+        error_messages = outcome["errors"]
 
-        if success_count > 0:
-            content.status = ContentStatus.SENT
-            content.sent_at = datetime.utcnow()
-            if error_messages:
-                content.error_message = "; ".join(
-                    error_messages[:5]
-                )  # Store first 5 errors
-        else:
-            content.status = ContentStatus.FAILED
-            content.error_message = "; ".join(error_messages[:5])
+        if outcome["lease_lost"]:
+            return {
+                "status": "skipped",
+                "message": "Send taken over by another worker",
+                "content_id": content_id,
+                "sent": tracker.sent,
+                "failed": tracker.failed,
+            }
 
-        db.commit()
-        db.refresh(content)
+        if outcome["stopped"] is not None:
+            if outcome["cursor"] is not None:
+                record_send_cursor(db, content_id, outcome["cursor"])
+            lease.release(redispatch=True)
+            return {
+                "status": outcome["stopped"].value,
+                "content_id": content_id,
+                "sent": tracker.sent,
+                "failed": tracker.failed,
+                "suppressed": tracker.suppressed,
+                "retrying": outcome["retrying"],
+            }
+
+        # Every recipient was handled, so a late duplicate dispatch sends
+        # nothing while retries keep the content pending
+        if outcome["cursor"] is not None:
+            record_send_cursor(db, content_id, outcome["cursor"])
+        lease.release()
+        finalize_content(
+            db,
+            content_id,
+            # Store first 5 errors
+            error_message="; ".join(error_messages[:5]) if error_messages else None,
+        )
 
         return {
             "status": "completed",
             "content_id": content_id,
-            "sent": success_count,
-            "failed": len(error_messages),
-            "total_subscribers": len(subscribers),
+            "sent": tracker.sent,
+            "failed": tracker.failed,
+            "suppressed": tracker.suppressed,
+            "retrying": outcome["retrying"],
+            "total_subscribers": (
+                tracker.sent + tracker.failed + tracker.suppressed + outcome["retrying"]
+            ),
         }
 
     except Exception as e:
@@ -141,15 +713,193 @@ def send_content_to_subscribers(self: Task, content_id: int):
 
         # Update content status to failed
         try:
-            content = db.query(Content).filter(Content.id == content_id).first()
-            if content:
-                content.status = ContentStatus.FAILED
-                content.error_message = str(e)
-                db.commit()
+            db.rollback()
+            fail_content(db, content_id, str(e))
         except Exception as db_error:
             logger.error(f"Error updating content status: {str(db_error)}")
 
         # Retry the task
         raise self.retry(exc=e, countdown=60)
+    finally:
+        try:
+            lease.release()
+        except Exception as db_error:
+            logger.error(f"Error releasing send lease: {str(db_error)}")
+        db.close()
+
+
+@celery.task(bind=True, name="app.tasks.send_chunk")
+def send_chunk(self: Task, chunk_id: int):
+    """Send one chunk of a bulk send, then dispatch the next chunk of the same content."""
+    db = SessionLocal()
+    try:
+        chunk = db.query(SendChunk).filter(SendChunk.id == chunk_id).first()
+        if not chunk:
+            logger.error(f"Send chunk with ID {chunk_id} not found")
+            return {"status": "error", "message": "Chunk not found"}
+
+        content = db.query(Content).filter(Content.id == chunk.content_id).first()
+        if content.status != ContentStatus.PENDING:
+            if content.status == ContentStatus.PAUSED:
+                release_chunk(db, chunk_id, None)
+            return {
+                "status": "skipped",
+                "message": f"Content status is {content.status}",
+            }
+
+        tracker = ProgressTracker(db, content.id, total=content.recipient_count or 0)
+        outcome = deliver(
+            db,
+            content.id,
+            content.prepared_subject or resolve_subject(content),
+            prepared_html(content),
+            iter_snapshot_recipients(
+                db,
+                content.id,
+                chunk.cursor or chunk.first_subscriber_id - 1,
+                upto_subscriber_id=chunk.last_subscriber_id,
+            ),
+            tracker,
+            control=SendControl(db, content.id),
+            text_body=content.prepared_text,
+            lease=SendLease(db, content.id),
+        )
+
+        if outcome["stopped"] is not None:
+            release_chunk(db, chunk_id, outcome["cursor"])
+            return {
+                "status": outcome["stopped"].value,
+                "chunk_id": chunk_id,
+                "sent": tracker.sent,
+                "failed": tracker.failed,
+            }
+
+        if outcome["errors"]:
+            record_send_error(db, content.id, "; ".join(outcome["errors"]))
+            db.commit()
+        if complete_chunk(db, chunk):
+            finalize_content(db, content.id)
+        else:
+            dispatch_chunks(db, content)
+
+        return {
+            "status": "completed",
+            "chunk_id": chunk_id,
+            "sent": tracker.sent,
+            "failed": tracker.failed,
+            "suppressed": tracker.suppressed,
+            "retrying": outcome["retrying"],
+        }
+    except Exception as e:
+        logger.error(f"Error in send_chunk for chunk {chunk_id}: {str(e)}", exc_info=True)
+        # Hand the chunk back so the next dispatch of the content picks it up
+        try:
+            db.rollback()
+            release_chunk(db, chunk_id, None)
+        except Exception as db_error:
+            logger.error(f"Error releasing chunk: {str(db_error)}")
+        raise
+    finally:
+        db.close()
+
+
+@celery.task(bind=True, name="app.tasks.retry_recipients", max_retries=3)
+def retry_recipients(
+    self: Task,
+    content_id: int,
+    recipients: Union[RecipientSet, List[int]],
+    attempt: int,
+    outbox_id: Optional[int] = None,
+):
+    """
+    Retry delivery of a content item to a batch of recipients.
+
+    ``recipients`` is a recipient set descriptor; the emails are looked up
+    here, so the task message stays small whatever the batch size. The last
+    outstanding batch of a send finalizes the content.
+
+    Dead-letter replays are relayed from the dispatch outbox and pass
+    ``outbox_id``; a replay that was published twice is dropped on its
+    second delivery.
+    """
+    db = SessionLocal()
+    try:
+        if (
+            outbox_id is not None
+            and not self.request.retries
+            and not claim_outbox_message(db, outbox_id)
+        ):
+            logger.warning(f"Dropping duplicate replay {outbox_id} of content {content_id}")
+            return {"status": "skipped", "message": "Duplicate dispatch"}
+
+        content = db.query(Content).filter(Content.id == content_id).first()
+        if not content:
+            logger.error(f"Content with ID {content_id} not found")
+            return {"status": "error", "message": "Content not found"}
+
+        if content.status == ContentStatus.CANCELLED:
+            logger.warning(f"Content {content_id} was cancelled, dropping retry")
+            record_retry_finished(db, content_id)
+            return {"status": "skipped", "message": "Content was cancelled"}
+
+        if content.status == ContentStatus.PAUSED:
+            # Keep the batch and its attempt number until the send is resumed
+            countdown = retry_delay(attempt)
+            record_retry_scheduled(db, content_id, countdown, new_batch=False)
+            db.commit()
+            retry_recipients.apply_async(
+                args=[content_id, recipients, attempt], countdown=countdown
+            )
+            return {"status": "deferred", "message": "Content is paused"}
+
+        subscriber_ids = decode_recipient_set(recipients)
+        recipients = (
+            db.query(Subscriber.id, Subscriber.email)
+            .filter(Subscriber.id == any_(subscriber_ids), Subscriber.is_active == True)
+            .order_by(Subscriber.id)
+            .all()
+        )
+        tracker = ProgressTracker(db, content_id, total=len(recipients))
+        outcome = deliver(
+            db,
+            content_id,
+            content.prepared_subject or resolve_subject(content),
+            prepared_html(content),
+            recipients,
+            tracker,
+            attempt=attempt,
+            text_body=content.prepared_text,
+            lease=SendLease(db, content_id),
+        )
+        record_retry_finished(db, content_id)
+        finalize_content(db, content_id, after_retry=True)
+        return {
+            "status": "completed",
+            "content_id": content_id,
+            "attempt": attempt,
+            "sent": tracker.sent,
+            "failed": tracker.failed,
+            "retrying": outcome["retrying"],
+        }
+    except Exception as e:
+        logger.error(
+            f"Error in retry_recipients for content {content_id}: {str(e)}",
+            exc_info=True,
+        )
+        try:
+            db.rollback()
+        except Exception as db_error:
+            logger.error(f"Error rolling back: {str(db_error)}")
+
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=60)
+
+        # The batch is given up; don't let it hold the content pending
+        try:
+            record_retry_finished(db, content_id)
+            finalize_content(db, content_id, after_retry=True)
+        except Exception as db_error:
+            logger.error(f"Error updating content status: {str(db_error)}")
+        raise
     finally:
         db.close()
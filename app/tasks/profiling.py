@@ -0,0 +1,22 @@
+"""
+Profile selected task runs, see ``app.services.profiling``.
+
+Selection is configured with ``PROFILE_TASKS`` and ``PROFILE_CONTENT_IDS``;
+with neither set these handlers return immediately.
+"""
+
+from celery.signals import task_postrun, task_prerun
+
+from app.services.profiling import task_profiler
+
+
+@task_prerun.connect
+def start_task_profile(task_id=None, task=None, args=None, kwargs=None, **extra):
+    if task_profiler.enabled:
+        task_profiler.start(task.name, task_id, list(args or []), kwargs or {})
+
+
+@task_postrun.connect
+def finish_task_profile(task_id=None, state=None, **extra):
+    if task_profiler.enabled:
+        task_profiler.finish(task_id, state or "UNKNOWN")
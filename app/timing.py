@@ -0,0 +1,228 @@
+"""
+Per-request timing for the API and a slow-query log.
+
+``RequestTimingMiddleware`` measures each request and reports the
+breakdown in a ``Server-Timing`` header:
+
+- ``queue``: time a sync endpoint waited for a threadpool thread
+- ``app``: time spent in the endpoint itself
+- ``db``: time spent executing SQL, with the statement count
+- ``serialize``: time from the endpoint returning to the response being ready
+- ``total``: time until the response headers were sent
+
+``queue``, ``app`` and ``serialize`` come from ``TimedRoute``, the route
+class of the API routers. Statements slower than ``SLOW_QUERY_MS`` are
+logged with a fingerprint that has literals and parameters replaced by
+``?``. A sample of requests, ``REQUEST_PROFILE_SAMPLE_RATE``, is run under
+cProfile and dumped to ``PROFILE_DIR/requests``.
+"""
+
+import os
+import re
+import time
+import random
+import asyncio
+import logging
+import cProfile
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+
+from app.services.profiling import PROFILE_DIR
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+REQUEST_PROFILE_SAMPLE_RATE = float(os.getenv("REQUEST_PROFILE_SAMPLE_RATE", "0"))
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+PARAMETER = re.compile(r"%\(\w+\)s|%s|\?|:\w+\b|\$\d+")
+VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """``statement`` with literals and parameters replaced by ``?`` and lists collapsed."""
+    statement = STRING_LITERAL.sub("?", statement)
+    statement = PARAMETER.sub("?", statement)
+    statement = NUMBER_LITERAL.sub("?", statement)
+    statement = VALUE_LIST.sub("(?)", statement)
+    return WHITESPACE.sub(" ", statement).strip()
+
+
+class RequestTiming:
+    def __init__(self, profile: bool = False):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.queue: Optional[float] = None
+        self.app: Optional[float] = None
+        self.serialize: Optional[float] = None
+        self.endpoint_finished: Optional[float] = None
+        self.total: Optional[float] = None
+        self.profile = cProfile.Profile() if profile else None
+
+    def header(self) -> str:
+        metrics = []
+        for name, seconds in (
+            ("queue", self.queue),
+            ("app", self.app),
+            ("serialize", self.serialize),
+        ):
+            if seconds is not None:
+                metrics.append(f"{name};dur={seconds * 1000:.1f}")
+        metrics.append(f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries"')
+        if self.total is not None:
+            metrics.append(f"total;dur={self.total * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Run the endpoint, under the request's profiler if it is sampled."""
+        if self.profile is None:
+            return func(*args, **kwargs)
+        return self.profile.runcall(func, *args, **kwargs)
+
+
+current_timing: ContextVar[Optional[RequestTiming]] = ContextVar(
+    "current_timing", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+
+    timing = current_timing.get()
+    if timing is not None:
+        timing.queries += 1
+        timing.db += elapsed
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        logger.warning(f"Slow query {elapsed * 1000:.0f}ms: {fingerprint(statement)}")
+
+
+class TimedRoute(APIRoute):
+    """
+    Route that records threadpool wait, endpoint and serialization time.
+
+    The endpoint call is wrapped before FastAPI builds the request handler:
+    sync endpoints are dispatched to the threadpool by the wrapper itself, so
+    it sees when the call was scheduled and when a thread picked it up.
+    """
+
+    def get_route_handler(self) -> Callable:
+        call = self.dependant.call
+        if asyncio.iscoroutinefunction(call):
+
+            async def timed_call(**values):
+                timing = current_timing.get()
+                if timing is None:
+                    return await call(**values)
+                started = time.perf_counter()
+                try:
+                    if timing.profile is None:
+                        return await call(**values)
+                    timing.profile.enable()
+                    try:
+                        return await call(**values)
+                    finally:
+                        timing.profile.disable()
+                finally:
+                    timing.endpoint_finished = time.perf_counter()
+                    timing.app = timing.endpoint_finished - started
+
+        else:
+
+            async def timed_call(**values):
+                timing = current_timing.get()
+                if timing is None:
+                    return await run_in_threadpool(call, **values)
+                scheduled = time.perf_counter()
+
+                def run():
+                    started = time.perf_counter()
+                    timing.queue = started - scheduled
+                    try:
+                        return timing.call(call, **values)
+                    finally:
+                        timing.endpoint_finished = time.perf_counter()
+                        timing.app = timing.endpoint_finished - started
+
+                return await run_in_threadpool(run)
+
+        self.dependant.call = timed_call
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            timing = current_timing.get()
+            if timing is not None and timing.endpoint_finished is not None:
+                timing.serialize = time.perf_counter() - timing.endpoint_finished
+            return response
+
+        return timed_handler
+
+
+class RequestTimingMiddleware:
+    """ASGI middleware that times requests and adds the ``Server-Timing`` header."""
+
+    def __init__(self, app, sample_rate: Optional[float] = None):
+        self.app = app
+        self.sample_rate = (
+            REQUEST_PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming(
+            profile=self.sample_rate > 0 and random.random() < self.sample_rate
+        )
+        token = current_timing.set(timing)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                timing.total = time.perf_counter() - timing.started
+                if SERVER_TIMING_ENABLED:
+                    MutableHeaders(scope=message).append("Server-Timing", timing.header())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timing.reset(token)
+            self._finish(scope, timing)
+
+    def _finish(self, scope, timing: RequestTiming) -> None:
+        elapsed_ms = (time.perf_counter() - timing.started) * 1000
+        request = f"{scope['method']} {scope['path']}"
+        if elapsed_ms >= SLOW_REQUEST_MS:
+            logger.warning(f"Slow request {elapsed_ms:.0f}ms {request}: {timing.header()}")
+        if timing.profile is not None and timing.app is not None:
+            directory = Path(PROFILE_DIR) / "requests"
+            name = re.sub(r"[^\w.-]+", "_", request).strip("_")
+            path = directory / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{name}.prof"
+            try:
+                directory.mkdir(parents=True, exist_ok=True)
+                timing.profile.dump_stats(str(path))
+            except OSError as e:
+                logger.error(f"Could not write request profile: {str(e)}")
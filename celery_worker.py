@@ -4,8 +4,19 @@ Celery worker configuration for Newsletter Service
 
 import os
 from celery import Celery
+from celery.concurrency import get_implementation
 from celery.schedules import crontab
+from celery.signals import (
+    after_setup_logger,
+    celeryd_init,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_shutdown,
+)
 from dotenv import load_dotenv
+from kombu import Queue
+
+from app.log_queue import LOG_QUEUE_ENABLED, log_queue
 
 load_dotenv()
 
@@ -25,15 +36,116 @@ if redbeat_redis_url:
     celery.conf.redbeat_lock_retry = True
     celery.conf.redbeat_max_retries = 3
 
+# Queues - small sends and bulk send chunks are consumed separately so a big
+# campaign never delays small newsletters. Periodic scans and bookkeeping,
+# which mostly wait on the database, get their own queue. Workers started
+# without -Q or a WORKER_PROFILE consume all of them, alternating between queues.
+SEND_SMALL_QUEUE = os.getenv("SEND_SMALL_QUEUE", "send_small")
+SEND_BULK_QUEUE = os.getenv("SEND_BULK_QUEUE", "send_bulk")
+SCAN_QUEUE = os.getenv("SCAN_QUEUE", "scan")
+celery.conf.task_default_queue = "celery"
+celery.conf.task_queues = (
+    Queue("celery"),
+    Queue(SEND_SMALL_QUEUE),
+    Queue(SEND_BULK_QUEUE),
+    Queue(SCAN_QUEUE),
+)
+
+# Routing - an explicit queue= on apply_async still wins, check_due_content
+# uses it to put bulk sends on the bulk queue
+celery.conf.task_routes = {
+    "app.tasks.send_content_to_subscribers": {"queue": SEND_SMALL_QUEUE},
+    "app.tasks.retry_recipients": {"queue": SEND_SMALL_QUEUE},
+    "app.tasks.send_chunk": {"queue": SEND_BULK_QUEUE},
+    "app.tasks.send_digests": {"queue": SEND_BULK_QUEUE},
+    "app.tasks.check_due_content": {"queue": SCAN_QUEUE},
+    "app.tasks.relay_outbox": {"queue": SCAN_QUEUE},
+    "app.tasks.warm_audience_snapshots": {"queue": SCAN_QUEUE},
+    "app.tasks.consume_delivery_events": {"queue": SCAN_QUEUE},
+    "app.tasks.reconcile_topic_counts": {"queue": SCAN_QUEUE},
+    "app.tasks.prune_task_runs": {"queue": SCAN_QUEUE},
+}
+
+# Worker profiles - execution model per class of work, selected with
+# WORKER_PROFILE when the worker starts. Sending spends its time waiting on
+# the email API, so it runs many threads in one process; scans are short,
+# database bound and memory hungry, so they run in a few recycled processes.
+# -P, -c, -Q and the other worker options on the command line still override
+# the profile, e.g. `-P gevent` for a send worker when gevent is installed.
+WORKER_PROFILES = {
+    "all": {
+        "pool": "prefork",
+        "concurrency": None,  # One process per CPU
+        "prefetch_multiplier": 1,
+        "max_tasks_per_child": 50,
+        "queues": None,  # Every queue
+    },
+    "send": {
+        "pool": "threads",
+        "concurrency": int(os.getenv("WORKER_SEND_CONCURRENCY", "32")),
+        "prefetch_multiplier": 2,
+        "max_tasks_per_child": None,  # Only applies to prefork
+        "queues": [SEND_SMALL_QUEUE, SEND_BULK_QUEUE],
+    },
+    "scan": {
+        "pool": "prefork",
+        "concurrency": int(os.getenv("WORKER_SCAN_CONCURRENCY", "2")),
+        "prefetch_multiplier": 1,
+        "max_tasks_per_child": 20,
+        "queues": [SCAN_QUEUE, "celery"],
+    },
+}
+WORKER_PROFILE = os.getenv("WORKER_PROFILE", "all")
+if WORKER_PROFILE not in WORKER_PROFILES:
+    raise ValueError(
+        f"Unknown WORKER_PROFILE {WORKER_PROFILE!r}, expected one of "
+        f"{', '.join(WORKER_PROFILES)}"
+    )
+worker_profile = WORKER_PROFILES[WORKER_PROFILE]
+
+# Every thread of a threaded worker holds its own database connection, so the
+# connection pool defaults to the profile's concurrency. Set before app.database
+# is imported by the tasks.
+THREADED_POOLS = ("threads", "gevent", "eventlet")
+if worker_profile["pool"] in THREADED_POOLS:
+    os.environ.setdefault("DB_POOL_SIZE", str(worker_profile["concurrency"]))
+
 # Task discovery
 celery.autodiscover_tasks(["app.tasks"])
 
-# Beat Schedule - Check for due content every minute
+# Beat Schedule - Check for due content, send closed digest windows, warm audience
+# snapshots and apply queued delivery events every minute, relay dispatch outbox
+# messages a failed relay left behind every 10 seconds, reconcile cached topic
+# subscriber counts every 15 minutes
 celery.conf.beat_schedule = {
     "check-due-content": {
         "task": "app.tasks.check_due_content",
         "schedule": crontab(minute="*"),  # Every minute
-    }
+    },
+    "relay-outbox": {
+        "task": "app.tasks.relay_outbox",
+        "schedule": 10.0,
+    },
+    "send-digests": {
+        "task": "app.tasks.send_digests",
+        "schedule": crontab(minute="*"),  # Every minute
+    },
+    "warm-audience-snapshots": {
+        "task": "app.tasks.warm_audience_snapshots",
+        "schedule": crontab(minute="*"),  # Every minute
+    },
+    "consume-delivery-events": {
+        "task": "app.tasks.consume_delivery_events",
+        "schedule": crontab(minute="*"),  # Every minute
+    },
+    "reconcile-topic-counts": {
+        "task": "app.tasks.reconcile_topic_counts",
+        "schedule": crontab(minute="*/15"),
+    },
+    "prune-task-runs": {
+        "task": "app.tasks.prune_task_runs",
+        "schedule": crontab(minute=0),  # Hourly
+    },
 }
 
 # General Celery Settings
@@ -44,9 +156,71 @@ celery.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
-    task_track_started=True,
+    # Tasks are fire-and-forget: nobody reads their results, so nothing is
+    # written to the result backend. Run summaries go to the task_runs table.
+    task_ignore_result=True,
+    task_track_started=False,
     task_time_limit=3600,  # 1 hour
     task_soft_time_limit=3540,  # 59 minutes
-    worker_prefetch_multiplier=1,
-    worker_max_tasks_per_child=50,
+    worker_pool=worker_profile["pool"],
+    worker_concurrency=worker_profile["concurrency"],
+    worker_prefetch_multiplier=worker_profile["prefetch_multiplier"],
+    worker_max_tasks_per_child=worker_profile["max_tasks_per_child"],
 )
+
+
+def check_db_pool_capacity(pool, concurrency) -> None:
+    """
+    Refuse to start a threaded worker with more threads than database connections.
+
+    Threads beyond the pool and its overflow would wait on the pool and fail
+    with a timeout, or lose their send lease while waiting.
+    """
+    from app.database import DB_MAX_OVERFLOW, DB_POOL_SIZE
+
+    pool_cls = get_implementation(pool) if isinstance(pool, str) else pool
+    if not concurrency or pool_cls.__module__.rsplit(".", 1)[-1] not in (
+        "thread",
+        "gevent",
+        "eventlet",
+    ):
+        return
+    capacity = DB_POOL_SIZE + DB_MAX_OVERFLOW
+    if concurrency > capacity:
+        raise RuntimeError(
+            f"Worker concurrency {concurrency} exceeds the database pool "
+            f"({DB_POOL_SIZE} + {DB_MAX_OVERFLOW} overflow); raise DB_POOL_SIZE "
+            f"or lower the concurrency"
+        )
+
+
+@celeryd_init.connect
+def select_profile_queues(instance=None, options=None, **kwargs):
+    """Consume only the profile's queues unless -Q was given."""
+    options = options or {}
+    check_db_pool_capacity(
+        options.get("pool_cls") or worker_profile["pool"],
+        options.get("concurrency") or worker_profile["concurrency"],
+    )
+    queues = worker_profile["queues"]
+    if queues and not options.get("queues"):
+        instance.app.amqp.queues.select(queues)
+
+
+# Logging - records are handed to a listener thread so tasks never wait on
+# log output; see app/log_queue.py
+@after_setup_logger.connect
+def queue_log_output(logger=None, **kwargs):
+    if LOG_QUEUE_ENABLED:
+        log_queue.install(logger)
+
+
+@worker_process_init.connect
+def restart_log_listener(**kwargs):
+    log_queue.after_fork()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def flush_log_queue(**kwargs):
+    log_queue.stop()
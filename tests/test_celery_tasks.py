@@ -1,22 +1,31 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
-from app.database import SessionLocal, engine, Base
-from app.models import Topic, Subscriber, Subscription, Content, ContentStatus
-from app.tasks.newsletter_tasks import check_due_content, send_content_to_subscribers
+from app.database import SessionLocal
+from app.models import (
+    SendChunk,
+    Topic,
+    Subscriber,
+    Subscription,
+    Content,
+    ContentStatus,
+    ContentRecipient,
+    DeadLetter,
+    DispatchOutbox,
+)
+from app.services.email_service import EmailSendError
+from app.tasks.newsletter_tasks import (
+    check_due_content,
+    relay_outbox,
+    retry_recipients,
+    send_content_to_subscribers,
+    warm_audience_snapshots,
+)
+from app.services.delivery import finalize_content, record_delivery_counts
+from app.services.outbox import claim_outbox_message, prune_outbox
 from celery_worker import celery
-
-
-@pytest.fixture(scope="function")
-def db():
-    Base.metadata.create_all(bind=engine)
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-        Base.metadata.drop_all(bind=engine)
+from tests.conftest import create_content_for
 
 
 @pytest.fixture(autouse=True)
@@ -52,12 +61,14 @@ def test_check_due_content_enqueues_tasks(db):
     db.add_all([content1, content2])
     db.commit()
     
-    with patch("app.tasks.newsletter_tasks.send_content_to_subscribers.delay") as mock_delay:
+    with patch(
+        "app.tasks.newsletter_tasks.send_content_to_subscribers.apply_async"
+    ) as mock_apply_async:
         result = check_due_content()
         
         assert result["checked"] == 2
         assert result["enqueued"] == 2
-        assert mock_delay.call_count == 2
+        assert mock_apply_async.call_count == 2
 
 
 @patch("app.services.email_service.send_email")
@@ -129,7 +140,7 @@ def test_send_content_to_subscribers_no_subscribers(mock_send_email, db):
 
 @patch("app.services.email_service.send_email")
 def test_send_content_to_subscribers_partial_failure(mock_send_email, db):
-    def side_effect(to_email, subject, body, from_email=None):
+    def side_effect(to_email, subject, body, from_email=None, **kwargs):
         if to_email == "user1@example.com":
             raise Exception("SMTP error")
         return True
@@ -167,6 +178,8 @@ def test_send_content_to_subscribers_partial_failure(mock_send_email, db):
     db.refresh(content)
     assert content.status == ContentStatus.SENT
     assert content.error_message is not None
+    assert content.sent_count == 1
+    assert content.failed_count == 1
 
 
 @patch("app.services.email_service.send_email")
@@ -229,3 +242,639 @@ def test_send_content_to_subscribers_already_sent(db):
     result = send_content_to_subscribers(content.id)
     assert result["status"] == "skipped"
 
+
+
+def test_warm_audience_snapshots_freezes_due_soon_content(db):
+    topic = Topic(name="Technology")
+    subscriber = Subscriber(email="user1@example.com", is_active=True)
+    db.add_all([topic, subscriber])
+    db.commit()
+
+    db.add(Subscription(subscriber_id=subscriber.id, topic_id=topic.id, is_active=True))
+    soon = Content(
+        topic_id=topic.id,
+        body="Soon",
+        scheduled_at=datetime.utcnow() + timedelta(minutes=5),
+        status=ContentStatus.PENDING
+    )
+    later = Content(
+        topic_id=topic.id,
+        body="Later",
+        scheduled_at=datetime.utcnow() + timedelta(days=1),
+        status=ContentStatus.PENDING
+    )
+    db.add_all([soon, later])
+    db.commit()
+
+    result = warm_audience_snapshots()
+
+    assert result == {"warmed": 1, "recipients": 1}
+    db.refresh(soon)
+    db.refresh(later)
+    assert soon.audience_frozen_at is not None
+    assert soon.recipient_count == 1
+    assert soon.prepared_subject == "Newsletter: Technology"
+    assert later.audience_frozen_at is None
+
+
+def test_warm_audience_snapshots_skips_locked_content(db):
+    topic = Topic(name="Technology")
+    db.add(topic)
+    db.commit()
+    content = Content(
+        topic_id=topic.id,
+        body="Soon",
+        scheduled_at=datetime.utcnow() + timedelta(minutes=5),
+        status=ContentStatus.PENDING
+    )
+    db.add(content)
+    db.commit()
+
+    # A sender taking the snapshot holds the row lock
+    sender = SessionLocal()
+    try:
+        sender.query(Content).filter(Content.id == content.id).with_for_update().one()
+        assert warm_audience_snapshots() == {"warmed": 0, "recipients": 0}
+    finally:
+        sender.rollback()
+        sender.close()
+
+    db.refresh(content)
+    assert content.audience_frozen_at is None
+
+
+@patch("app.services.email_service.send_email")
+def test_send_uses_frozen_audience(mock_send_email, db):
+    mock_send_email.return_value = True
+
+    topic = Topic(name="Technology")
+    early = Subscriber(email="early@example.com", is_active=True)
+    db.add_all([topic, early])
+    db.commit()
+    db.add(Subscription(subscriber_id=early.id, topic_id=topic.id, is_active=True))
+    content = Content(
+        topic_id=topic.id,
+        title="Test Newsletter",
+        body="Test body",
+        scheduled_at=datetime.utcnow() + timedelta(minutes=5),
+        status=ContentStatus.PENDING
+    )
+    db.add(content)
+    db.commit()
+
+    warm_audience_snapshots()
+
+    late = Subscriber(email="late@example.com", is_active=True)
+    db.add(late)
+    db.commit()
+    db.add(Subscription(subscriber_id=late.id, topic_id=topic.id, is_active=True))
+    db.commit()
+
+    result = send_content_to_subscribers(content.id)
+
+    assert result["sent"] == 1
+    mock_send_email.assert_called_once()
+    assert mock_send_email.call_args.kwargs["to_email"] == "early@example.com"
+    assert db.query(ContentRecipient).filter_by(content_id=content.id).count() == 1
+
+
+def test_finalize_content_only_touches_pending(db):
+    topic = Topic(name="Technology")
+    db.add(topic)
+    db.commit()
+
+    content = Content(
+        topic_id=topic.id,
+        body="Body",
+        scheduled_at=datetime.utcnow(),
+        status=ContentStatus.CANCELLED
+    )
+    db.add(content)
+    db.commit()
+
+    record_delivery_counts(db, content.id, sent=3, failed=1)
+    assert finalize_content(db, content.id) is None
+
+    db.refresh(content)
+    assert content.status == ContentStatus.CANCELLED
+    assert content.sent_count == 3
+    assert content.failed_count == 1
+
+
+@patch("app.services.email_service.send_email")
+def test_transient_failure_is_retried(mock_send_email, db):
+    attempts = {"user1@example.com": 0}
+
+    def side_effect(to_email, subject, body, **kwargs):
+        if to_email == "user1@example.com":
+            attempts[to_email] += 1
+            if attempts[to_email] < 3:
+                raise EmailSendError("Brevo API error: 429", status_code=429, transient=True)
+        return True
+
+    mock_send_email.side_effect = side_effect
+    content = create_content_for(db, ["user1@example.com", "user2@example.com"])
+
+    result = send_content_to_subscribers(content.id)
+
+    assert result["sent"] == 1
+    assert result["retrying"] == 1
+    assert attempts["user1@example.com"] == 3
+    db.refresh(content)
+    assert content.status == ContentStatus.SENT
+    assert content.sent_count == 2
+    assert content.failed_count == 0
+    assert db.query(DeadLetter).count() == 0
+
+
+@patch("app.services.email_service.send_email")
+def test_exhausted_retries_go_to_dead_letters(mock_send_email, db):
+    mock_send_email.side_effect = EmailSendError(
+        "Brevo API error: 503", status_code=503, transient=True
+    )
+    content = create_content_for(db, ["user1@example.com"])
+
+    with patch("app.services.retries.SEND_RETRY_MAX_ATTEMPTS", 3):
+        send_content_to_subscribers(content.id)
+
+    assert mock_send_email.call_count == 3
+    dead_letter = db.query(DeadLetter).one()
+    assert dead_letter.email == "user1@example.com"
+    assert dead_letter.attempts == 3
+    assert "503" in dead_letter.reason
+    db.refresh(content)
+    assert content.failed_count == 1
+
+
+@patch("app.services.email_service.send_email")
+def test_send_stays_pending_until_retries_finish(mock_send_email, db):
+    mock_send_email.side_effect = EmailSendError(
+        "Brevo API error: 503", status_code=503, transient=True
+    )
+    content = create_content_for(db, ["user1@example.com"])
+
+    with patch("app.tasks.newsletter_tasks.retry_recipients.apply_async") as mock_retry:
+        result = send_content_to_subscribers(content.id)
+
+    assert result["retrying"] == 1
+    db.refresh(content)
+    assert content.status == ContentStatus.PENDING
+    assert content.sent_at is None
+    assert content.retries_pending == 1
+    assert content.send_cursor is not None
+
+    with patch("app.services.retries.SEND_RETRY_MAX_ATTEMPTS", 2):
+        retry_recipients(*mock_retry.call_args.kwargs["args"])
+
+    db.refresh(content)
+    assert content.retries_pending == 0
+    assert content.status == ContentStatus.FAILED
+    assert content.failed_count == 1
+
+
+def test_retry_batch_is_retried_on_errors_then_released(db):
+    content = create_content_for(db, ["user1@example.com"])
+    content.retries_pending = 1
+    db.commit()
+
+    # Eager retries run right away, each one nested in the previous attempt
+    celery.conf.task_eager_propagates = False
+    with patch(
+        "app.tasks.newsletter_tasks.decode_recipient_set",
+        side_effect=RuntimeError("database unavailable"),
+    ) as mock_decode:
+        result = retry_recipients.apply(args=[content.id, [1], 2])
+
+    assert result.state == "FAILURE"
+    assert mock_decode.call_count == 1 + retry_recipients.max_retries
+    db.refresh(content)
+    assert content.retries_pending == 0
+
+
+@patch("app.services.email_service.send_email")
+def test_permanent_failure_is_not_retried(mock_send_email, db):
+    mock_send_email.side_effect = EmailSendError(
+        "Brevo API error: 400", status_code=400, transient=False
+    )
+    content = create_content_for(db, ["user1@example.com"])
+
+    result = send_content_to_subscribers(content.id)
+
+    assert result["failed"] == 1
+    assert result["retrying"] == 0
+    assert mock_send_email.call_count == 1
+    assert db.query(DeadLetter).one().attempts == 1
+
+
+@patch("app.services.send_control.get_redis", return_value=None)
+@patch("app.services.email_service.send_email")
+def test_paused_send_resumes_from_cursor(mock_send_email, mock_get_redis, db):
+    emails = [f"user{i}@example.com" for i in range(5)]
+    sent_to = []
+
+    def side_effect(to_email, subject, body, **kwargs):
+        sent_to.append(to_email)
+        if len(sent_to) == 2:
+            other = SessionLocal()
+            other.query(Content).update({"status": ContentStatus.PAUSED})
+            other.commit()
+            other.close()
+        return True
+
+    mock_send_email.side_effect = side_effect
+    content = create_content_for(db, emails)
+
+    with patch("app.services.send_control.SEND_CONTROL_CHECK_EVERY", 1), patch(
+        "app.tasks.newsletter_tasks.DOMAIN_INTERLEAVE_WINDOW", 1
+    ):
+        result = send_content_to_subscribers(content.id)
+
+    assert result["status"] == "paused"
+    assert result["sent"] == 2
+    db.refresh(content)
+    assert content.status == ContentStatus.PAUSED
+    assert content.sent_count == 2
+    assert content.send_cursor is not None
+
+    content.status = ContentStatus.PENDING
+    db.commit()
+    result = send_content_to_subscribers(content.id)
+
+    assert result["sent"] == 3
+    assert sent_to == emails
+    db.refresh(content)
+    assert content.status == ContentStatus.SENT
+    assert content.sent_count == 5
+
+
+@patch("app.services.send_control.get_redis", return_value=None)
+@patch("app.services.email_service.send_email")
+def test_cancelled_send_stops_and_stays_cancelled(mock_send_email, mock_get_redis, db):
+    def side_effect(to_email, subject, body, **kwargs):
+        other = SessionLocal()
+        other.query(Content).update({"status": ContentStatus.CANCELLED})
+        other.commit()
+        other.close()
+        return True
+
+    mock_send_email.side_effect = side_effect
+    content = create_content_for(db, ["user1@example.com", "user2@example.com"])
+
+    with patch("app.services.send_control.SEND_CONTROL_CHECK_EVERY", 1), patch(
+        "app.tasks.newsletter_tasks.DOMAIN_INTERLEAVE_WINDOW", 1
+    ):
+        result = send_content_to_subscribers(content.id)
+
+    assert result["status"] == "cancelled"
+    assert mock_send_email.call_count == 1
+    db.refresh(content)
+    assert content.status == ContentStatus.CANCELLED
+    assert content.sent_count == 1
+
+
+def test_check_due_content_routes_by_audience_size(db):
+    small = Topic(name="Small")
+    big = Topic(name="Big", active_subscriber_count=100000)
+    db.add_all([small, big])
+    db.commit()
+    past_time = datetime.utcnow() - timedelta(minutes=5)
+    db.add_all([
+        Content(topic_id=topic.id, body="Body", scheduled_at=past_time)
+        for topic in (small, big)
+    ])
+    db.commit()
+
+    with patch(
+        "app.tasks.newsletter_tasks.send_content_to_subscribers.apply_async"
+    ) as mock_apply_async:
+        check_due_content()
+
+    queues = sorted(call.kwargs["queue"] for call in mock_apply_async.call_args_list)
+    assert queues == ["send_bulk", "send_small"]
+
+
+@patch("app.services.email_service.send_email")
+def test_bulk_send_is_split_into_chunks(mock_send_email, db):
+    mock_send_email.return_value = True
+    emails = [f"user{i}@example.com" for i in range(5)]
+    content = create_content_for(db, emails)
+
+    with patch("app.services.chunks.SEND_CHUNK_SIZE", 2), patch(
+        "app.services.chunks.SEND_CHUNK_WINDOW", 1
+    ):
+        result = send_content_to_subscribers(content.id)
+
+    assert result["status"] == "dispatched"
+    assert result["chunks"] == 3
+    assert sorted(call.kwargs["to_email"] for call in mock_send_email.call_args_list) == emails
+    chunks = db.query(SendChunk).order_by(SendChunk.seq).all()
+    assert [c.last_subscriber_id - c.first_subscriber_id for c in chunks] == [1, 1, 0]
+    assert all(c.completed_at is not None for c in chunks)
+    db.refresh(content)
+    assert content.status == ContentStatus.SENT
+    assert content.sent_count == 5
+
+
+def test_check_due_content_caps_concurrent_sends(db):
+    topic = Topic(name="Technology")
+    db.add(topic)
+    db.commit()
+    now = datetime.utcnow()
+    contents = [
+        Content(topic_id=topic.id, body="Late", scheduled_at=now - timedelta(hours=2)),
+        Content(topic_id=topic.id, body="Recent", scheduled_at=now - timedelta(minutes=1)),
+        Content(
+            topic_id=topic.id,
+            body="Urgent",
+            scheduled_at=now - timedelta(minutes=1),
+            priority=5,
+        ),
+    ]
+    db.add_all(contents)
+    db.commit()
+
+    with patch("app.tasks.newsletter_tasks.DISPATCH_MAX_CONCURRENT_SENDS", 2), patch(
+        "app.tasks.newsletter_tasks.send_content_to_subscribers.apply_async"
+    ) as mock_apply_async:
+        result = check_due_content()
+        enqueued = [call.kwargs["args"][0] for call in mock_apply_async.call_args_list]
+        assert enqueued == [contents[2].id, contents[0].id]
+        assert result["backlog"] == 1
+
+        # Both dispatched sends are still running, so nothing new starts
+        mock_apply_async.reset_mock()
+        result = check_due_content()
+        assert result["active"] == 2
+        assert result["enqueued"] == 0
+        assert mock_apply_async.call_count == 0
+
+
+def test_check_due_content_does_not_count_retry_backoff_as_active(db):
+    topic = Topic(name="Technology")
+    db.add(topic)
+    db.commit()
+    now = datetime.utcnow()
+    backing_off = Content(
+        topic_id=topic.id,
+        body="Retrying",
+        scheduled_at=now - timedelta(hours=1),
+        dispatched_at=now - timedelta(minutes=10),
+        heartbeat_at=now + timedelta(minutes=5),
+        retries_pending=1,
+    )
+    waiting = Content(topic_id=topic.id, body="Late", scheduled_at=now - timedelta(hours=2))
+    db.add_all([backing_off, waiting])
+    db.commit()
+
+    with patch("app.tasks.newsletter_tasks.DISPATCH_MAX_CONCURRENT_SENDS", 1), patch(
+        "app.tasks.newsletter_tasks.send_content_to_subscribers.apply_async"
+    ) as mock_apply_async:
+        result = check_due_content()
+
+    assert result["enqueued"] == 1
+    assert mock_apply_async.call_args.kwargs["args"][0] == waiting.id
+
+
+def test_check_due_content_fails_stale_content(db):
+    topic = Topic(name="Technology")
+    db.add(topic)
+    db.commit()
+    stale = Content(
+        topic_id=topic.id, body="Body", scheduled_at=datetime.utcnow() - timedelta(days=2)
+    )
+    db.add(stale)
+    db.commit()
+
+    with patch("app.services.dispatch.DISPATCH_STALE_POLICY", "fail"), patch(
+        "app.tasks.newsletter_tasks.send_content_to_subscribers.apply_async"
+    ) as mock_apply_async:
+        result = check_due_content()
+
+    assert result["skipped_stale"] == 1
+    assert mock_apply_async.call_count == 0
+    db.refresh(stale)
+    assert stale.status == ContentStatus.FAILED
+    assert stale.error_message.startswith("Skipped")
+
+
+@patch("app.services.email_service.send_email")
+def test_multi_topic_content_sends_once_per_subscriber(mock_send_email, db):
+    mock_send_email.return_value = True
+    tech, science = Topic(name="Technology"), Topic(name="Science")
+    both, one = Subscriber(email="both@example.com"), Subscriber(email="one@example.com")
+    db.add_all([tech, science, both, one])
+    db.commit()
+    db.add_all([
+        Subscription(subscriber_id=both.id, topic_id=tech.id),
+        Subscription(subscriber_id=both.id, topic_id=science.id),
+        Subscription(subscriber_id=one.id, topic_id=science.id),
+    ])
+    content = Content(
+        topic_id=tech.id,
+        additional_topics=[science],
+        body="Announcement",
+        scheduled_at=datetime.utcnow() - timedelta(minutes=5),
+    )
+    db.add(content)
+    db.commit()
+
+    result = send_content_to_subscribers(content.id)
+
+    assert result["sent"] == 2
+    assert sorted(call.kwargs["to_email"] for call in mock_send_email.call_args_list) == [
+        "both@example.com",
+        "one@example.com",
+    ]
+
+
+@patch("app.services.email_service.send_email")
+def test_segmented_content_sends_to_matching_subscribers(mock_send_email, db):
+    mock_send_email.return_value = True
+    topic = Topic(name="Technology")
+    pro = Subscriber(email="pro@example.com", attributes={"plan": "pro"})
+    free = Subscriber(email="free@example.com", attributes={"plan": "free"})
+    db.add_all([topic, pro, free])
+    db.commit()
+    db.add_all([
+        Subscription(subscriber_id=pro.id, topic_id=topic.id),
+        Subscription(subscriber_id=free.id, topic_id=topic.id),
+    ])
+    content = Content(
+        topic_id=topic.id,
+        body="Pro feature launch",
+        segment={"plan": "pro"},
+        scheduled_at=datetime.utcnow() - timedelta(minutes=5),
+    )
+    db.add(content)
+    db.commit()
+
+    result = send_content_to_subscribers(content.id)
+
+    assert result["sent"] == 1
+    assert mock_send_email.call_args.kwargs["to_email"] == "pro@example.com"
+
+
+def test_check_due_content_dispatches_through_outbox(db):
+    topic = Topic(name="Technology")
+    db.add(topic)
+    db.commit()
+    content = Content(
+        topic_id=topic.id, body="Body", scheduled_at=datetime.utcnow() - timedelta(minutes=5)
+    )
+    db.add(content)
+    db.commit()
+
+    with patch(
+        "app.tasks.newsletter_tasks.send_content_to_subscribers.apply_async"
+    ) as mock_apply_async:
+        result = check_due_content()
+
+    assert result["published"] == 1
+    message = db.query(DispatchOutbox).one()
+    assert message.args == [content.id]
+    assert message.published_at is not None
+    call = mock_apply_async.call_args
+    assert call.kwargs["kwargs"] == {"outbox_id": message.id}
+    assert call.kwargs["task_id"] == f"outbox-{message.id}"
+
+
+def test_outbox_messages_survive_failed_relay(db):
+    topic = Topic(name="Technology")
+    db.add(topic)
+    db.commit()
+    content = Content(
+        topic_id=topic.id, body="Body", scheduled_at=datetime.utcnow() - timedelta(minutes=5)
+    )
+    db.add(content)
+    db.commit()
+
+    with patch(
+        "app.tasks.newsletter_tasks.send_content_to_subscribers.apply_async",
+        side_effect=ConnectionError("broker down"),
+    ):
+        result = check_due_content()
+
+    # The claim is committed with its message even though publishing failed
+    assert result["enqueued"] == 1
+    assert result["published"] == 0
+    db.refresh(content)
+    assert content.dispatched_at is not None
+    assert db.query(DispatchOutbox).one().published_at is None
+
+    with patch(
+        "app.tasks.newsletter_tasks.send_content_to_subscribers.apply_async"
+    ) as mock_apply_async:
+        assert relay_outbox()["published"] == 1
+        assert relay_outbox()["published"] == 0
+    assert mock_apply_async.call_count == 1
+
+
+@patch("app.services.email_service.send_email")
+def test_duplicate_outbox_delivery_is_dropped(mock_send_email, db):
+    mock_send_email.return_value = True
+    content = create_content_for(db, ["user@example.com"])
+    message = DispatchOutbox(
+        task=send_content_to_subscribers.name, args=[content.id], queue="send_small"
+    )
+    db.add(message)
+    db.commit()
+
+    first = send_content_to_subscribers(content.id, outbox_id=message.id)
+    second = send_content_to_subscribers(content.id, outbox_id=message.id)
+
+    assert first["status"] == "completed"
+    assert second == {"status": "skipped", "message": "Duplicate dispatch"}
+    assert mock_send_email.call_count == 1
+
+
+def test_prune_outbox_keeps_unconsumed_messages(db):
+    old = datetime.now(timezone.utc) - timedelta(days=2)
+    waiting = DispatchOutbox(
+        task=send_content_to_subscribers.name, args=[1], queue="send_small", published_at=old
+    )
+    consumed = DispatchOutbox(
+        task=send_content_to_subscribers.name,
+        args=[2],
+        queue="send_small",
+        published_at=old,
+        consumed_at=old,
+    )
+    db.add_all([waiting, consumed])
+    db.commit()
+    consumed_id = consumed.id
+
+    assert prune_outbox(db) == 1
+    assert db.query(DispatchOutbox).one().id == waiting.id
+    # A missing row is not treated as a duplicate
+    assert claim_outbox_message(db, consumed_id) is True
+    assert claim_outbox_message(db, waiting.id) is True
+    assert claim_outbox_message(db, waiting.id) is False
+
+
+@patch("app.services.email_service.send_email")
+def test_send_held_by_live_lease_is_skipped(mock_send_email, db):
+    content = create_content_for(db, ["user@example.com"])
+    content.sending_by = "other-task"
+    content.heartbeat_at = datetime.utcnow()
+    db.commit()
+
+    result = send_content_to_subscribers(content.id)
+
+    assert result == {"status": "skipped", "message": "Send already in progress"}
+    mock_send_email.assert_not_called()
+
+
+@patch("app.services.email_service.send_email")
+def test_expired_lease_is_taken_over_and_released(mock_send_email, db):
+    mock_send_email.return_value = True
+    content = create_content_for(db, ["user@example.com"])
+    content.sending_by = "dead-task"
+    content.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+    db.commit()
+
+    result = send_content_to_subscribers(content.id)
+
+    assert result["status"] == "completed"
+    db.refresh(content)
+    assert content.sending_by is None
+    assert content.status == ContentStatus.SENT
+
+
+def test_stalled_send_is_dispatched_again_only_after_lease_expires(db):
+    content = create_content_for(db, ["user@example.com"])
+    content.dispatched_at = datetime.utcnow() - timedelta(hours=2)
+    content.sending_by = "running-task"
+    content.heartbeat_at = datetime.utcnow()
+    db.commit()
+
+    with patch(
+        "app.tasks.newsletter_tasks.send_content_to_subscribers.apply_async"
+    ) as mock_apply_async:
+        assert check_due_content()["enqueued"] == 0
+        content.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+        db.commit()
+        assert check_due_content()["enqueued"] == 1
+    assert mock_apply_async.call_count == 1
+
+
+def test_tasks_are_routed_by_class_of_work():
+    from celery_worker import SCAN_QUEUE, SEND_BULK_QUEUE, SEND_SMALL_QUEUE
+
+    def queue_of(task_name):
+        return celery.amqp.router.route({}, task_name)["queue"].name
+
+    assert queue_of("app.tasks.send_content_to_subscribers") == SEND_SMALL_QUEUE
+    assert queue_of("app.tasks.send_chunk") == SEND_BULK_QUEUE
+    assert queue_of("app.tasks.check_due_content") == SCAN_QUEUE
+    assert queue_of("app.tasks.relay_outbox") == SCAN_QUEUE
+
+
+def test_threaded_worker_needs_a_connection_per_thread():
+    from celery_worker import check_db_pool_capacity
+    from app.database import DB_MAX_OVERFLOW, DB_POOL_SIZE
+
+    capacity = DB_POOL_SIZE + DB_MAX_OVERFLOW
+    check_db_pool_capacity("threads", capacity)
+    check_db_pool_capacity("prefork", capacity + 1)
+    with pytest.raises(RuntimeError):
+        check_db_pool_capacity("threads", capacity + 1)
@@ -44,6 +44,21 @@ def test_create_content_invalid_topic(client):
     assert response.status_code == 404
 
 
+def test_create_content_unknown_merge_tag(topic_id, client):
+    scheduled_at = (datetime.utcnow() + timedelta(hours=1)).isoformat()
+    response = client.post(
+        "/api/content/",
+        json={
+            "topic_id": topic_id,
+            "title": "Weekly Update",
+            "body": "Hello {{ first_name }}",
+            "scheduled_at": scheduled_at,
+        },
+    )
+    assert response.status_code == 400
+    assert "first_name" in response.json()["detail"]
+
+
 def test_list_content(topic_id, client):
     scheduled_at = (datetime.utcnow() + timedelta(hours=1)).isoformat()
     client.post(
@@ -156,9 +171,220 @@ def test_update_content(topic_id, client):
 
     response = client.patch(
         f"/api/content/{content_id}",
-        json={"title": "Updated Title", "status": ContentStatus.CANCELLED.value},
+        json={"title": "Updated Title"},
     )
     assert response.status_code == 200
+    assert response.json()["title"] == "Updated Title"
+
+    # Status changes go through pause, resume and cancel
+    response = client.patch(
+        f"/api/content/{content_id}",
+        json={"status": ContentStatus.CANCELLED.value},
+    )
+    assert response.status_code == 422
+    assert "cancel endpoints" in response.text
+    response = client.get(f"/api/content/{content_id}")
+    assert response.json()["status"] == ContentStatus.PENDING.value
+
+
+def test_list_content_fields_projection(topic_id, client):
+    scheduled_at = (datetime.utcnow() + timedelta(hours=1)).isoformat()
+    client.post(
+        "/api/content/",
+        json={
+            "topic_id": topic_id,
+            "title": "Weekly Update",
+            "body": "A very long newsletter body",
+            "scheduled_at": scheduled_at,
+        },
+    )
+
+    response = client.get("/api/content/?fields=title,status")
+    assert response.status_code == 200
     data = response.json()
-    assert data["title"] == "Updated Title"
-    assert data["status"] == ContentStatus.CANCELLED.value
+    assert len(data) == 1
+    assert set(data[0].keys()) == {"id", "title", "status"}
+    assert data[0]["title"] == "Weekly Update"
+    assert data[0]["status"] == ContentStatus.PENDING.value
+
+
+def test_list_content_unknown_field(client):
+    response = client.get("/api/content/?fields=title,secret")
+    assert response.status_code == 400
+
+
+def test_get_content_progress(topic_id, client):
+    scheduled_at = (datetime.utcnow() + timedelta(hours=1)).isoformat()
+    content_id = client.post(
+        "/api/content/",
+        json={
+            "topic_id": topic_id,
+            "title": "Weekly Update",
+            "body": "Content body",
+            "scheduled_at": scheduled_at,
+        },
+    ).json()["id"]
+
+    assert client.get(f"/api/content/{content_id}").json()["progress"] is None
+    assert client.get(f"/api/content/{content_id}/progress").status_code == 404
+
+
+def test_pause_resume_cancel_content(topic_id, client):
+    scheduled_at = (datetime.utcnow() + timedelta(hours=1)).isoformat()
+    content_id = client.post(
+        "/api/content/",
+        json={"topic_id": topic_id, "body": "Body", "scheduled_at": scheduled_at},
+    ).json()["id"]
+
+    response = client.post(f"/api/content/{content_id}/pause")
+    assert response.status_code == 200
+    assert response.json()["status"] == ContentStatus.PAUSED.value
+
+    response = client.post(f"/api/content/{content_id}/pause")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cannot pause content with status paused"
+
+    response = client.post(f"/api/content/{content_id}/resume")
+    assert response.status_code == 200
+    assert response.json()["status"] == ContentStatus.PENDING.value
+
+    response = client.post(f"/api/content/{content_id}/cancel")
+    assert response.status_code == 200
+    assert response.json()["status"] == ContentStatus.CANCELLED.value
+
+    assert client.post(f"/api/content/{content_id}/resume").status_code == 400
+    assert client.post("/api/content/99999/cancel").status_code == 404
+
+
+def test_resume_hands_due_content_back_to_the_dispatcher(topic_id, client, db_session):
+    from unittest.mock import patch
+    from app.models import Content, DispatchOutbox
+    from app.tasks.newsletter_tasks import check_due_content
+
+    scheduled_at = (datetime.utcnow() - timedelta(minutes=5)).isoformat()
+    content_id = client.post(
+        "/api/content/",
+        json={"topic_id": topic_id, "body": "Body", "scheduled_at": scheduled_at},
+    ).json()["id"]
+    content = db_session.query(Content).filter(Content.id == content_id).one()
+    content.status = ContentStatus.PAUSED
+    content.dispatched_at = datetime.utcnow()
+    db_session.commit()
+
+    with patch(
+        "app.tasks.newsletter_tasks.send_content_to_subscribers.apply_async"
+    ) as mock_apply_async:
+        response = client.post(f"/api/content/{content_id}/resume")
+        assert response.status_code == 200
+        mock_apply_async.assert_not_called()
+        db_session.refresh(content)
+        assert content.dispatched_at is None
+
+        assert check_due_content()["enqueued"] == 1
+    message = db_session.query(DispatchOutbox).one()
+    assert message.args == [content_id]
+    assert message.queue == "send_small"
+
+
+def test_update_content_rejects_retargeting_a_running_send(topic_id, client, db_session):
+    from app.models import Content
+
+    other_id = client.post("/api/topics/", json={"name": "Science"}).json()["id"]
+    scheduled_at = (datetime.utcnow() - timedelta(minutes=5)).isoformat()
+    content_id = client.post(
+        "/api/content/",
+        json={"topic_id": topic_id, "body": "Body", "scheduled_at": scheduled_at},
+    ).json()["id"]
+    content = db_session.query(Content).filter(Content.id == content_id).one()
+    content.dispatched_at = datetime.utcnow()
+    db_session.commit()
+
+    response = client.patch(f"/api/content/{content_id}", json={"topic_id": other_id})
+    assert response.status_code == 409
+    response = client.patch(
+        f"/api/content/{content_id}",
+        json={"scheduled_at": datetime.utcnow().isoformat()},
+    )
+    assert response.status_code == 409
+    response = client.patch(f"/api/content/{content_id}", json={"title": "Typo fixed"})
+    assert response.status_code == 200
+
+
+def test_update_title_after_audience_snapshot(topic_id, client, db_session):
+    from app.models import Content
+    from app.services.audience import warm_audience_snapshot
+
+    scheduled_at = (datetime.utcnow() + timedelta(minutes=5)).isoformat()
+    content_id = client.post(
+        "/api/content/",
+        json={
+            "topic_id": topic_id,
+            "title": "Old title",
+            "body": "Body",
+            "scheduled_at": scheduled_at,
+        },
+    ).json()["id"]
+    assert warm_audience_snapshot(db_session, content_id) == 0
+
+    response = client.patch(f"/api/content/{content_id}", json={"title": "New title"})
+    assert response.status_code == 200
+    content = db_session.query(Content).filter(Content.id == content_id).one()
+    assert content.audience_frozen_at is not None
+    assert content.prepared_subject == "New title"
+
+
+def test_create_content_for_several_topics(topic_id, client, db_session):
+    from app.models import ContentTopic
+
+    other_id = client.post("/api/topics/", json={"name": "Science"}).json()["id"]
+    scheduled_at = (datetime.utcnow() + timedelta(hours=1)).isoformat()
+
+    response = client.post(
+        "/api/content/",
+        json={
+            "topic_id": topic_id,
+            "topic_ids": [other_id, topic_id],
+            "body": "Announcement",
+            "scheduled_at": scheduled_at,
+        },
+    )
+    assert response.status_code == 201
+    content_id = response.json()["id"]
+    assert response.json()["topic_ids"] == [topic_id, other_id]
+
+    listed = client.get("/api/content/").json()
+    assert listed[0]["topic_ids"] == [topic_id, other_id]
+    listed = client.get("/api/content/?fields=topic_ids").json()
+    assert listed == [{"id": content_id, "topic_ids": [topic_id, other_id]}]
+    listed = client.get(f"/api/content/?topic_id={other_id}&fields=id").json()
+    assert listed == [{"id": content_id}]
+
+    # Switching the primary topic drops it from the additional topics
+    response = client.patch(f"/api/content/{content_id}", json={"topic_id": other_id})
+    assert response.json()["topic_ids"] == [other_id]
+    stored = db_session.query(ContentTopic.topic_id).filter(
+        ContentTopic.content_id == content_id
+    )
+    assert stored.all() == []
+
+    response = client.patch(
+        f"/api/content/{content_id}",
+        json={"topic_id": topic_id, "topic_ids": [topic_id, other_id]},
+    )
+    assert response.json()["topic_ids"] == [topic_id, other_id]
+    assert [row.topic_id for row in stored] == [other_id]
+
+    response = client.patch(f"/api/content/{content_id}", json={"topic_ids": []})
+    assert response.json()["topic_ids"] == [topic_id]
+    assert client.get("/api/content/").json()[0]["topic_ids"] == [topic_id]
+
+    response = client.post(
+        "/api/content/",
+        json={
+            "topic_id": topic_id,
+            "topic_ids": [99999],
+            "body": "Announcement",
+            "scheduled_at": scheduled_at,
+        },
+    )
+    assert response.status_code == 404
@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import patch
+from datetime import datetime
+from app.models import Topic, Subscriber, Content, ContentStatus, DeadLetter, DispatchOutbox
+from app.services.recipient_sets import encode_recipient_set
+
+
+@pytest.fixture(scope="function")
+def dead_letters(db_session):
+    topic = Topic(name="Technology")
+    subscribers = [Subscriber(email=f"user{i}@example.com") for i in range(3)]
+    db_session.add_all([topic] + subscribers)
+    db_session.commit()
+
+    content = Content(
+        topic_id=topic.id,
+        body="Body",
+        scheduled_at=datetime.utcnow(),
+        status=ContentStatus.SENT,
+        sent_count=5,
+        failed_count=3,
+    )
+    db_session.add(content)
+    db_session.commit()
+
+    letters = [
+        DeadLetter(
+            content_id=content.id,
+            subscriber_id=subscriber.id,
+            email=subscriber.email,
+            reason="Brevo API error: 400",
+            attempts=1,
+        )
+        for subscriber in subscribers
+    ]
+    db_session.add_all(letters)
+    db_session.commit()
+    return {"content": content, "letters": letters}
+
+
+def test_list_dead_letters(dead_letters, client):
+    response = client.get(f"/api/dead-letters/?content_id={dead_letters['content'].id}")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 3
+    assert data[0]["reason"] == "Brevo API error: 400"
+
+
+def test_replay_dead_letters(dead_letters, client, db_session):
+    content_id = dead_letters["content"].id
+    first_id = dead_letters["letters"][0].id
+
+    with patch(
+        "app.tasks.newsletter_tasks.retry_recipients.apply_async"
+    ) as mock_apply_async:
+        response = client.post("/api/dead-letters/replay", json={"ids": [first_id]})
+
+    assert response.status_code == 200
+    assert response.json() == {"replayed": 1, "content_ids": [content_id]}
+    message = db_session.query(DispatchOutbox).one()
+    assert message.args == [
+        content_id, encode_recipient_set([dead_letters["letters"][0].subscriber_id]), 1
+    ]
+    assert message.published_at is not None
+    assert mock_apply_async.call_args.kwargs["kwargs"] == {"outbox_id": message.id}
+
+    remaining = client.get("/api/dead-letters/").json()
+    assert len(remaining) == 2
+    db_session.refresh(dead_letters["content"])
+    assert dead_letters["content"].failed_count == 2
+
+
+def test_replay_is_kept_when_the_broker_is_down(dead_letters, client, db_session):
+    with patch(
+        "app.tasks.newsletter_tasks.retry_recipients.apply_async",
+        side_effect=ConnectionError("broker down"),
+    ):
+        response = client.post(
+            "/api/dead-letters/replay",
+            json={"content_id": dead_letters["content"].id},
+        )
+
+    assert response.status_code == 200
+    assert response.json()["replayed"] == 3
+    message = db_session.query(DispatchOutbox).one()
+    assert message.task == "app.tasks.retry_recipients"
+    assert message.published_at is None
+
+
+def test_replay_requires_selection(client):
+    response = client.post("/api/dead-letters/replay", json={})
+    assert response.status_code == 400
@@ -0,0 +1,167 @@
+from unittest.mock import patch
+from datetime import datetime, timedelta
+from app.models import Topic, Subscriber, Subscription, Content, ContentStatus
+from app.services.digest import digest_cutoff
+from app.tasks.newsletter_tasks import check_due_content, send_digests
+
+
+def create_digest_content(db_session):
+    science = Topic(name="Science", digest=True)
+    tech = Topic(name="Technology", digest=True)
+    both = Subscriber(email="both@example.com")
+    one = Subscriber(email="one@example.com")
+    db_session.add_all([science, tech, both, one])
+    db_session.commit()
+    db_session.add_all([
+        Subscription(subscriber_id=both.id, topic_id=science.id),
+        Subscription(subscriber_id=both.id, topic_id=tech.id),
+        Subscription(subscriber_id=one.id, topic_id=science.id),
+    ])
+    scheduled_at = datetime.utcnow() - timedelta(hours=2)
+    items = [
+        Content(topic_id=science.id, title="Science news", body="<p>Atoms</p>",
+                scheduled_at=scheduled_at, digest=True),
+        Content(topic_id=tech.id, title="Tech news", body="<p>Chips</p>",
+                scheduled_at=scheduled_at, digest=True),
+    ]
+    db_session.add_all(items)
+    db_session.commit()
+    return items
+
+
+def test_digest_cutoff_rounds_down_to_window():
+    now = datetime(2024, 4, 4, 10, 42, 17)
+    with patch("app.services.digest.DIGEST_WINDOW_MINUTES", 60):
+        assert digest_cutoff(now) == datetime(2024, 4, 4, 10, 0)
+
+
+@patch("app.services.email_service.send_email")
+def test_send_digests_sends_one_email_per_subscriber(mock_send_email, db_session):
+    mock_send_email.return_value = True
+    science, tech = create_digest_content(db_session)
+
+    result = send_digests()
+
+    assert result == {"items": 2, "sent": 2, "failed": 0}
+    emails = {
+        call.kwargs["to_email"]: call.kwargs for call in mock_send_email.call_args_list
+    }
+    assert emails["both@example.com"]["subject"] == "Your digest: 2 updates"
+    assert "Atoms" in emails["both@example.com"]["body"]
+    assert "Chips" in emails["both@example.com"]["body"]
+    assert emails["one@example.com"]["subject"] == "Science news"
+
+    db_session.refresh(science)
+    db_session.refresh(tech)
+    assert science.status == ContentStatus.SENT
+    assert science.sent_count == 2
+    assert tech.sent_count == 1
+    assert send_digests()["items"] == 0
+
+
+@patch("app.services.email_service.send_email")
+def test_send_digests_applies_item_segments(mock_send_email, db_session):
+    mock_send_email.return_value = True
+    science, tech = create_digest_content(db_session)
+    both = db_session.query(Subscriber).filter_by(email="both@example.com").one()
+    both.attributes = {"plan": "pro"}
+    tech.segment = {"plan": "free"}
+    db_session.commit()
+
+    result = send_digests()
+
+    assert result == {"items": 2, "sent": 2, "failed": 0}
+    emails = {
+        call.kwargs["to_email"]: call.kwargs for call in mock_send_email.call_args_list
+    }
+    assert emails["both@example.com"]["subject"] == "Science news"
+    assert "Chips" not in emails["both@example.com"]["body"]
+
+
+@patch("app.services.email_service.send_email")
+def test_stalled_digest_is_reclaimed_and_resumes_after_cursor(mock_send_email, db_session):
+    mock_send_email.return_value = True
+    science, tech = create_digest_content(db_session)
+    both = db_session.query(Subscriber).filter_by(email="both@example.com").one()
+    one = db_session.query(Subscriber).filter_by(email="one@example.com").one()
+    assert both.id < one.id
+    for item in (science, tech):
+        item.dispatched_at = datetime.utcnow() - timedelta(hours=1)
+        item.sending_by = "crashed-task"
+        item.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+        item.send_cursor = both.id
+    db_session.commit()
+
+    result = send_digests()
+
+    assert result == {"items": 2, "sent": 1, "failed": 0}
+    assert [call.kwargs["to_email"] for call in mock_send_email.call_args_list] == [
+        "one@example.com"
+    ]
+    db_session.refresh(science)
+    assert science.status == ContentStatus.SENT
+    assert science.send_cursor == one.id
+    assert science.sending_by is None
+
+
+def test_digest_with_live_lease_is_not_reclaimed(db_session):
+    science, tech = create_digest_content(db_session)
+    for item in (science, tech):
+        item.dispatched_at = datetime.utcnow() - timedelta(hours=1)
+        item.sending_by = "running-task"
+        item.heartbeat_at = datetime.utcnow()
+    db_session.commit()
+
+    assert send_digests()["items"] == 0
+
+
+@patch("app.services.email_service.send_email")
+def test_paused_digest_stops_and_keeps_items_pending(mock_send_email, db_session):
+    science, tech = create_digest_content(db_session)
+
+    with patch(
+        "app.tasks.newsletter_tasks.SendControl.poll", return_value=ContentStatus.PAUSED
+    ):
+        result = send_digests()
+
+    assert result["stopped"] == "paused"
+    mock_send_email.assert_not_called()
+    db_session.refresh(science)
+    assert science.status == ContentStatus.PENDING
+    assert science.sending_by is None
+
+
+def test_check_due_content_skips_digest_content(db_session):
+    create_digest_content(db_session)
+
+    with patch(
+        "app.tasks.newsletter_tasks.send_content_to_subscribers.apply_async"
+    ) as mock_apply_async:
+        result = check_due_content()
+
+    assert result["enqueued"] == 0
+    assert mock_apply_async.call_count == 0
+
+
+def test_content_inherits_topic_digest_setting(client):
+    topic_id = client.post(
+        "/api/topics/", json={"name": "Science", "digest": True}
+    ).json()["id"]
+    scheduled_at = (datetime.utcnow() + timedelta(hours=1)).isoformat()
+
+    inherited = client.post(
+        "/api/content/",
+        json={"topic_id": topic_id, "body": "Body", "scheduled_at": scheduled_at},
+    )
+    overridden = client.post(
+        "/api/content/",
+        json={
+            "topic_id": topic_id,
+            "body": "Body",
+            "scheduled_at": scheduled_at,
+            "digest": False,
+        },
+    )
+
+    assert inherited.json()["digest"] is True
+    assert overridden.json()["digest"] is False
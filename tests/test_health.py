@@ -1,5 +1,14 @@
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
 from app.main import app
+from app.models import Content, Topic
+from app.services.health import check_database, probe_engine
+from app.services.task_runs import TaskRunRecorder
+from tests.conftest import TestingSessionLocal
 
 client = TestClient(app)
 
@@ -9,3 +18,89 @@ def test_health_endpoint():
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
 
+
+
+def test_responses_carry_server_timing():
+    response = client.get("/health")
+    metrics = response.headers["Server-Timing"]
+    assert "app;dur=" in metrics
+    assert 'db;dur=0.0;desc="0 queries"' in metrics
+    assert "total;dur=" in metrics
+
+
+def test_readiness_checks_the_database(db_session):
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["database"]["ok"] is True
+    assert body["database"]["pool"]["saturated"] is False
+
+
+def test_readiness_fails_when_the_pool_is_exhausted(db_session):
+    with patch("app.services.health.DB_POOL_SIZE", 0), patch(
+        "app.services.health.DB_MAX_OVERFLOW", 0
+    ):
+        response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["database"]["error"] == "connection pool exhausted"
+
+
+def test_deep_health_reports_scheduling_lag(db_session):
+    topic = Topic(name="News")
+    db_session.add(topic)
+    db_session.commit()
+    db_session.add(
+        Content(
+            title="Late",
+            body="Body",
+            topic_id=topic.id,
+            scheduled_at=datetime.utcnow() - timedelta(hours=2),
+        )
+    )
+    db_session.commit()
+    recorder = TaskRunRecorder(session_factory=TestingSessionLocal)
+    recorder.finish("app.tasks.check_due_content", "a", "SUCCESS")
+    recorder.flush()
+
+    with patch("app.services.health.get_redis", return_value=None):
+        response = client.get("/health/deep")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "degraded"
+    assert body["database"]["ok"] is True
+    assert body["redis"]["ok"] is False
+    scheduling = body["scheduling"]
+    assert scheduling["due_backlog"] == 1
+    assert scheduling["oldest_due_seconds"] >= 2 * 3600 - 60
+    assert scheduling["backlog_stale"] is True
+    assert scheduling["beat_stale"] is False
+    assert scheduling["last_beat_at"] is not None
+
+
+def test_database_check_fails_fast_when_postgres_is_unreachable():
+    unreachable = create_engine("postgresql://postgres@10.255.255.1:5432/newsletter")
+    with patch("app.services.health.HEALTH_TIMEOUT_SECONDS", 1):
+        started = time.monotonic()
+        result = check_database(unreachable)
+    assert result["ok"] is False
+    assert time.monotonic() - started < 5
+    assert isinstance(probe_engine(unreachable).pool, NullPool)
+
+
+def test_deep_health_is_degraded_when_scheduling_queries_time_out(db_session):
+    def slow_stats(db):
+        db.execute(text("SELECT pg_sleep(10)"))
+
+    started = time.monotonic()
+    with patch("app.routers.health.scheduling_stats", slow_stats), patch(
+        "app.services.health.get_redis", return_value=None
+    ):
+        response = client.get("/health/deep")
+
+    assert time.monotonic() - started < 8
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "degraded"
+    assert "statement timeout" in body["scheduling"]["error"]
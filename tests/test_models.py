@@ -1,18 +1,6 @@
 import pytest
 from datetime import datetime, timedelta
 from app.models import Topic, Subscriber, Subscription, Content, ContentStatus
-from app.database import SessionLocal, engine, Base
-
-
-@pytest.fixture(scope="function")
-def db():
-    Base.metadata.create_all(bind=engine)
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-        Base.metadata.drop_all(bind=engine)
 
 
 def test_create_topic(db):
@@ -0,0 +1,131 @@
+from unittest.mock import patch
+from datetime import datetime, timedelta
+from app.models import Topic, Subscriber, Subscription, Content, DeliveryEvent
+from app.services.preparation import html_to_text, minify_html, prepare_body
+from app.services.unsubscribe import make_click_token
+from app.tasks.newsletter_tasks import send_content_to_subscribers
+
+BODY = """
+<html>
+  <head><style>p { color: red; }</style></head>
+  <body>
+    <!-- editor note -->
+    <h1>Weekly   update</h1>
+    <p>Read the <a href="https://example.com/post?a=1&amp;b=2">new post</a>.</p>
+    <pre>keep   this</pre>
+    <ul><li>One</li><li>Two</li></ul>
+    <p><a href="#unsubscribe">Unsubscribe</a></p>
+  </body>
+</html>
+"""
+
+
+def test_minify_html():
+    minified = minify_html(BODY)
+
+    assert "editor note" not in minified
+    assert "<h1>Weekly update</h1><p>Read the" in minified
+    assert "<pre>keep   this</pre>" in minified
+    assert "\n" not in minified
+
+
+def test_html_to_text():
+    text = html_to_text(BODY)
+
+    assert text.startswith("Weekly update\n\nRead the new post (https://example.com/post?a=1&b=2).")
+    assert "- One\n- Two" in text
+    assert "color: red" not in text
+
+
+def test_prepare_body_tracks_links_and_sets_unsubscribe():
+    html, text, links = prepare_body(BODY, content_id=7)
+
+    assert links == ["https://example.com/post?a=1&b=2"]
+    assert "/api/track/7/0?s={{ subscriber_token }}" in html
+    assert 'href="{{ unsubscribe_url }}"' in html
+    assert "Unsubscribe ({{ unsubscribe_url }})" in text
+
+
+def test_prepare_body_leaves_plain_text_alone():
+    assert prepare_body("Hello\n\nWorld", content_id=1) == ("Hello\n\nWorld", "Hello\n\nWorld", [])
+
+
+def test_content_api_stores_prepared_body(client, db_session):
+    topic_id = client.post("/api/topics/", json={"name": "Technology"}).json()["id"]
+    content_id = client.post(
+        "/api/content/",
+        json={
+            "topic_id": topic_id,
+            "title": "Weekly Update",
+            "body": BODY,
+            "scheduled_at": (datetime.utcnow() + timedelta(hours=1)).isoformat(),
+        },
+    ).json()["id"]
+
+    content = db_session.get(Content, content_id)
+    assert content.prepared_links == ["https://example.com/post?a=1&b=2"]
+    assert content.prepared_text.startswith("Weekly update")
+
+    client.patch(f"/api/content/{content_id}", json={"body": "<p>Short</p>"})
+    db_session.refresh(content)
+    assert content.prepared_html == "<p>Short</p>"
+    assert content.prepared_links == []
+
+
+def test_tracked_click_redirects_and_records_event(client, db_session):
+    subscriber = Subscriber(email="reader@example.com")
+    topic = Topic(name="Technology")
+    db_session.add_all([subscriber, topic])
+    db_session.commit()
+    content = Content(
+        topic_id=topic.id,
+        body="",
+        scheduled_at=datetime.utcnow(),
+        prepared_links=["https://example.com/post"],
+    )
+    db_session.add(content)
+    db_session.commit()
+
+    forged = client.get(
+        f"/api/track/{content.id}/0?s={subscriber.id}", follow_redirects=False
+    )
+    assert forged.status_code == 302
+    assert db_session.query(DeliveryEvent).count() == 0
+
+    response = client.get(
+        f"/api/track/{content.id}/0?s={make_click_token(subscriber.id)}",
+        follow_redirects=False,
+    )
+
+    assert response.status_code == 302
+    assert response.headers["location"] == "https://example.com/post"
+    event = db_session.query(DeliveryEvent).one()
+    assert (event.event, event.email, event.tag) == ("click", "reader@example.com", str(content.id))
+    assert client.get(f"/api/track/{content.id}/1", follow_redirects=False).status_code == 404
+
+
+@patch("app.services.email_service.send_email")
+def test_send_uses_prepared_html_and_text(mock_send_email, db_session):
+    mock_send_email.return_value = True
+    topic = Topic(name="Technology")
+    subscriber = Subscriber(email="reader@example.com")
+    db_session.add_all([topic, subscriber])
+    db_session.commit()
+    db_session.add(Subscription(subscriber_id=subscriber.id, topic_id=topic.id))
+    content = Content(
+        topic_id=topic.id,
+        body=BODY,
+        scheduled_at=datetime.utcnow() - timedelta(minutes=5),
+    )
+    db_session.add(content)
+    db_session.commit()
+
+    send_content_to_subscribers(content.id)
+
+    kwargs = mock_send_email.call_args.kwargs
+    assert (
+        f"/api/track/{content.id}/0?s={make_click_token(subscriber.id)}" in kwargs["body"]
+    )
+    assert "\n" not in kwargs["body"]
+    assert kwargs["text_body"].startswith("Weekly update")
+    assert "/api/subscribers/unsubscribe/" in kwargs["text_body"]
@@ -0,0 +1,86 @@
+import tracemalloc
+from unittest.mock import patch
+from sqlalchemy import text
+from app.services.profiling import TaskProfiler
+from app.tasks.newsletter_tasks import reconcile_topic_counts
+from tests.conftest import TestingSessionLocal
+
+
+def test_selects_runs_by_task_name_or_content_id(tmp_path):
+    profiler = TaskProfiler(
+        tasks={"check_due_content"}, content_ids={7}, directory=str(tmp_path)
+    )
+
+    assert profiler.should_profile("app.tasks.check_due_content", None)
+    assert not profiler.should_profile("app.tasks.send_digests", None)
+    assert profiler.content_id_of("app.tasks.send_content_to_subscribers", [7], {}) == 7
+    assert profiler.should_profile("app.tasks.send_content_to_subscribers", 7)
+    assert not profiler.should_profile("app.tasks.send_content_to_subscribers", 8)
+    assert not TaskProfiler(tasks=set(), content_ids=set()).enabled
+
+
+def test_profile_report_covers_cpu_memory_and_sql(db_session, tmp_path):
+    profiler = TaskProfiler(
+        tasks={"app.tasks.send_chunk"}, content_ids=set(), directory=str(tmp_path)
+    )
+
+    assert profiler.start("app.tasks.send_chunk", "abc", [1], {})
+    blocks = [bytearray(1024) for _ in range(100)]
+    db = TestingSessionLocal()
+    db.execute(text("SELECT 1"))
+    db.execute(text("SELECT 1"))
+    db.close()
+    path = profiler.finish("abc", "SUCCESS")
+    del blocks
+
+    report = profiler.report(path.name)
+    assert report["task"] == "app.tasks.send_chunk"
+    assert report["state"] == "SUCCESS"
+    assert report["memory"]["peak_bytes"] >= 100 * 1024
+    assert report["memory"]["overlapped"] is False
+    assert report["cpu"]["top_functions"]
+    statement = report["sql"]["top_statements"][0]
+    assert (statement["statement"], statement["count"]) == ("SELECT 1", 2)
+    assert path.with_suffix(".prof").exists()
+    assert profiler.finish("abc") is None
+
+
+def test_overlapping_runs_share_memory_tracing(tmp_path):
+    profiler = TaskProfiler(
+        tasks={"app.tasks.send_chunk"}, content_ids=set(), directory=str(tmp_path)
+    )
+    was_tracing = tracemalloc.is_tracing()
+
+    assert profiler.start("app.tasks.send_chunk", "first", [1], {})
+    assert profiler.start("app.tasks.send_chunk", "second", [2], {})
+    first = profiler.report(profiler.finish("first", "SUCCESS").name)
+    assert tracemalloc.is_tracing()
+    second = profiler.report(profiler.finish("second", "SUCCESS").name)
+
+    assert first["memory"]["overlapped"] is True
+    assert second["memory"]["overlapped"] is True
+    assert second["memory"]["top_allocations"] is not None
+    assert tracemalloc.is_tracing() == was_tracing
+
+
+def test_task_runs_are_profiled_and_listed(client, tmp_path):
+    profiler = TaskProfiler(
+        tasks={"reconcile_topic_counts"}, content_ids=set(), directory=str(tmp_path)
+    )
+    with patch("app.tasks.profiling.task_profiler", profiler), patch(
+        "app.routers.debug.task_profiler", profiler
+    ):
+        reconcile_topic_counts.apply()
+
+        response = client.get("/api/debug/profiles")
+        assert response.status_code == 200
+        [summary] = response.json()
+        assert summary["task"] == "app.tasks.reconcile_topic_counts"
+        assert summary["queries"] >= 1
+
+        response = client.get(f"/api/debug/profiles/{summary['name']}")
+        assert response.status_code == 200
+        assert response.json()["task_id"] == summary["task_id"]
+
+        assert client.get("/api/debug/profiles/..%2Fsecrets.json").status_code == 404
+        assert client.get("/api/debug/profiles/missing.json").status_code == 404
@@ -0,0 +1,88 @@
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from datetime import datetime, timedelta
+from app.models import Topic, Content, ContentStatus
+from app.services.progress import ProgressTracker, progress_key, read_progress
+
+
+@pytest.fixture(scope="function")
+def content(db):
+    topic = Topic(name="Technology")
+    db.add(topic)
+    db.commit()
+
+    content = Content(
+        topic_id=topic.id,
+        title="Test Newsletter",
+        body="Test body",
+        scheduled_at=datetime.utcnow(),
+        status=ContentStatus.PENDING,
+        recipient_count=10,
+    )
+    db.add(content)
+    db.commit()
+    return content
+
+
+def test_tracker_flushes_in_batches(db, content):
+    redis_client = MagicMock()
+    pipe = redis_client.pipeline.return_value
+
+    with patch("app.services.progress.PROGRESS_FLUSH_EVERY", 4), patch(
+        "app.services.progress.PROGRESS_FLUSH_SECONDS", 3600
+    ):
+        tracker = ProgressTracker(db, content.id, total=10, redis_client=redis_client)
+        for outcome in [True, True, False, True, True]:
+            tracker.record(sent=outcome)
+
+        pipe.hincrby.assert_any_call(progress_key(content.id), "sent", 3)
+        pipe.hincrby.assert_any_call(progress_key(content.id), "failed", 1)
+        assert pipe.execute.call_count == 1
+
+        tracker.flush()
+
+    db.refresh(content)
+    assert content.sent_count == 4
+    assert content.failed_count == 1
+    assert pipe.execute.call_count == 2
+
+
+def test_read_progress_estimates_completion(content):
+    now = time.time()
+    redis_client = MagicMock()
+    redis_client.hgetall.return_value = {
+        "total": "10",
+        "sent": "3",
+        "failed": "1",
+        "started_at": str(now - 4),
+        "updated_at": str(now),
+    }
+
+    progress = read_progress(content, redis_client=redis_client)
+
+    assert progress["sent"] == 3
+    assert progress["failed"] == 1
+    assert progress["remaining"] == 6
+    assert progress["rate_per_second"] == pytest.approx(1.0, rel=0.01)
+    expected = progress["updated_at"] + timedelta(seconds=6)
+    assert abs((progress["estimated_completion"] - expected).total_seconds()) < 0.1
+
+
+def test_read_progress_falls_back_to_database_counters(db, content):
+    redis_client = MagicMock()
+    redis_client.hgetall.return_value = {}
+    content.sent_count = 7
+    content.failed_count = 3
+    db.commit()
+
+    progress = read_progress(content, redis_client=redis_client)
+
+    assert progress["remaining"] == 0
+    assert progress["rate_per_second"] is None
+    assert progress["estimated_completion"] is None
+
+
+def test_read_progress_before_audience_resolved(content):
+    content.recipient_count = None
+    assert read_progress(content, redis_client=MagicMock()) is None
@@ -0,0 +1,59 @@
+import json
+import random
+from unittest.mock import patch
+import pytest
+from app.models import Topic, Subscriber, Content
+from app.services.recipient_sets import decode_recipient_set, encode_recipient_set
+from app.tasks.newsletter_tasks import retry_recipients
+
+
+def test_contiguous_ids_encode_as_ranges():
+    descriptor = encode_recipient_set(list(range(1000, 1500)) + [2000])
+
+    assert descriptor == {"v": 1, "ranges": [[1000, 1499], [2000, 2000]]}
+    assert decode_recipient_set(descriptor) == list(range(1000, 1500)) + [2000]
+
+
+def test_sparse_ids_are_packed():
+    subscriber_ids = sorted(random.Random(7).sample(range(1, 10_000_000), 500))
+
+    descriptor = encode_recipient_set(subscriber_ids)
+
+    assert "packed" in descriptor
+    assert decode_recipient_set(descriptor) == subscriber_ids
+    assert len(json.dumps(descriptor)) < len(json.dumps(subscriber_ids)) / 2
+
+
+def test_every_other_id_packs_tiny():
+    descriptor = encode_recipient_set(range(1, 100_000, 2))
+
+    assert len(json.dumps(descriptor)) < 200
+    assert decode_recipient_set(descriptor) == list(range(1, 100_000, 2))
+
+
+def test_decode_accepts_plain_lists_and_rejects_unknown_versions():
+    assert decode_recipient_set([3, 1, 3]) == [1, 3]
+    with pytest.raises(ValueError):
+        decode_recipient_set({"v": 99, "ranges": []})
+
+
+@patch("app.services.email_service.send_email")
+def test_retry_recipients_resolves_descriptor(mock_send_email, db_session):
+    mock_send_email.return_value = True
+    topic = Topic(name="Technology")
+    subscribers = [Subscriber(email=f"user{i}@example.com") for i in range(3)]
+    db_session.add_all([topic] + subscribers)
+    db_session.commit()
+    content = Content(topic_id=topic.id, body="Body", scheduled_at=topic.created_at)
+    db_session.add(content)
+    db_session.commit()
+
+    result = retry_recipients(
+        content.id, encode_recipient_set([subscribers[0].id, subscribers[2].id]), 2
+    )
+
+    assert result["sent"] == 2
+    assert sorted(call.kwargs["to_email"] for call in mock_send_email.call_args_list) == [
+        "user0@example.com",
+        "user2@example.com",
+    ]
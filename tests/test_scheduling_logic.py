@@ -1,22 +1,11 @@
 import pytest
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from app.database import SessionLocal, engine, Base
 from app.models import Topic, Subscriber, Subscription, Content, ContentStatus
+from app.services.audience import reconcile_topic_counts
 from app.tasks.newsletter_tasks import get_due_content, get_active_subscribers_for_topic
 
 
-@pytest.fixture(scope="function")
-def db():
-    Base.metadata.create_all(bind=engine)
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-        Base.metadata.drop_all(bind=engine)
-
-
 def test_get_due_content(db):
     topic = Topic(name="Technology")
     db.add(topic)
@@ -128,3 +117,39 @@ def test_get_active_subscribers_inactive_subscriber(db):
     subscribers = get_active_subscribers_for_topic(db, topic.id)
     assert len(subscribers) == 0
 
+
+
+def test_reconcile_topic_counts(db):
+    topic = Topic(name="Technology")
+    subscriber1 = Subscriber(email="user1@example.com", is_active=True)
+    subscriber2 = Subscriber(email="user2@example.com", is_active=False)
+    db.add_all([topic, subscriber1, subscriber2])
+    db.commit()
+
+    db.add_all([
+        Subscription(subscriber_id=subscriber1.id, topic_id=topic.id, is_active=True),
+        Subscription(subscriber_id=subscriber2.id, topic_id=topic.id, is_active=True),
+    ])
+    topic.active_subscriber_count = 7
+    db.commit()
+
+    assert reconcile_topic_counts(db) == 1
+    db.refresh(topic)
+    assert topic.active_subscriber_count == 1
+    assert reconcile_topic_counts(db) == 0
+
+
+def test_get_active_subscribers_for_segment(db):
+    topic = Topic(name="Technology")
+    pro = Subscriber(email="pro@example.com", attributes={"plan": "pro", "seats": 5})
+    free = Subscriber(email="free@example.com", attributes={"plan": "free"})
+    db.add_all([topic, pro, free])
+    db.commit()
+    db.add_all([
+        Subscription(subscriber_id=pro.id, topic_id=topic.id),
+        Subscription(subscriber_id=free.id, topic_id=topic.id),
+    ])
+    db.commit()
+
+    assert get_active_subscribers_for_topic(db, topic.id, {"plan": "pro"}) == [pro]
+    assert len(get_active_subscribers_for_topic(db, topic.id)) == 2
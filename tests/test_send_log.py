@@ -0,0 +1,84 @@
+import json
+import logging
+import pytest
+import requests
+from unittest.mock import patch
+from app.log_queue import JsonFormatter, LogQueue
+from app.services import email_service
+from app.services.send_log import SendLog
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_sent_recipients_are_sampled_and_summarized(caplog):
+    samples = iter([0.5, 0.0005, 0.9])
+    send_log = SendLog(7, sample_rate=0.001, sample=lambda: next(samples))
+
+    with caplog.at_level(logging.INFO, logger="app.services.send_log"):
+        for subscriber_id in (1, 2, 3):
+            send_log.record_sent(subscriber_id, f"user{subscriber_id}@example.com")
+        send_log.record_failed()
+        send_log.record_retrying()
+        send_log.summary()
+
+    lines = [record.getMessage() for record in caplog.records]
+    assert lines[0] == "Sent email to user2@example.com for content 7"
+    assert lines[1].startswith(
+        "Delivered content 7: 3 sent, 1 failed, 1 retrying, 0 suppressed"
+    )
+    assert (caplog.records[1].sent, caplog.records[1].failed) == (3, 1)
+
+
+def test_recipient_mode_logs_every_send(caplog):
+    send_log = SendLog(7, mode="recipient", sample=lambda: 1 / 0)
+
+    with caplog.at_level(logging.INFO, logger="app.services.send_log"):
+        send_log.record_sent(1, "a@example.com")
+        send_log.record_sent(2, "b@example.com")
+
+    assert len(caplog.records) == 2
+
+
+def test_log_queue_hands_records_to_a_listener_thread():
+    logger = logging.getLogger("tests.log_queue")
+    logger.propagate = False
+    target = ListHandler()
+    logger.handlers = [target]
+    log_queue = LogQueue()
+
+    with patch("app.log_queue.LOG_FORMAT", "json"):
+        log_queue.install(logger)
+    try:
+        logger.warning("queued %s", "record", extra={"content_id": 3})
+    finally:
+        log_queue.stop()
+
+    assert logger.handlers == [log_queue.handler]
+    [record] = target.records
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "queued record"
+    assert entry["content_id"] == 3
+    assert entry["level"] == "WARNING"
+
+
+def test_email_client_logs_a_sample_of_failures_without_traceback(caplog, monkeypatch):
+    monkeypatch.setenv("BREVO_API_KEY", "key")
+    session = email_service._http_session()
+    with patch.object(
+        session, "post", side_effect=requests.exceptions.ConnectionError("down")
+    ), patch.object(email_service, "SEND_LOG_SAMPLE_RATE", 1.0):
+        with caplog.at_level(logging.INFO, logger="app.services.email_service"):
+            with pytest.raises(email_service.EmailSendError):
+                email_service.send_email("a@example.com", "Subject", "Body")
+
+    assert [record.getMessage() for record in caplog.records] == [
+        "Failed to send email to a@example.com: Request error: down"
+    ]
+    assert caplog.records[0].exc_info is None
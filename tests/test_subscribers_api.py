@@ -1,4 +1,5 @@
 import pytest
+from app.services.unsubscribe import make_unsubscribe_token
 
 
 def test_create_subscriber(client):
@@ -61,3 +62,66 @@ def test_update_subscriber(client):
     data = response.json()
     assert data["is_active"] is False
 
+
+
+def test_subscriber_attributes_round_trip(client):
+    response = client.post(
+        "/api/subscribers/",
+        json={"email": "test@example.com", "attributes": {"plan": "pro"}},
+    )
+    assert response.status_code == 201
+    assert response.json()["attributes"] == {"plan": "pro"}
+
+    subscriber_id = response.json()["id"]
+    response = client.patch(
+        f"/api/subscribers/{subscriber_id}",
+        json={"attributes": {"plan": "free", "country": "DE"}},
+    )
+    assert response.json()["attributes"] == {"plan": "free", "country": "DE"}
+
+
+def test_count_segment(client):
+    topic_id = client.post("/api/topics/", json={"name": "Technology"}).json()["id"]
+    for email, attributes in [
+        ("pro-de@example.com", {"plan": "pro", "country": "DE"}),
+        ("pro-us@example.com", {"plan": "pro", "country": "US"}),
+        ("free@example.com", {"plan": "free"}),
+    ]:
+        subscriber_id = client.post(
+            "/api/subscribers/", json={"email": email, "attributes": attributes}
+        ).json()["id"]
+        client.post(
+            "/api/subscriptions/",
+            json={"subscriber_id": subscriber_id, "topic_id": topic_id},
+        )
+
+    def count(**query):
+        response = client.post("/api/subscribers/count", json=query)
+        assert response.status_code == 200
+        return response.json()["count"]
+
+    assert count() == 3
+    assert count(segment={"plan": "pro"}) == 2
+    assert count(topic_ids=[topic_id], segment={"plan": "pro", "country": "DE"}) == 1
+    assert count(topic_ids=[topic_id + 1]) == 0
+
+
+def test_unsubscribe_link(client):
+    subscriber_id = client.post(
+        "/api/subscribers/", json={"email": "test@example.com"}
+    ).json()["id"]
+    token = make_unsubscribe_token(subscriber_id)
+
+    # Following the link only shows the confirmation form
+    response = client.get(f"/api/subscribers/unsubscribe/{token}")
+    assert response.status_code == 200
+    assert '<form method="post">' in response.text
+    assert client.get(f"/api/subscribers/{subscriber_id}").json()["is_active"] is True
+
+    response = client.post(f"/api/subscribers/unsubscribe/{token}")
+    assert response.status_code == 200
+    assert response.json() == {"status": "unsubscribed"}
+    assert client.get(f"/api/subscribers/{subscriber_id}").json()["is_active"] is False
+    assert client.post(f"/api/subscribers/unsubscribe/{token}").status_code == 200
+    assert client.get(f"/api/subscribers/unsubscribe/{subscriber_id}.forged").status_code == 404
+    assert client.post(f"/api/subscribers/unsubscribe/{subscriber_id}.forged").status_code == 404
@@ -0,0 +1,97 @@
+import pytest
+from unittest.mock import patch
+from datetime import datetime, timedelta
+from app.models import (
+    Topic,
+    Subscriber,
+    Subscription,
+    Content,
+    ContentStatus,
+    Suppression,
+    SuppressionReason,
+)
+from app.services.email_service import EmailSendError
+from app.services.suppression import BloomFilter, suppress, suppression_cache
+from app.tasks.newsletter_tasks import send_content_to_subscribers
+from celery_worker import celery
+from tests.conftest import create_content_for
+
+
+@pytest.fixture(autouse=True)
+def empty_suppression_cache(db):
+    suppression_cache.refresh(db)
+
+
+@pytest.fixture(autouse=True)
+def setup_celery_eager():
+    celery.conf.task_always_eager = True
+    celery.conf.task_eager_propagates = True
+    yield
+    celery.conf.task_always_eager = False
+    celery.conf.task_eager_propagates = False
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    emails = [f"user{i}@example.com" for i in range(1000)]
+    for email in emails:
+        bloom.add(email)
+
+    assert all(email in bloom for email in emails)
+    false_positives = sum(f"other{i}@example.com" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+@patch("app.services.email_service.send_email")
+def test_send_skips_suppressed_recipients(mock_send_email, db):
+    mock_send_email.return_value = True
+    content = create_content_for(db, ["user1@example.com", "bounced@example.com"])
+    suppress(db, [("Bounced@Example.com", SuppressionReason.BOUNCED)], source="api")
+    db.commit()
+
+    result = send_content_to_subscribers(content.id)
+
+    assert result["sent"] == 1
+    assert result["suppressed"] == 1
+    mock_send_email.assert_called_once()
+    assert mock_send_email.call_args.kwargs["to_email"] == "user1@example.com"
+    db.refresh(content)
+    assert content.suppressed_count == 1
+
+
+@patch("app.services.email_service.send_email")
+def test_invalid_address_failure_is_suppressed(mock_send_email, db):
+    mock_send_email.side_effect = EmailSendError(
+        "Brevo API error: 400 - email is not valid", status_code=400, transient=False
+    )
+    create_content_for(db, ["broken@example"])
+    content = db.query(Content).one()
+
+    send_content_to_subscribers(content.id)
+
+    suppression = db.query(Suppression).one()
+    assert suppression.email == "broken@example"
+    assert suppression.reason == SuppressionReason.INVALID
+    assert suppression.source == "send"
+
+
+def test_ingest_suppressions(client):
+    response = client.post(
+        "/api/suppressions/",
+        json={
+            "entries": [
+                {"email": "a@example.com", "reason": "bounced"},
+                {"email": "b@example.com", "reason": "complained"},
+                {"email": "A@example.com", "reason": "invalid"},
+            ]
+        },
+    )
+    assert response.status_code == 201
+    assert response.json() == {"received": 3, "added": 2}
+
+    data = client.get("/api/suppressions/").json()
+    assert [entry["email"] for entry in data] == ["a@example.com", "b@example.com"]
+    assert data[0]["reason"] == "bounced"
+
+    assert client.delete("/api/suppressions/b@example.com").status_code == 200
+    assert len(client.get("/api/suppressions/").json()) == 1
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from app.models import TaskRun
+from app.services.task_runs import TaskRunRecorder, prune_task_runs, summarize
+from celery_worker import celery
+from tests.conftest import TestingSessionLocal
+
+
+def test_summarize_keeps_scalar_fields():
+    assert summarize({"status": "completed", "sent": 3, "errors": ["boom"]}) == {
+        "status": "completed",
+        "sent": 3,
+    }
+    assert summarize(None) is None
+
+
+def test_recorder_writes_in_batches(db_session):
+    recorder = TaskRunRecorder(session_factory=TestingSessionLocal)
+
+    with patch("app.services.task_runs.TASK_RUN_FLUSH_EVERY", 2), patch(
+        "app.services.task_runs.TASK_RUN_FLUSH_SECONDS", 3600
+    ):
+        recorder.start("a")
+        recorder.finish(
+            "app.tasks.send_content_to_subscribers",
+            "a",
+            "SUCCESS",
+            result={"status": "completed", "sent": 5},
+            args=[42],
+            worker="worker-1",
+        )
+        assert db_session.query(TaskRun).count() == 0
+
+        recorder.finish("app.tasks.check_due_content", "b", "SUCCESS", result={"enqueued": 1})
+
+    runs = db_session.query(TaskRun).order_by(TaskRun.id).all()
+    assert [run.task for run in runs] == [
+        "app.tasks.send_content_to_subscribers",
+        "app.tasks.check_due_content",
+    ]
+    assert runs[0].content_id == 42
+    assert runs[0].summary == {"status": "completed", "sent": 5}
+    assert runs[0].duration_ms is not None
+    assert runs[1].duration_ms is None
+    assert recorder.flush() == 0
+
+
+def test_prune_task_runs_keeps_recent_history(db_session):
+    now = datetime.now(timezone.utc)
+    db_session.add_all(
+        [
+            TaskRun(
+                task="app.tasks.relay_outbox",
+                status="SUCCESS",
+                finished_at=now - timedelta(days=30),
+            ),
+            TaskRun(
+                task="app.tasks.relay_outbox",
+                status="SUCCESS",
+                finished_at=now - timedelta(hours=1),
+            ),
+        ]
+    )
+    db_session.commit()
+
+    with patch("app.services.task_runs.TASK_RUN_RETENTION_DAYS", 14):
+        assert prune_task_runs(db_session) == 1
+
+    assert db_session.query(TaskRun).one().finished_at > now - timedelta(days=1)
+
+
+def test_list_task_runs(client):
+    recorder = TaskRunRecorder(session_factory=TestingSessionLocal)
+    recorder.finish("app.tasks.retry_recipients", "a", "SUCCESS", args=[7])
+    recorder.finish("app.tasks.check_due_content", "b", "FAILURE")
+    recorder.flush()
+
+    response = client.get("/api/task-runs/?content_id=7")
+    assert response.status_code == 200
+    assert [run["task"] for run in response.json()] == ["app.tasks.retry_recipients"]
+
+    response = client.get("/api/task-runs/")
+    assert [run["status"] for run in response.json()] == ["FAILURE", "SUCCESS"]
+
+
+def test_results_are_not_stored():
+    assert celery.conf.task_ignore_result is True
+    assert celery.conf.task_track_started is False
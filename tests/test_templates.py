@@ -0,0 +1,110 @@
+from unittest.mock import patch
+from datetime import datetime, timedelta
+import pytest
+from app.models import Topic, Subscriber, Subscription, Content
+from app.services.templates import CompiledMessage, TemplateError, compile_template
+from app.services.unsubscribe import (
+    make_unsubscribe_token,
+    unsubscribe_url,
+    verify_unsubscribe_token,
+)
+from app.tasks.newsletter_tasks import send_content_to_subscribers
+
+
+def test_render_fills_merge_tags():
+    template = compile_template("Hi {{ attributes.name | there }}, you are {{email}}")
+
+    assert template.render(1, "a@example.com", {"name": "Ada"}) == (
+        "Hi Ada, you are a@example.com"
+    )
+    assert template.render(1, "a@example.com") == "Hi there, you are a@example.com"
+    assert template.needs_attributes
+
+
+def test_render_keeps_literal_braces_and_static_text():
+    template = compile_template("<style>p { color: red }</style>{{ subscriber_id }}")
+    assert template.render(42, "a@example.com") == "<style>p { color: red }</style>42"
+
+    static = compile_template("No tags here")
+    assert static.is_static
+    assert static.render(1, "a@example.com") == "No tags here"
+
+
+def test_html_body_escapes_values_but_not_subject():
+    message = CompiledMessage("For {{ attributes.name }}", "<p>{{ attributes.name }}</p>")
+
+    subject, body, text = message.render(1, "a@example.com", {"name": "<Ada & co>"})
+
+    assert subject == "For <Ada & co>"
+    assert body == "<p>&lt;Ada &amp; co&gt;</p>"
+    assert text is None
+
+
+def test_compiled_templates_are_cached():
+    assert compile_template("Hello {{ email }}") is compile_template("Hello {{ email }}")
+
+
+def test_unknown_merge_tag_is_rejected():
+    with pytest.raises(TemplateError):
+        compile_template("Hello {{ name }}")
+
+
+def test_message_with_unvalidated_template_is_sent_as_written():
+    # Bodies stored before merge tags were validated
+    message = CompiledMessage("Hi {{ name }}", "<p>{{ email }} and {{ name }}</p>")
+    assert message.is_static
+    assert message.render(1, "a@example.com") == (
+        "Hi {{ name }}",
+        "<p>{{ email }} and {{ name }}</p>",
+        None,
+    )
+
+
+def test_unsubscribe_token_round_trip():
+    token = make_unsubscribe_token(7)
+
+    assert verify_unsubscribe_token(token) == 7
+    assert verify_unsubscribe_token("8." + token.split(".")[1]) is None
+    assert verify_unsubscribe_token("garbage") is None
+    assert unsubscribe_url(7).endswith(f"/api/subscribers/unsubscribe/{token}")
+
+
+def test_unsubscribe_links_are_disabled_without_a_secret():
+    token = make_unsubscribe_token(7)
+
+    with patch("app.services.unsubscribe._MAC", None):
+        assert make_unsubscribe_token(7) is None
+        assert verify_unsubscribe_token(token) is None
+        template = compile_template("{{ unsubscribe_url | mailto:leave@example.com }}")
+        assert template.render(7, "a@example.com") == "mailto:leave@example.com"
+
+
+@patch("app.services.email_service.send_email")
+def test_send_personalizes_each_recipient(mock_send_email, db_session):
+    mock_send_email.return_value = True
+    topic = Topic(name="Technology")
+    ada = Subscriber(email="ada@example.com", attributes={"name": "Ada"})
+    anon = Subscriber(email="anon@example.com")
+    db_session.add_all([topic, ada, anon])
+    db_session.commit()
+    db_session.add_all([
+        Subscription(subscriber_id=ada.id, topic_id=topic.id),
+        Subscription(subscriber_id=anon.id, topic_id=topic.id),
+    ])
+    content = Content(
+        topic_id=topic.id,
+        title="News for {{ attributes.name | you }}",
+        body='<a href="{{ unsubscribe_url }}">Unsubscribe</a>',
+        scheduled_at=datetime.utcnow() - timedelta(minutes=5),
+    )
+    db_session.add(content)
+    db_session.commit()
+
+    send_content_to_subscribers(content.id)
+
+    emails = {
+        call.kwargs["to_email"]: call.kwargs for call in mock_send_email.call_args_list
+    }
+    assert emails["ada@example.com"]["subject"] == "News for Ada"
+    assert emails["anon@example.com"]["subject"] == "News for you"
+    assert unsubscribe_url(ada.id) in emails["ada@example.com"]["body"]
@@ -0,0 +1,142 @@
+import threading
+from unittest.mock import patch
+from datetime import datetime, timedelta
+from app.models import Topic, Subscriber, Subscription, Content, ContentStatus
+from app.services.email_service import EmailSendError
+from app.services.throttling import (
+    DomainThrottle,
+    interleave_by_domain,
+    is_deferral,
+    iter_windows,
+    parse_rate_limits,
+)
+from app.tasks.newsletter_tasks import send_content_to_subscribers
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_parse_rate_limits():
+    assert parse_rate_limits("gmail.com=10, Yahoo.com=2.5,,bad") == {
+        "gmail.com": 10.0,
+        "yahoo.com": 2.5,
+    }
+
+
+def test_interleave_by_domain_round_robins():
+    recipients = [
+        (1, "a@gmail.com"),
+        (2, "b@gmail.com"),
+        (3, "c@gmail.com"),
+        (4, "d@yahoo.com"),
+        (5, "e@outlook.com"),
+        (6, "f@yahoo.com"),
+    ]
+    assert [r[0] for r in interleave_by_domain(recipients)] == [1, 4, 5, 2, 6, 3]
+    assert [len(w) for w in iter_windows(recipients, 4)] == [4, 2]
+
+
+def test_domain_throttle_reserves_tokens_before_sleeping():
+    # Threads that arrive together each reserve the next slot instead of all
+    # sleeping for the same one
+    clock = FakeClock()
+    throttle = DomainThrottle(
+        limits={"gmail.com": 2}, default_rate=0, clock=clock, sleep=clock.slept.append
+    )
+
+    for _ in range(4):
+        throttle.wait("gmail.com")
+    assert clock.slept == [0.5, 1.0]
+
+
+def test_domain_throttle_paces_and_backs_off():
+    clock = FakeClock()
+    throttle = DomainThrottle(
+        limits={"gmail.com": 2}, default_rate=0, clock=clock, sleep=clock.sleep
+    )
+
+    for _ in range(4):
+        throttle.wait("gmail.com")
+    assert clock.slept == [0.5, 0.5]
+
+    throttle.wait("example.com")
+    assert len(clock.slept) == 2
+
+    throttle.deferred("gmail.com")
+    assert throttle.rate("gmail.com") == 1
+    for _ in range(10):
+        throttle.succeeded("gmail.com")
+    assert throttle.rate("gmail.com") == 2
+
+
+@patch("app.services.email_service.send_email")
+def test_send_interleaves_domains(mock_send_email, db_session):
+    mock_send_email.return_value = True
+    emails = ["a@gmail.com", "b@gmail.com", "c@yahoo.com", "d@yahoo.com"]
+    topic = Topic(name="Technology")
+    subscribers = [Subscriber(email=email) for email in emails]
+    db_session.add_all([topic] + subscribers)
+    db_session.commit()
+    db_session.add_all([
+        Subscription(subscriber_id=s.id, topic_id=topic.id) for s in subscribers
+    ])
+    content = Content(
+        topic_id=topic.id,
+        body="Body",
+        scheduled_at=datetime.utcnow() - timedelta(minutes=1),
+        status=ContentStatus.PENDING,
+    )
+    db_session.add(content)
+    db_session.commit()
+
+    send_content_to_subscribers(content.id)
+
+    sent_to = [call.kwargs["to_email"] for call in mock_send_email.call_args_list]
+    assert sent_to == ["a@gmail.com", "c@yahoo.com", "b@gmail.com", "d@yahoo.com"]
+
+
+def test_deferral_slows_domain():
+    throttle = DomainThrottle(limits={}, default_rate=8)
+    throttle.deferred("gmail.com")
+    throttle.deferred("gmail.com")
+    assert throttle.rate("gmail.com") == 2
+    assert throttle.rate("yahoo.com") == 8
+    assert is_deferral(EmailSendError("Brevo API error: 429", status_code=429))
+    assert not is_deferral(EmailSendError("Brevo API error: 503", status_code=503))
+
+
+def test_domain_throttle_feedback_is_thread_safe():
+    throttle = DomainThrottle(limits={"gmail.com": 2}, default_rate=0)
+    errors = []
+    start = threading.Barrier(8)
+
+    def worker(index):
+        start.wait()
+        try:
+            for _ in range(500):
+                if index % 2:
+                    throttle.deferred("gmail.com")
+                else:
+                    throttle.succeeded("gmail.com")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    with patch("app.services.throttling.logger"):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert errors == []
+    assert 0 < throttle.rate("gmail.com") <= 2
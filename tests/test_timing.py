@@ -0,0 +1,57 @@
+import logging
+from unittest.mock import patch
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.timing import RequestTimingMiddleware, TimedRoute, fingerprint
+from tests.conftest import TestingSessionLocal
+
+
+def test_fingerprint_strips_literals_and_parameters():
+    assert fingerprint(
+        "SELECT * FROM subscribers\n WHERE email = 'a@b.com' AND id IN "
+        "(%(id_1_1)s, %(id_1_2)s, %(id_1_3)s) LIMIT 10"
+    ) == "SELECT * FROM subscribers WHERE email = ? AND id IN (?) LIMIT ?"
+
+
+def test_server_timing_breaks_down_sync_endpoints(client):
+    response = client.get("/api/topics/")
+    assert response.status_code == 200
+
+    metrics = {
+        metric.split(";")[0]: metric
+        for metric in response.headers["Server-Timing"].split(", ")
+    }
+    assert set(metrics) == {"queue", "app", "serialize", "db", "total"}
+    assert 'desc="0 queries"' not in metrics["db"]
+
+
+def test_slow_queries_are_logged_by_fingerprint(client, caplog):
+    with patch("app.timing.SLOW_QUERY_MS", 0), caplog.at_level(
+        logging.WARNING, logger="app.timing"
+    ):
+        db = TestingSessionLocal()
+        db.execute(text("SELECT 42, 'secret'"))
+        db.close()
+    assert "Slow query" in caplog.text
+    assert "SELECT ?, ?" in caplog.text
+    assert "secret" not in caplog.text
+
+
+def test_sampled_requests_are_profiled(tmp_path):
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/work")
+    def work():
+        return {"total": sum(range(1000))}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(RequestTimingMiddleware, sample_rate=1.0)
+
+    with patch("app.timing.PROFILE_DIR", str(tmp_path)):
+        response = TestClient(app).get("/work")
+
+    assert response.json() == {"total": 499500}
+    [profile] = (tmp_path / "requests").glob("*.prof")
+    assert profile.name.endswith("GET_work.prof")
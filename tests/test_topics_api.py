@@ -73,3 +73,44 @@ def test_delete_topic(client):
     get_response = client.get(f"/api/topics/{topic_id}")
     assert get_response.status_code == 404
 
+
+
+def test_topic_active_subscriber_count(client):
+    topic_id = client.post("/api/topics/", json={"name": "Technology"}).json()["id"]
+    subscriber_ids = [
+        client.post("/api/subscribers/", json={"email": f"user{i}@example.com"}).json()["id"]
+        for i in range(3)
+    ]
+    subscription_ids = [
+        client.post(
+            "/api/subscriptions/",
+            json={"subscriber_id": subscriber_id, "topic_id": topic_id}
+        ).json()["id"]
+        for subscriber_id in subscriber_ids
+    ]
+    assert client.get(f"/api/topics/{topic_id}").json()["active_subscriber_count"] == 3
+
+    client.patch(f"/api/subscriptions/{subscription_ids[0]}", json={"is_active": False})
+    client.patch(f"/api/subscribers/{subscriber_ids[1]}", json={"is_active": False})
+    assert client.get(f"/api/topics/{topic_id}").json()["active_subscriber_count"] == 1
+
+    client.patch(f"/api/subscribers/{subscriber_ids[1]}", json={"is_active": True})
+    assert client.get(f"/api/topics/{topic_id}").json()["active_subscriber_count"] == 2
+
+
+def test_topic_stats(client):
+    topic_id = client.post("/api/topics/", json={"name": "Technology"}).json()["id"]
+    client.post("/api/topics/", json={"name": "Science"})
+    subscriber_id = client.post("/api/subscribers/", json={"email": "test@example.com"}).json()["id"]
+    client.post(
+        "/api/subscriptions/",
+        json={"subscriber_id": subscriber_id, "topic_id": topic_id}
+    )
+
+    response = client.get("/api/topics/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 2
+    assert data[0]["topic_id"] == topic_id
+    assert data[0]["active_subscriber_count"] == 1
+    assert data[0]["pending_content"] == 0
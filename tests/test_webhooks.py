@@ -0,0 +1,115 @@
+import json
+from unittest.mock import MagicMock, patch
+from app.models import (
+    Topic,
+    Subscriber,
+    Subscription,
+    DeliveryEvent,
+    Suppression,
+    SuppressionReason,
+)
+from app.services.delivery_events import consume_delivery_events, process_delivery_events
+
+
+def create_subscribed(db_session, emails):
+    topic = Topic(name="Technology")
+    subscribers = [Subscriber(email=email, is_active=True) for email in emails]
+    db_session.add_all([topic] + subscribers)
+    db_session.commit()
+    db_session.add_all([
+        Subscription(subscriber_id=subscriber.id, topic_id=topic.id, is_active=True)
+        for subscriber in subscribers
+    ])
+    topic.active_subscriber_count = len(subscribers)
+    db_session.commit()
+    return topic, subscribers
+
+
+def test_process_delivery_events_suppresses_and_deactivates(db_session):
+    topic, subscribers = create_subscribed(
+        db_session, ["ok@example.com", "bounced@example.com", "spam@example.com"]
+    )
+
+    counts = process_delivery_events(db_session, [
+        {"event": "delivered", "email": "ok@example.com", "ts_event": 1700000000},
+        {"event": "hard_bounce", "email": "Bounced@Example.com", "reason": "mailbox full"},
+        {"event": "spam", "email": "spam@example.com"},
+    ])
+
+    assert counts == {"events": 3, "suppressed": 2, "deactivated": 2}
+    assert db_session.query(DeliveryEvent).count() == 3
+    reasons = {s.email: s.reason for s in db_session.query(Suppression).all()}
+    assert reasons == {
+        "bounced@example.com": SuppressionReason.BOUNCED,
+        "spam@example.com": SuppressionReason.COMPLAINED,
+    }
+
+    for subscriber in subscribers:
+        db_session.refresh(subscriber)
+    assert [s.is_active for s in subscribers] == [True, False, False]
+    db_session.refresh(topic)
+    assert topic.active_subscriber_count == 1
+
+
+def test_brevo_webhook_processes_inline_without_redis(client, db_session):
+    create_subscribed(db_session, ["user@example.com"])
+
+    with patch("app.services.delivery_events.get_redis", return_value=None):
+        response = client.post(
+            "/api/webhooks/brevo?token=test-token",
+            json=[
+                {"event": "opened", "email": "user@example.com", "message-id": "<1@x>"},
+                {"event": "unsubscribed", "email": "user@example.com"},
+            ],
+        )
+
+    assert response.status_code == 202
+    assert response.json() == {"accepted": 2, "queued": False}
+    events = db_session.query(DeliveryEvent).order_by(DeliveryEvent.id).all()
+    assert [e.event for e in events] == ["opened", "unsubscribed"]
+    assert events[0].message_id == "<1@x>"
+    assert db_session.query(Suppression).one().reason == SuppressionReason.UNSUBSCRIBED
+
+
+def test_brevo_webhook_accepts_single_event_and_queues(client):
+    redis_client = MagicMock()
+    with patch("app.services.delivery_events.get_redis", return_value=redis_client):
+        response = client.post(
+            "/api/webhooks/brevo?token=test-token",
+            json={"event": "delivered", "email": "user@example.com"},
+        )
+
+    assert response.status_code == 202
+    assert response.json() == {"accepted": 1, "queued": True}
+    pipe = redis_client.pipeline.return_value
+    assert pipe.xadd.call_count == 1
+    pipe.execute.assert_called_once()
+
+
+def test_brevo_webhook_requires_a_configured_token(client):
+    event = {"event": "unsubscribed", "email": "user@example.com"}
+    response = client.post("/api/webhooks/brevo?token=wrong", json=event)
+    assert response.status_code == 401
+    assert client.post("/api/webhooks/brevo", json=event).status_code == 401
+
+    with patch("app.routers.webhooks.BREVO_WEBHOOK_TOKEN", ""):
+        response = client.post("/api/webhooks/brevo?token=", json=event)
+    assert response.status_code == 503
+
+
+def test_consume_delivery_events_acks_processed_batch(db_session):
+    create_subscribed(db_session, ["user@example.com"])
+    entries = [
+        ("1-0", {"data": json.dumps({"event": "delivered", "email": "user@example.com"})}),
+        ("2-0", {"data": json.dumps({"event": "blocked", "email": "user@example.com"})}),
+    ]
+    redis_client = MagicMock()
+    redis_client.xautoclaim.return_value = ["0-0", [], []]
+    redis_client.xreadgroup.side_effect = [[["stream", entries]], []]
+
+    totals = consume_delivery_events(db_session, client=redis_client)
+
+    assert totals == {"events": 2, "suppressed": 1, "deactivated": 1}
+    redis_client.xack.assert_called_once()
+    assert redis_client.xack.call_args[0][2:] == ("1-0", "2-0")
+    redis_client.xdel.assert_called_once()